@@ -5,33 +5,47 @@
 # IMPORTATION
 ##############################################################################################################
 
-import numpy as np
-import time, scipy
-import scipy.optimize
+import time
+T_START = time.time() # startup timing, cf MainWindow.startupReport
 
-from pathlib import Path, PureWindowsPath
+import numpy as np
+import threading
 
 import sys, os
 sys.path.append('./')
 
 
-from lib.Miscellaneous              import getIPFromTxt, fixpath
+from lib.Miscellaneous              import getIPFromTxt, fixpath, epochToDate, freeFilename
 from lib.PyQt_miscellaneous         import QHLine, QVLine
 #from lib.Conversion_functions       import PT100_TvsR, ThermoBT_TvsR, ThermoNICO_TvsR, PT100_RvsT, C100_RvsT, RuO2_RvsT, ThermoBT_RvsT, ThermoHT_RvsT, ThermoNICOCAL_TvsR, ThermoBT_TvsR_spln, ThermoHT_TvsR_spln
-from lib.Conversion_functions       import convert_RtoT
+from lib.Conversion_functions       import getConverter, probeTypes
 from lib.ResistanceProbe_class      import ResistanceProbe
+from lib.AcquisitionWorker_class    import AcquisitionWorker
+from lib.ReplaySource_class         import ReplaySource, ReplayWorker
 from lib.MyRunningAnimation_class   import MyRunningAnimation
-from lib.Buffer_class               import Buffer
+from lib.ProbeDataStore_class       import ProbeDataStore
+from lib.ConversionCache_class      import ConversionCache
+from lib.DataWriter_class           import DataWriter
+from lib.DataArchive_class          import ArchiveWriter
+from lib.ProbeHistory_class         import ProbeHistory
+from lib.SeriesModel_class          import SeriesModel, SeriesView
+from lib.RenderScheduler_class      import RenderScheduler
+from lib.RequestTracker_class       import macrtChannel
+from lib.NetworkStats_class         import NetworkStats
+from lib.ProbeConfig_functions      import loadProbeConfig, makeProbeConfig
+from lib.ProbeTableModel_class      import ProbeTableModel, ProbeTypeDelegate
 
 import pyqtgraph                    as pg
 import pyqtgraph.dockarea           as pg_dock
 #import pyqtgraph.opengl as gl
 
 import PyQt5
-from PyQt5.QtWidgets    import QMainWindow, QWidget, QApplication, QPushButton, QToolButton, QStyle, QLabel, QCheckBox, QInputDialog, QComboBox, QFrame, QSpinBox, QDoubleSpinBox, QLineEdit, QTabWidget, QDockWidget, QFileDialog, QDialog
+from PyQt5.QtWidgets    import QMainWindow, QWidget, QApplication, QPushButton, QToolButton, QStyle, QLabel, QCheckBox, QInputDialog, QComboBox, QFrame, QSpinBox, QDoubleSpinBox, QLineEdit, QTabWidget, QDockWidget, QFileDialog, QDialog, QTableWidget, QTableWidgetItem, QTableView, QHeaderView, QAbstractItemView, QListWidget, QListWidgetItem
 from PyQt5.QtWidgets    import QHBoxLayout, QVBoxLayout, QGridLayout, QSplitter   # main layouts
 from PyQt5.QtGui        import QPixmap, QPaintDevice, QPainter, QIcon
-from PyQt5.QtCore       import Qt, QSize
+from PyQt5.QtCore       import Qt, QSize, QEvent, QTimer, pyqtSignal
+
+T_IMPORTED = time.time()
 
 ##############################################################################################################
 # FUNCTION
@@ -44,6 +58,7 @@ class MainWindow(QMainWindow):
     def __init__(self, **kwargs):
         super().__init__()
         self.verbose = kwargs.pop('verbose', False)
+        self.t_build = time.time()
         # ---  --- #
         self.main_widget = ThermometerMonitoring(verbose=self.verbose, **kwargs)
         self.setCentralWidget(self.main_widget)
@@ -53,6 +68,32 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(QIcon(self.path_abs+'icon.png'))
         self.setIconSize(QSize(32,32))
         self.show()
+        self.t_shown = time.time()
+        QTimer.singleShot(0, self.startupReport) # run once the event loop painted the first frame
+
+    def startupReport(self):
+        '''
+        * Print the startup timings with verbose: imports, build of the widgets step by step, and first paint.
+          The time of the first reading is printed by ThermometerMonitoring.recordResistance.
+        '''
+        self.t_painted = time.time()
+        if not self.verbose:
+            return
+        # ---  --- #
+        report  = 'Startup timing [s]:\n'
+        report += '    {0:<34s}{1:7.3f}\n'.format('imports', T_IMPORTED-T_START)
+        t_prev  = self.t_build
+        for step, t_ in self.main_widget.startup_times:
+            report += '    {0:<34s}{1:7.3f}\n'.format('build: '+step, t_-t_prev)
+            t_prev  = t_
+        report += '    {0:<34s}{1:7.3f}\n'.format('build: main window', self.t_shown-t_prev)
+        report += '    {0:<34s}{1:7.3f}\n'.format('first paint', self.t_painted-self.t_shown)
+        report += '    {0:<34s}{1:7.3f}'.format('total', self.t_painted-T_START)
+        print(report)
+
+    def closeEvent(self, event):
+        self.main_widget.stopAcquisition()
+        super().closeEvent(event)
 
 class ThermometerMonitoring(QWidget):
     '''
@@ -61,49 +102,118 @@ class ThermometerMonitoring(QWidget):
         - the time is measured in epoch (nbr of seconds since 01/01/1970 at 00:00:00), but is saved in a txt in local date time (YYYY-MM-DD_hh:mm:ss).
         - the probes are identified by an ID number.
     '''
+    conversion_done_sgnl = pyqtSignal(object, int, object, object, object) # probe_id, generation, temperatures, mask, store count, cf doConversionBuffer
+
     def __init__(self, **kwargs):
         super().__init__()
         self.path_abs = os.path.dirname(os.path.abspath(__file__)) + '/'
         self.verbose  = kwargs.pop('verbose', False)
         IP_list       = kwargs.pop('IP'     , None) # must be a dictionnary such as: {IP_name1:'192.168.x.xx', IP_name2:'192.168.x.xx', ...}
+        probe_config  = kwargs.pop('probe_config', self.path_abs+'probes_config.json') # json file of the probes, cf loadProbeConfig
+        replay_file       = kwargs.pop('replay'     , None) # archive 'tca' or txt file played in place of the probes, cf ReplayWorker, None -> live acquisition
+        self.replay_speed = kwargs.pop('replay_speed', 1.) # the replay is 'replay_speed' times faster than recorded, None or 0 -> as fast as possible
+        self.acquisition  = kwargs.pop('acquisition', 'worker') if not replay_file else 'worker' # 'worker' -> the probes are measured in an AcquisitionWorker thread, and the GUI drains its samples at display_fps. 'async' -> all the probes are queried at once in the GUI thread, the data being recorded when all the replies arrived. 'blocking' -> one blocking query per probe.
+        self.display_fps  = kwargs.pop('display_fps', 10) # Hz, max refresh rate of the display, cf RenderScheduler, and rate of the draining of the samples in 'worker' acquisition mode
+        self.drain_budget = kwargs.pop('drain_budget', 0.5) # fraction of the display period spent at most in a call of drainSamples, the rest being left to the paint
+        self.drain_slice  = kwargs.pop('drain_slice', 20) # nbr of ticks recorded between two checks of the drain budget, cf drainSamples
+        conversion_cache  = kwargs.pop('conversion_cache', False) # True -> the conversions R --> T are memoized by a ConversionCache
+        dR_quant          = kwargs.pop('dR_quant'   , 1e-3) # [Ohm], quantization of the resistances in the ConversionCache
+        self.N_async_conv = kwargs.pop('N_async_conv', 20000) # nbr of samples above which the buffer of a probe is reconverted in a thread
+        self.flush_interval = kwargs.pop('flush_interval', 5.0) # [s], period of the writing of the auto-save file
+        self.fsync        = kwargs.pop('fsync'      , 'never') # fsync policy of the auto-save file, cf DataWriter
+        self.history_dir  = kwargs.pop('history_dir', None) if not replay_file else None # directory of the ProbeHistory archive, eg in the save directory, None -> no history nor History dock
+        self.history_flush = kwargs.pop('history_flush', 1.0) # [s], period of the writing of the ProbeHistory archive
         # ---  --- #
+        self.lazy_plots   = kwargs.pop('lazy_plots' , True) # True -> the plot of a dock (probe plot, History) is built when the dock is shown for the first time, cf buildProbePlot
+        self.network_panel  = kwargs.pop('network_panel' , True) # True -> dock 'Network' with the metrics of the NetworkStats, cf makeNetworkWidget
+        self.network_log    = kwargs.pop('network_log'   , None) # json lines file where the NetworkStats are appended every net_log_interval, None -> no log
+        self.net_log_interval = kwargs.pop('net_log_interval', 600.) # [s]
+        # ---  --- #
+        self.startup_times = [] # (step, time at the end of the step) of the build, cf MainWindow.startupReport
+        self.lazy_widgets  = {} # widget --> function building its content when it is shown for the first time, cf eventFilter
+        self.t_first_reading = None
         self.date_time = '{0:04d}-{1:02d}-{2:02d}_{3:02d}:{4:02d}:{5:02d}'.format(*time.localtime()[:6])
         self.main_layout = QGridLayout()
         self.setLayout(self.main_layout) # setting the wrapper layout for the our widget
         # ---
         self.filename_dflt= 'Temp_evo_save_{0:d}_{1:02d}_{2:02d}'.format(*time.localtime()[:3]) # for automatique year_mounth_day filename
-        self.probe_type_L = ["Mobile BT" , "Mobile HT" , "PT100" , "Mobile BM" , "NICO BT CAL"]
+        self.probe_type_L = probeTypes() # probe types of the converter registry of Conversion_functions
+        self.converters   = {} # probe_id --> function R --> T for its probe type and T > 70 K state, cf updateConverter
+        self.cache_handles= {} # (probe_type, above70K) --> function R --> T through the ConversionCache
+        self.conversion_gen = {} # probe_id --> generation of the last reconversion of its buffer, cf doConversionBuffer
         self.N_buffer     = 50 # nbr of points in the local file data
-        self.buffer_data  = {}
+        self.N_buffer_max = int(1e5) # max buffer size, and capacity of the buffers up to N_samples_max samples in all, so that changing the buffer size does not reallocate them
+        self.N_samples_max= int(6e5) # nbr of samples preallocated for all the probes, beyond which the buffers are reallocated when they grow, cf makeBufferData
+        self.buffer_data  = None # ProbeDataStore, made in makeBufferData
+        self.auto_writer  = None # DataWriter of the auto-save, open while the auto-save is checked
+        self.auto_date    = None # (year, month, day) of the auto-save file
+        self.writer_class = {'txt':DataWriter, 'tca':ArchiveWriter} # save format --> writer, 'tca' being the chunked binary archive of DataArchive_class
+        self.history      = None # ProbeHistory, made in makeHistory
+        self.history_timer= pg.QtCore.QTimer()
+        self.net_stats    = NetworkStats() # network metrics of the queries of the probes, per probe and per host
+        self.net_log_timer= pg.QtCore.QTimer()
+        self.history_span = {'1 h':3600, '6 h':6*3600, '1 day':86400, '7 days':7*86400, 'all':None} # [s]
         self.fps          = 1 # Hz
         self.timer        = pg.QtCore.QTimer()
         self.isON         = False # bool for recordind state: True -> continuous recording, False -> no recording
         self.time_0       = self.getTime() # starting time in [s], which gives the reférence for the recording
         self.nbr_measure  = 0
         self.buffer_dflt  = -1
-        self.color_pallet = {0:'r', 1:'g', 2:'b', 3:'c', 4:'m', 5:'y', 6:'w', 7:'#7f7f7f'} #can be changed, see mkColor in pyqtgraph API reference #color_dflt = {'blue':'#1f77b4','orange':'#ff7f0e','green':'#2ca02c','red':'#d62728','purple':'#9467bd','brown':'#8c564b','pink':'#e377c2','gray':'#7f7f7f','y-green':'#bcbd22','b-teal':'#17becf'}
+        self.conv_cache   = ConversionCache(dR_quant=dR_quant, verbose=self.verbose) if conversion_cache else None
+        self.replay       = ReplaySource(replay_file, verbose=self.verbose) if replay_file else None
+        self.replay_done  = False # True once the end of the replay is reported, cf drainSamples
+        self.t_last_drain = None
+        self.n_drains     = {'budget':0, 'empty':0} # nbr of drains stopped by the drain budget with ticks left / having emptied the queue
         # ---
         if not IP_list:
             self.IP_dic   = getIPFromTxt(self.path_abs+'IPs_connection.txt')
         else:
             self.IP_dic   = IP_list
         # ---  --- #
-        self.probes       = ResistanceProbe(verbose=self.verbose)
-        id1 = self.probes.setProbe('Boite Mel'  , self.IP_dic['IP1'], 1)
-        id2 = self.probes.setProbe('Bouilleur'  , self.IP_dic['IP1'], 2)
-        id3 = self.probes.setProbe('Anneau 80mK', self.IP_dic['IP1'], 3)
-        id4 = self.probes.setProbe('Etage   4 K', self.IP_dic['IP3'], 1)
-        id5 = self.probes.setProbe('Etage  20 K', self.IP_dic['IP3'], 2)
-        id6 = self.probes.setProbe('Etage 100 K', self.IP_dic['IP3'], 3)
+        self.probes       = ResistanceProbe(stats=self.net_stats, verbose=self.verbose) # in 'worker' acquisition mode, only used for the probes settings, shared with the worker
+        self.probe_type_default = {} # probe_id --> probe type at startup
+        self.above70K_default   = {} # probe_id --> T > 70 K state at startup
+        self.probe_color        = {} # probe_id --> colour of its plots, see mkColor in pyqtgraph API reference
+        probes_config = loadProbeConfig(probe_config, self.IP_dic)
+        if self.replay is not None: # the probes of the recording, with the settings of probe_config for the ones of a txt file
+            probes_config = makeProbeConfig(self.replay.probeConfig(defaults=probes_config), self.IP_dic, replay_file)
+        for probe in probes_config:
+            probe_id = self.probes.setProbe(probe['name'], probe['IP'], probe['probe_nbr'])
+            self.probe_type_default[probe_id] = probe['probe_type']
+            self.above70K_default[probe_id]   = probe['above70K']
+            self.probe_color[probe_id]        = probe['color']
         # ---
         self.makeBufferData()
-        # ---
-        self.probe_type_default = {id1:"Mobile BT"         ,id2:"Mobile BT"         ,id3:"Mobile BT"         ,id4:"Mobile HT"         ,id5:"Mobile HT"         ,id6:"PT100"}
-        self.probe_color        = {id1:self.color_pallet[0],id2:self.color_pallet[1],id3:self.color_pallet[2],id4:self.color_pallet[3],id5:self.color_pallet[4],id6:self.color_pallet[5]}
+        self.markStartup('probes and buffers')
         # ---  --- #
         self.setUI()
+        self.makeRenderScheduler()
+        if not self.lazy_plots:
+            for widget in list(self.lazy_widgets):
+                self.lazy_widgets.pop(widget)()
+        self.markStartup('widgets')
+        self.makeHistory()
         # ---
         self.makeWidgetConnections()
+        self.markStartup('history and connections')
+        # ---  --- #
+        self.worker = None
+        if self.replay is not None:
+            high_water  = min(5000, max(2*self.drain_slice, int(2e5)//len(self.buffer_data.ids))) # about 2e5 samples queued at most
+            self.worker = ReplayWorker(self.replay, self.buffer_data.ids, speed=self.replay_speed, high_water=high_water, verbose=self.verbose)
+            self.worker.start()
+            self.timer.start(int(1e3/self.display_fps))
+        elif self.acquisition=='worker':
+            self.worker = AcquisitionWorker(self.probes.probes, fps=self.fps, stats=self.net_stats, verbose=self.verbose)
+            self.worker.start()
+            self.timer.start(int(1e3/self.display_fps)) # the timer drains the samples of the worker
+        self.scheduler.start()
+        if self.network_log:
+            self.net_log_timer.start(int(1e3*self.net_log_interval))
+        self.markStartup('acquisition')
+
+    def markStartup(self, step):
+        self.startup_times.append((step, time.time()))
 
     def setUI(self):
         self.layouts = {}
@@ -117,8 +227,6 @@ class ThermometerMonitoring(QWidget):
         self.makeGraphWidget()
         self.makeTopBarWidget()
         self.makeImageWidget()
-        # ---
-        #self.makeAllGraph()
         # ---  --- #
         graph_dock_wdg = QDockWidget(self) # or graph_dock.setDockWidget(graph_dock_wdg)
         graph_dock_wdg.setWidget(self.graph_dic['main_wdg'])
@@ -137,22 +245,44 @@ class ThermometerMonitoring(QWidget):
         # ---
         self.main_layout.addLayout(self.layouts['layout_1'], 0,0)
 
+    def makeRenderScheduler(self):
+        '''
+        * The display is repainted by a RenderScheduler at display_fps at most, whatever the acquisition rate.
+          The recorded ticks only mark the display as dirty, cf refreshDisplay.
+        * The plots are skipped by their SeriesView when hidden, and the 'views' task updates them when they
+          are shown again, eg when a dock is raised, cf eventFilter.
+        '''
+        self.scheduler = RenderScheduler(fps=self.display_fps, visible=lambda: self.isVisible() and not self.window().isMinimized(), verbose=self.verbose)
+        self.scheduler.addTask('values', self.setResistanceValue, visible=self.tempDispl['main_wdg'].isVisible)
+        self.scheduler.addTask('graphs', self.updateGraphs)
+        self.scheduler.addTask('views' , self.refreshAllViews)
+        self.scheduler.addTask('state' , self.topBar_dic['state'].nextState)
+        if self.network_panel:
+            self.scheduler.addTask('network', self.updateNetworkTable, visible=self.network_dic['wrapper'].isVisible)
+
+    def eventFilter(self, obj, event):
+        if event.type()==QEvent.Show:
+            if obj in self.lazy_widgets: # first show of a lazy widget
+                self.lazy_widgets.pop(obj)()
+            else: # a plot is shown, its views may have skipped some data while hidden
+                self.scheduler.markDirty('views')
+        return False
+
     def changeAllNameOfProbeId(self, probe_id, new_name):
         '''
         * Change the name of the probes everywhere it appears: checkboxes, in the legend of the graphs, etc ...
         '''
-        self.tempDispl['Devices'][probe_id]['label'].setText(new_name)
-        self.graph_dic['probes'][probe_id]['data'].opts.update( {'name':new_name} )
+        self.tempDispl['model'].nameChanged(probe_id)
+        self.updateSaveMetadata()
+        if probe_id==self.graph_dic['probe_plot']['probe_id']: # else the probe plot takes the new name when the probe is selected
+            self.setProbePlotName(new_name)
         # --- change name in check-box for the multiplot widget --- #
         for i, multiplot_name in enumerate(self.graph_dic['multiplots']):
-            self.graph_dic['multiplots'][multiplot_name]['plot_choice_lab'][probe_id].setText(new_name)
-        # --- change name of single plot Dock widget --- #
-        self.graph_dic['probes'][probe_id]['wrapper'].setTitle(new_name)
-        # --- change name in legends for the plotDataItems --- #
-        self.graph_dic['probes'][probe_id]['graph'].getPlotItem().legend.items[0][1].setText(new_name)
+            self.graph_dic['multiplots'][multiplot_name]['plot_choice_items'][probe_id].setText(new_name)
         # --- multiplot
         for i, multiplot_name in enumerate(self.graph_dic['multiplots']):
-            self.graph_dic['multiplots'][multiplot_name]['data_items'][probe_id].setData(name=new_name)
+            if probe_id in self.graph_dic['multiplots'][multiplot_name]['data_items']: # else not plotted yet, cf setPlot
+                self.graph_dic['multiplots'][multiplot_name]['data_items'][probe_id].setData(name=new_name)
 
     def saveData(self, filename):
         '''
@@ -162,46 +292,81 @@ class ThermometerMonitoring(QWidget):
             t1_0      R1_0         t2_0      R2_0         t3_0       R3_0 ...
                               .     .     .
         where the t_i are the time, and Ri_j are the measured resistance at ti_j.
+        * The ticks of the buffer are given to a DataWriter, which writes them in its thread. Only the
+          ticks actually recorded are saved, not the default values of a buffer not yet full.
+        * With the 'tca' format, the data are saved in the chunked binary archive of ArchiveWriter, with the
+          validity of the samples and the metadata of the probes, and can be read by ArchiveReader.
+        * If filename already exists, the data are saved in filename_1, filename_2, ...
         '''
         format_  = self.topBar_dic['Data_save_type'].currentText()
         path     = self.topBar_dic['save_dir_label'].text() + r'/'
         # --- check if directory exists
         if not os.path.isdir(path): # if directory does not exist because the date changed.
             os.mkdir(path)
-        # --- check if file already exists --- #
-        filename_L = os.listdir(path)
-        # ---
-        same_count = np.array([filename in fname_var for fname_var in filename_L]).sum() # check if a file has a filename contained in it.
-        if same_count!=0:
-            # ---
-            filename  += '_{:d}'.format(same_count)
-        elif self.topBar_dic['auto_save'].isChecked():
-            filename  += '_{:d}'.format(0) # add _0 to the auto_save filename if none already exists.
-        # ---
-        path_to_file = '{}{}.{}'.format(path,filename,format_)
-        # ---  --- #
-        if format_ == 'txt':
-            if not os.path.isfile(path_to_file): # if the file doesn't exist
-                str_write  = '# filename={0}\n#time_start_date={1}, time_start_epoch={2}'.format(filename, self.date_time, self.time_0)
-                str_write += '\n#'
-                for i,key in enumerate(self.probes.probes):
-                    str_write += 'time\t{0}(R)\t{1}(T)\t'.format(self.probes.probes[key]['name'].replace(' ', '_'), self.probes.probes[key]['name'].replace(' ', '_'))
-                str_write += '\n'
-            else:
-                str_write = ''
-            # ---  --- #
-            with open(path_to_file, 'a+') as f:
-                # ---  --- #
-                for j in range(self.N_buffer):
-                    for i,key in enumerate(self.probes.probes):
-                        t_date = self.epochToDate(self.buffer_data[key]['buffer']['time'][j]) if self.buffer_data[key]['buffer']['time'][j]!=-1 else 'None'
-                        str_write += '{0:}\t{1:}\t{2:}\t'.format(t_date, self.buffer_data[key]['buffer']['resistance'][j], self.buffer_data[key]['buffer']['temperature'][j])
-                    # ---  --- #
-                    str_write += '\n'
-                # ---
-                f.write(str_write+'\n')
-        elif  format_ == 'asdf':
-            pass
+        # ---  --- #
+        filename = freeFilename(path, filename, format_)
+        writer   = self.makeWriter('{}{}.{}'.format(path,filename,format_), format_)
+        filled   = self.buffer_data.filled().all(axis=0)
+        writer.appendBlock(*[self.buffer_data.view(key)[:, filled] for key in ['time', 'resistance', 'temperature', 'valid']])
+        writer.close(wait=False)
+
+    def makeWriter(self, path_to_file, format_, **kwargs):
+        return self.writer_class[format_](path_to_file, self.probeNames(), metadata=self.probeMetadata(), date_time=self.date_time, time_0=self.time_0, verbose=self.verbose, **kwargs)
+
+    def probeNames(self):
+        return [self.probes.probes[probe_id]['name'] for probe_id in self.buffer_data.ids]
+
+    def probeMetadata(self):
+        '''
+        * Returns the settings of the probes, in the order of the slots, to be saved with the data.
+        '''
+        metadata = []
+        for probe_id in self.buffer_data.ids:
+            probe = self.probes.probes[probe_id]
+            metadata.append({'name':probe['name'], 'IP':probe['IP'], 'probe_nbr':probe['probe_nbr'], 'channel':macrtChannel(probe['probe_nbr']),
+                             'probe_type':self.tempDispl['model'].probeType(probe_id), 'above70K':self.tempDispl['model'].above70K(probe_id)})
+        # ---  --- #
+        return metadata
+
+    def updateSaveMetadata(self):
+        '''
+        * Rewrite the settings of the probes in the header of the archives being recorded.
+        '''
+        for writer in [self.auto_writer, self.history]:
+            if writer is not None:
+                writer.updateMetadata(self.probeMetadata())
+
+    def toggleAutoSave(self, state):
+        '''
+        * When the auto-save is checked, each tick recorded is streamed by a DataWriter in the file
+          auto_save_YYYY-MM-DD_k of the save directory, in the chosen format, a new file being opened each day.
+        '''
+        if self.auto_writer is not None:
+            self.auto_writer.close(wait=False)
+            self.auto_writer = None
+        # ---  --- #
+        if state:
+            path     = self.topBar_dic['save_dir_label'].text() + r'/'
+            if not os.path.isdir(path):
+                os.mkdir(path)
+            format_          = self.topBar_dic['Data_save_type'].currentText()
+            self.auto_date   = time.localtime()[:3]
+            filename         = freeFilename(path, 'auto_save_{0:04d}-{1:02d}-{2:02d}'.format(*self.auto_date), format_, start=0)
+            self.auto_writer = self.makeWriter('{}{}.{}'.format(path, filename, format_), format_, flush_interval=self.flush_interval, fsync=self.fsync)
+            print( 'Auto-save in : {}'.format(self.auto_writer.path_to_file) )
+
+    def autoSaveTick(self, t_L, res_L, temp_L, valid_L):
+        if self.auto_writer is None:
+            return
+        # ---  --- #
+        try:
+            if time.localtime()[:3]!=self.auto_date:
+                self.toggleAutoSave(True)
+            self.auto_writer.append(t_L, res_L, temp_L, valid_L)
+        except OSError as error: # the file cannot be written anymore, eg full disk, cf DataWriter
+            print('[{0:s}] Error in autoSaveTick: the auto-save stopped: {1}'.format(epochToDate(time.time())[:-4], error))
+            self.topBar_dic['auto_save'].setToolTip('Auto-save stopped: {}'.format(error))
+            self.topBar_dic['auto_save'].setChecked(False) # closes the writer, cf toggleAutoSave
 
     def chooseNewDirectory(self, filedialog, label):
         new_path = filedialog.getExistingDirectory()
@@ -215,7 +380,9 @@ class ThermometerMonitoring(QWidget):
         return f
 
     def makeWidgetConnections(self):
-        self.timer.timeout.connect(self.update_record)
+        self.timer.timeout.connect(self.drainSamples if self.acquisition=='worker' else self.update_record)
+        self.conversion_done_sgnl.connect(self.writeConversionBuffer)
+        self.probes.sweep_done_sgnl.connect(self.recordResistance)
         # ---
         self.topBar_dic['play_bttn'].clicked.connect(self.startStop_continuous_record)
         self.topBar_dic['step_bttn'].clicked.connect(self.update_record)
@@ -223,31 +390,44 @@ class ThermometerMonitoring(QWidget):
         self.topBar_dic['fps_input'].valueChanged.connect(self.setTimeWindowLabel)
         self.topBar_dic['save_dir_bttn'].clicked.connect( lambda : self.chooseNewDirectory(self.topBar_dic['save_dir'], self.topBar_dic['save_dir_label']) )
         self.topBar_dic['save_bttn'].clicked.connect( lambda : self.saveData(filename=self.topBar_dic['save_file'].text()) )
+        self.topBar_dic['auto_save'].stateChanged.connect(self.toggleAutoSave)
         # ---
         #self.tempDispl['Temp_thresh'].stateChanged.connect(self.setResistanceValue)
         #self.tempDispl['Temp_thresh'].stateChanged.connect(lambda: next(self.doConversionBuffer(self.tempDispl['Devices'][probe]) for probe in self.tempDispl['Devices']) )
-        for i,probe_id in enumerate(self.tempDispl['Devices']):
-            self.tempDispl['Devices'][probe_id]['resistance'].valueChanged.connect(       self.func_factory(self.doConversion      , probe_id))
-            self.tempDispl['Devices'][probe_id]['probe_type'].currentIndexChanged.connect(self.func_factory(self.doConversion      , probe_id))
-            self.tempDispl['Devices'][probe_id]['probe_type'].currentIndexChanged.connect(self.func_factory(self.doConversionBuffer, probe_id))
-            self.tempDispl['Devices'][probe_id]['probe_type'].currentIndexChanged.connect(self.func_factory(self.toggleThreshButton, probe_id)) # enable/disable the threshold button
-            self.tempDispl['Devices'][probe_id]['Temp_thresh'].stateChanged.connect(self.setResistanceValue)
-            self.tempDispl['Devices'][probe_id]['Temp_thresh'].stateChanged.connect(self.func_factory(self.doConversionBuffer, probe_id) )
-            # ---
-            self.tempDispl['Devices'][probe_id]['label'].clicked.connect( self.func_factory(self.probes.exec_interface, probe_id) )
+        for i,probe_id in enumerate(self.probes.probes):
+            self.updateConverter(probe_id)
+        self.tempDispl['model'].probe_type_sgnl.connect(self.updateConverter) # must be connected first, the slots being called in the connection order
+        self.tempDispl['model'].above70K_sgnl.connect(  self.updateConverter)
+        self.tempDispl['model'].resistance_sgnl.connect(self.doConversion)
+        self.tempDispl['model'].probe_type_sgnl.connect(self.doConversion)
+        self.tempDispl['model'].probe_type_sgnl.connect(self.doConversionBuffer)
+        self.tempDispl['model'].above70K_sgnl.connect(  self.doConversion)
+        self.tempDispl['model'].above70K_sgnl.connect(  self.doConversionBuffer)
+        # ---
+        self.tempDispl['view'].clicked.connect( self.probeTableClicked )
+        self.tempDispl['view'].selectionModel().currentRowChanged.connect( self.probeTableRowChanged )
         # ---
         self.graph_dic['data_display'].currentIndexChanged.connect( self.updateGraphDisplayStyle )
+        self.graph_dic['data_display'].currentIndexChanged.connect( self.updateHistory )
+        self.graph_dic['data_display'].currentIndexChanged.connect( lambda idx: self.scheduler.markDirty('graphs') )
+        self.history_dic['span'].currentIndexChanged.connect( self.followHistory )
+        self.history_dic['follow'].stateChanged.connect( self.followHistory )
+        self.history_timer.timeout.connect( self.followHistory )
+        self.net_log_timer.timeout.connect( self.dumpNetworkStats )
         self.graph_dic['buffer_size'].valueChanged.connect(self.changeBufferSize)
         self.graph_dic['buffer_size'].valueChanged.connect(self.setTimeWindowLabel)
         # ---
         self.probes.interface.probe_info_sgnl.connect( lambda id,name,IP,probe_nbr: self.changeAllNameOfProbeId(id, name) )
 
     def makeBufferData(self):
-        self.buffer_data['data_type'] = {'resistance':1, 'temperature':2}
-        # ---  --- #
-        for i,key in enumerate(self.probes.probes):
-            self.buffer_data[key] = {'last'  : {'time':None, 'resistance':self.buffer_dflt},
-                                     'buffer': {'time': Buffer([self.buffer_dflt]*self.N_buffer), 'resistance': Buffer([self.buffer_dflt]*self.N_buffer), 'temperature': Buffer([self.buffer_dflt]*self.N_buffer)}}
+        '''
+        * The data of all the probes are stored in a single ProbeDataStore, where each probe ID has a slot,
+          i.e a row of the (n_probes, N_buffer) arrays of time, resistance, temperature and validity.
+        * The capacity of the buffers is N_buffer_max for a few probes, and shrinks so that the store holds
+          N_samples_max samples when there are many probes, the buffers being reallocated if they grow beyond.
+        '''
+        capacity         = min(self.N_buffer_max, max(self.N_buffer, self.N_samples_max//max(len(self.probes.probes), 1)))
+        self.buffer_data = ProbeDataStore(self.probes.probes, length=self.N_buffer, capacity=capacity, default_val=self.buffer_dflt)
 
     def makeTopBarWidget(self):
         self.topBar_dic = {}
@@ -262,7 +442,7 @@ class ThermometerMonitoring(QWidget):
         self.topBar_dic['save_file']      = QLineEdit(self.filename_dflt)
         self.topBar_dic['save_file'].setMinimumWidth(200)
         self.topBar_dic['Data_save_type'] = QComboBox()
-        self.topBar_dic['Data_save_type'].addItems(['txt', 'asdf (to do)'])
+        self.topBar_dic['Data_save_type'].addItems(list(self.writer_class))
         self.topBar_dic['Data_save_type'].setMaximumWidth(80)
         self.topBar_dic['auto_save']      = QCheckBox()
         self.topBar_dic['auto_save'].setTristate(False)
@@ -307,14 +487,21 @@ class ThermometerMonitoring(QWidget):
         self.topBar_dic['main_wdg'].setLayout(self.topBar_dic['layout'])
 
     def makeImageWidget(self):
+        '''
+        * The image is loaded when the label is shown for the first time, cf loadImage, so that it does not
+          delay the first frame.
+        '''
         self.image  = QLabel(self)
-        pixmap      = QPixmap(self.path_abs+"cryoptics2.png")
         # ---  --- #
         #pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.FastTransformation)
         self.image.setScaledContents(True)
         self.image.setMinimumSize(10, 10)
         # ---  --- #
-        self.image.setPixmap(pixmap)
+        self.lazy_widgets[self.image] = self.loadImage
+        self.image.installEventFilter(self)
+
+    def loadImage(self):
+        QTimer.singleShot(0, lambda: self.image.setPixmap(QPixmap(self.path_abs+"cryoptics2.png"))) # after the paint of the frame showing the label
 
     def makeTestConvertion(self):
         '''
@@ -331,32 +518,43 @@ class ThermometerMonitoring(QWidget):
         return wdg_wrapper
 
     def makeTemperatureDisplayWidget(self):
+        '''
+        * Table of the probes, shown by a QTableView of a ProbeTableModel: only the visible rows are painted, and
+          there is no widget per probe, so that the display costs the same for 6 or 200 probes.
+        * A click on the name of a probe opens its settings, the type and the resistance (to test the conversion)
+          are edited with a double click, cf ProbeTableModel.
+        '''
         self.tempDispl               = {}
         self.tempDispl['main_wdg']   = QFrame()
         self.tempDispl['layout']     = QVBoxLayout()
-        self.tempDispl['layout_grid']= QGridLayout()
-        self.tempDispl['Devices']    = {}
+        self.tempDispl['model']      = ProbeTableModel(self.probes.probes, self.buffer_data.ids, self.probe_type_default, self.above70K_default, self.probe_color, parent=self)
+        self.tempDispl['view']       = QTableView()
         # ---  --- #
-        #self.tempDispl['Devices']['Manip']       = self.makeTemperatureDevice("Manip")
-        for i, probe_id in enumerate(self.probes.probes):
-            self.tempDispl['Devices'][probe_id] = self.makeTemperatureDevice(probe_id)
-        # ---
-        for i,key in enumerate(self.tempDispl['Devices']):
-            for k,wdg in enumerate(self.tempDispl['Devices'][key]):
-                self.tempDispl['layout_grid'].addWidget(self.tempDispl['Devices'][key][wdg], i, k)
-            # ---  --- #
-            idx = self.tempDispl['Devices'][key]['probe_type'].findText(self.probe_type_default[key])
-            self.tempDispl['Devices'][key]['probe_type'].setCurrentIndex(idx)
+        self.tempDispl['view'].setModel(self.tempDispl['model'])
+        self.tempDispl['view'].setItemDelegateForColumn(ProbeTableModel.COL_TYPE, ProbeTypeDelegate(self.probe_type_L, self.tempDispl['view']))
+        self.tempDispl['view'].setSelectionBehavior(QAbstractItemView.SelectRows) # the current row is the probe of the probe plot
+        self.tempDispl['view'].setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tempDispl['view'].verticalHeader().setVisible(False)
+        self.tempDispl['view'].verticalHeader().setSectionResizeMode(QHeaderView.Fixed) # no measure of the height of each row
+        self.tempDispl['view'].horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.tempDispl['view'].horizontalHeader().setStretchLastSection(True)
+        self.tempDispl['view'].setColumnWidth(ProbeTableModel.COL_NAME, 140)
+        self.tempDispl['view'].setColumnWidth(ProbeTableModel.COL_TYPE, 130)
         # ---  --- #
-        layout_inter = QHBoxLayout()
-        # ---
-        self.tempDispl['layout'].addLayout(layout_inter)
         self.tempDispl['layout'].addWidget(QHLine())
-        self.tempDispl['layout'].addLayout(self.tempDispl['layout_grid'])
+        self.tempDispl['layout'].addWidget(self.tempDispl['view'])
         self.tempDispl['layout'].addWidget(QHLine())
         # ---
         self.tempDispl['main_wdg'].setLayout(self.tempDispl['layout'])
 
+    def probeTableClicked(self, index):
+        if index.column()==ProbeTableModel.COL_NAME:
+            self.probes.exec_interface(self.tempDispl['model'].probeAt(index))
+
+    def probeTableRowChanged(self, current, previous):
+        if current.isValid():
+            self.selectProbePlot(self.tempDispl['model'].probeAt(current))
+
     def makeTemperatureDevice(self, probe_id, no_probe=False):
         tempProb = {}
         # ---
@@ -402,7 +600,6 @@ class ThermometerMonitoring(QWidget):
         plot_name  = self.probes.probes[key_probe]['name'] if not plot_name else None
         # ---  --- #
         graph_wdg  = pg.PlotWidget(title="")
-        graph_nbr  = len(self.graph_dic['probes'].keys())
         graph_data = pg.PlotDataItem(name=plot_name)#, symbol='o')
         graph_viewbox  = graph_wdg.getViewBox()
         # ---  --- #
@@ -426,8 +623,12 @@ class ThermometerMonitoring(QWidget):
     def makeMultiPlotWidget(self, multiplot_name):
         '''
         * Generate a widget with a PlotWidget that will contains the different curve from PlotDataItem.
-          However I haven't found a way to use the same PlotDataItem than for the single plots in the Tab widgets,
-          because when we addItem in the multiplot PlotWidget, it removes the PlotDataItem from the previous widget.
+          A PlotDataItem can not be shared with the probe plot, because when we addItem in the
+          multiplot PlotWidget, it removes the PlotDataItem from the previous widget. Thus each PlotDataItem is a
+          SeriesView subscribed to the SeriesModel of its probe, which shares the data without copying them, and
+          which only works when the multiplot is visible and the probe is checked.
+        * The probes are chosen in a list of check boxes without widget per probe, and the PlotDataItem of a probe
+          is only made when it is checked for the first time, cf setPlot.
         '''
         multiplot = {}
         multiplot['main_wdg']        = pg_dock.Dock(multiplot_name, closable=True)
@@ -435,32 +636,32 @@ class ThermometerMonitoring(QWidget):
         graph_wdg, graph_data        = self.makePlotWidget(multiplot_name, plot_name=multiplot_name, insert_plotData=False) #pg.PlotWidget()
         multiplot['graph']           = graph_wdg
         multiplot['data_items']      = {}
+        multiplot['views']           = {}
+        multiplot['checked']         = set() # probe_id of the probes plotted
         multiplot['plot_choice_wdg'] = QWidget()
-        multiplot['plot_choice_lyt'] = QGridLayout()
-        multiplot['plot_choice_box'] = {}
-        multiplot['plot_choice_lab'] = {}
+        multiplot['plot_choice_lyt'] = QVBoxLayout()
+        multiplot['plot_choice']     = QListWidget()
+        multiplot['plot_choice_items'] = {}
         wrapper = QSplitter(Qt.Horizontal)
         # ---  --- #
         for i,key in enumerate(self.probes.probes):
-            multiplot['data_items'][key] = pg.PlotDataItem(name=self.probes.probes[key]['name'])
-            multiplot['data_items'][key].setPen(pg.mkColor(self.probe_color[key]))
-            # ---  --- #
-            multiplot['plot_choice_lab'][key] = QLabel(self.probes.probes[key]['name'])
-            multiplot['plot_choice_box'][key] = QCheckBox()
-            multiplot['plot_choice_box'][key].setTristate(False)
-            multiplot['plot_choice_box'][key].setCheckState(Qt.Unchecked) # Qt.Unchecked <-> 0 , Qt.PartiallyChecked <-> 1 , Qt.Checked <-> 2
-            # ---  --- #
-            multiplot['plot_choice_lyt'].addWidget(multiplot['plot_choice_lab'][key], i, 0)
-            multiplot['plot_choice_lyt'].addWidget(multiplot['plot_choice_box'][key], i, 1)
-            # ---  --- #
-            multiplot['plot_choice_box'][key].stateChanged.connect( self.func_factory(self.setPlot, multiplot, key))#lambda: self.setPlot(multiplot, key) )
+            item = QListWidgetItem(self.probes.probes[key]['name'])
+            item.setData(Qt.UserRole, key)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked) # Qt.Unchecked <-> 0 , Qt.PartiallyChecked <-> 1 , Qt.Checked <-> 2
+            multiplot['plot_choice_items'][key] = item
+            multiplot['plot_choice'].addItem(item)
+        multiplot['plot_choice'].itemChanged.connect( lambda item: self.setPlot(multiplot, item.data(Qt.UserRole)) )
         # ---  --- #
         multiplot['plot_cscale'] = QComboBox()
         multiplot['plot_cscale'].addItems(['lin', 'log'])
         multiplot['plot_cscale'].currentIndexChanged.connect( lambda idx: self.changePlotScale(multiplot['graph'], idx) )
+        multiplot['graph'].getViewBox().sigXRangeChanged.connect( self.func_factory(self.refreshViews, multiplot['views']) )
+        multiplot['graph'].installEventFilter(self)
         multiplot['main_wdg'].sigClosed.connect( self.func_factory(self.closeMultiPlotWidget, multiplot_name) )
         # ---
-        multiplot['plot_choice_lyt'].addWidget(multiplot['plot_cscale'], i+1, 0, 1, 2) # take i the last argument of the for loop
+        multiplot['plot_choice_lyt'].addWidget(multiplot['plot_choice'])
+        multiplot['plot_choice_lyt'].addWidget(multiplot['plot_cscale'])
         # ---
         #wrapper.addWidget(multiplot['plot_choice_wdg'])
         #wrapper.addWidget(multiplot['graph'])
@@ -491,24 +692,29 @@ class ThermometerMonitoring(QWidget):
         self.graph_dic['data_display'] = QComboBox()
         self.graph_dic['data_display'].addItems(['temperature','resistance'])
         self.graph_dic['buffer_size']  = QSpinBox()
-        self.graph_dic['buffer_size'].setRange(1, 1e5)
+        self.graph_dic['buffer_size'].setRange(1, self.N_buffer_max)
         self.graph_dic['buffer_size'].setMaximumWidth(200)
         self.graph_dic['buffer_size'].setValue(self.N_buffer)
         self.graph_dic['time_window']  = QLabel()
         self.setTimeWindowLabel()
         # ---  --- #
-        self.graph_dic['probes']       = {}
-        for i, probe_id in enumerate(self.tempDispl['Devices']):
-            graph_wdg, graph_data = self.makePlotWidget(probe_id)
-            self.graph_dic['probes'][probe_id] = {}
-            self.graph_dic['probes'][probe_id]['graph'] = graph_wdg # store for future use
-            self.graph_dic['probes'][probe_id]['data']  = graph_data
-            # ---  --- #
-            wrapper   = pg_dock.Dock(self.probes.probes[probe_id]['name'])
-            wrapper.addWidget(self.graph_dic['probes'][probe_id]['graph'])
-            self.graph_dic['probes'][probe_id]['wrapper'] = wrapper
-            # ---  --- #
-            self.graph_dic['dock_wdg'].addDock(wrapper, 'below')
+        self.graph_dic['series']       = {} # one SeriesModel per probe, shared by the probe plot and the multiplots
+        for i, probe_id in enumerate(self.probes.probes):
+            self.graph_dic['series'][probe_id] = SeriesModel()
+        # --- a single dock for the probe selected in the table, whatever the nbr of probes --- #
+        probe_id = next(iter(self.probes.probes))
+        self.graph_dic['probe_plot']   = {'probe_id':probe_id, 'graph':None, 'data':None, 'view':None} # made by buildProbePlot
+        self.graph_dic['probe_plot']['wrapper'] = pg_dock.Dock(self.probes.probes[probe_id]['name'])
+        self.lazy_widgets[self.graph_dic['probe_plot']['wrapper']] = self.buildProbePlot
+        self.graph_dic['probe_plot']['wrapper'].installEventFilter(self)
+        self.graph_dic['dock_wdg'].addDock(self.graph_dic['probe_plot']['wrapper'], 'below')
+        self.makeHistoryWidget()
+        if self.history_dir:
+            self.graph_dic['dock_wdg'].addDock(self.history_dic['wrapper'], 'below')
+        if self.network_panel:
+            self.makeNetworkWidget()
+            self.graph_dic['dock_wdg'].addDock(self.network_dic['wrapper'], 'below')
+        self.graph_dic['probe_plot']['wrapper'].raiseDock()
         # ---  --- #
         self.addMultiPlot('multiplot_0')
         # ---  --- #
@@ -534,62 +740,280 @@ class ThermometerMonitoring(QWidget):
         self.graph_dic['layout'].addWidget(sublayout)
         self.graph_dic['main_wdg'].setLayout(self.graph_dic['layout'])
 
-    def makeAllGraph(self):
+    def buildProbePlot(self):
         '''
+        * Build the probe plot in its dock, with a SeriesView subscribed to the SeriesModel of the selected probe.
+          Called when the dock is shown for the first time, so that a hidden dock costs nothing at startup.
         '''
-        for i, key in enumerate(self.tempDispl['Devices']):
-            self.graph_dic['tab_wdg'].addTab(self.graph_dic['probes'][key]['graph'], key)
+        probe_plot = self.graph_dic['probe_plot']
+        probe_plot['graph'], probe_plot['data'] = self.makePlotWidget(probe_plot['probe_id'])
+        probe_plot['view'] = self.graph_dic['series'][probe_plot['probe_id']].subscribe(SeriesView(probe_plot['data'], probe_plot['graph']))
+        self.setGraphDisplayStyle(probe_plot['graph'])
+        # ---  --- #
+        probe_plot['graph'].getViewBox().sigXRangeChanged.connect(self.refreshProbePlot) # zoom/pan of a plot changes its level of detail
+        probe_plot['graph'].installEventFilter(self)
+        probe_plot['wrapper'].addWidget(probe_plot['graph'])
+        # ---  --- #
+        if hasattr(self, 'scheduler'):
+            self.scheduler.markDirty('views')
 
-    def update_record(self):
-        self.nbr_measure += 1
+    def selectProbePlot(self, probe_id):
+        '''
+        * Show probe_id in the probe plot. The SeriesView of the previous probe is unsubscribed and a new one is
+          subscribed to the SeriesModel of probe_id, so that only the selected probe is decimated and drawn.
+        '''
+        probe_plot = self.graph_dic['probe_plot']
+        if probe_id==probe_plot['probe_id']:
+            return
+        # ---  --- #
+        if probe_plot['graph'] is not None: # else the plot is built for the probe selected when it is shown
+            self.graph_dic['series'][probe_plot['probe_id']].unsubscribe(probe_plot['view'])
+            probe_plot['view'] = self.graph_dic['series'][probe_id].subscribe(SeriesView(probe_plot['data'], probe_plot['graph']))
+            probe_plot['data'].setPen(pg.mkColor(self.probe_color[probe_id]))
+        probe_plot['probe_id'] = probe_id
+        self.setProbePlotName(self.probes.probes[probe_id]['name'])
+        self.refreshProbePlot()
+
+    def setProbePlotName(self, name):
+        probe_plot = self.graph_dic['probe_plot']
+        probe_plot['wrapper'].setTitle(name)
+        if probe_plot['graph'] is not None:
+            probe_plot['data'].opts.update( {'name':name} )
+            probe_plot['graph'].getPlotItem().legend.items[0][1].setText(name)
+
+    def refreshProbePlot(self, *args):
+        if self.graph_dic['probe_plot']['view'] is not None:
+            self.refreshViews({self.graph_dic['probe_plot']['probe_id']:self.graph_dic['probe_plot']['view']})
+
+    def makeHistoryWidget(self):
+        '''
+        * Dock with the plot of the ProbeHistory, whose data are read from the disk for the visible time range
+          only, so that one can scroll back through the whole run.
+        * With 'Follow', the plot shows the last 'span' of the history, and is refreshed periodically.
+        '''
+        self.history_dic = {}
+        self.history_dic['wrapper'] = pg_dock.Dock('History')
+        self.history_dic['layout']  = pg.LayoutWidget()
+        self.history_dic['span']    = QComboBox()
+        self.history_dic['span'].addItems(list(self.history_span))
+        self.history_dic['follow']  = QCheckBox('Follow')
+        self.history_dic['follow'].setChecked(True)
+        self.history_dic['graph']   = None # made by buildHistoryPlot, when the dock is shown for the first time
+        self.history_dic['data_items'] = {}
+        # ---  --- #
+        self.history_dic['layout'].addWidget(QLabel('Span: ')             , row=0, col=0)
+        self.history_dic['layout'].addWidget(self.history_dic['span']     , row=0, col=1)
+        self.history_dic['layout'].addWidget(self.history_dic['follow']   , row=0, col=2)
+        self.history_dic['wrapper'].addWidget(self.history_dic['layout'])
+        # ---  --- #
+        self.lazy_widgets[self.history_dic['wrapper']] = self.buildHistoryPlot
+        self.history_dic['wrapper'].installEventFilter(self)
+
+    def buildHistoryPlot(self):
+        graph_wdg, graph_data       = self.makePlotWidget(None, plot_name='History', insert_plotData=False)
+        self.history_dic['graph']   = graph_wdg
+        # ---  --- #
+        for i, probe_id in enumerate(self.probes.probes):
+            self.history_dic['data_items'][probe_id] = pg.PlotDataItem(name=self.probes.probes[probe_id]['name'])
+            self.history_dic['data_items'][probe_id].setPen(pg.mkColor(self.probe_color[probe_id]))
+            graph_wdg.addItem(self.history_dic['data_items'][probe_id])
+        graph_wdg.getViewBox().disableAutoRange(pg.ViewBox.XAxis) # the X range is the one of the data read, which must not change it
+        graph_wdg.getViewBox().enableAutoRange(pg.ViewBox.YAxis, enable=True)
+        graph_wdg.getViewBox().sigXRangeChanged.connect( self.updateHistory )
+        # ---  --- #
+        self.history_dic['layout'].addWidget(self.history_dic['graph']    , row=1, col=0, colspan=4)
+        QTimer.singleShot(0, self.followHistory)
+
+    def makeNetworkWidget(self):
+        '''
+        * Dock with the network metrics of the NetworkStats, one row per probe and per MacRT host: queries sent,
+          replies, timeouts and loss rate, discarded replies, values reused after a failed query, and percentiles
+          of the round trip time. The table is built when the dock is shown for the first time, and refreshed by
+          the 'network' task of the RenderScheduler while visible.
+        '''
+        self.network_dic = {}
+        self.network_dic['wrapper'] = pg_dock.Dock('Network')
+        self.network_dic['table']   = None # made by buildNetworkTable
+        self.network_dic['columns'] = [('sent', 'sent'), ('replies', 'replies'), ('timeouts', 'timeouts'), ('loss', 'loss'), ('malformed', 'malformed'),
+                                       ('stale', 'stale'), ('duplicate', 'duplicate'), ('unknown', 'unknown'), ('stale_values', 'reused'),
+                                       ('rtt_p50', 'RTT p50 [ms]'), ('rtt_p90', 'RTT p90 [ms]'), ('rtt_p99', 'RTT p99 [ms]'), ('rtt_max', 'RTT max [ms]')]
+        # ---  --- #
+        self.lazy_widgets[self.network_dic['wrapper']] = self.buildNetworkTable
+        self.network_dic['wrapper'].installEventFilter(self)
+
+    def buildNetworkTable(self):
+        self.network_dic['table'] = QTableWidget(0, len(self.network_dic['columns']))
+        self.network_dic['table'].setHorizontalHeaderLabels([label for key, label in self.network_dic['columns']])
+        self.network_dic['table'].setEditTriggers(QTableWidget.NoEditTriggers)
+        self.network_dic['wrapper'].addWidget(self.network_dic['table'])
+        # ---  --- #
+        self.updateNetworkTable()
+
+    def updateNetworkTable(self):
+        if self.network_dic['table'] is None:
+            return
+        # ---  --- #
+        snapshot = self.net_stats.snapshot(self.netStatsNames())
+        rows     = list(snapshot['probes'].items()) + list(snapshot['hosts'].items())
+        table    = self.network_dic['table']
+        if table.rowCount()!=len(rows):
+            table.setRowCount(len(rows))
+        table.setVerticalHeaderLabels([name for name, summary in rows])
+        # ---  --- #
+        for i, (name, summary) in enumerate(rows):
+            for j, (key, label) in enumerate(self.network_dic['columns']):
+                value = summary[key]
+                if   key=='rtt_max':
+                    value = '{:.1f}'.format(value*1e3) if summary['replies'] else '-'
+                elif value is None:
+                    value = '-'
+                elif key=='loss':
+                    value = '{:.1%}'.format(value)
+                elif key.startswith('rtt'):
+                    value = '{:.2f}'.format(value*1e3)
+                table.setItem(i, j, QTableWidgetItem(str(value)))
+
+    def netStatsNames(self):
+        return {probe_id:self.probes.probes[probe_id]['name'] for probe_id in self.probes.probes}
+
+    def dumpNetworkStats(self):
+        '''
+        * Append the NetworkStats to the network log, cf NetworkStats.dump.
+        '''
+        try:
+            self.net_stats.dump(self.network_log, self.netStatsNames())
+        except OSError as error:
+            print('Error: cannot write the network log {0}: {1}'.format(self.network_log, error))
+
+    def makeHistory(self):
+        '''
+        * Record all the ticks in a ProbeHistory in history_dir, named after the starting date of the app. The
+          history is opt-in (--history-dir dir/), its size growing with the length of the run, cf ProbeHistory.
+        '''
+        if not self.history_dir:
+            return
+        if not os.path.isdir(self.history_dir):
+            os.makedirs(self.history_dir)
+        # ---  --- #
+        filename     = freeFilename(self.history_dir, 'history_{}'.format(self.date_time.replace(':', '-')), 'tca')
+        self.history = ProbeHistory(os.path.join(self.history_dir, filename+'.tca'), self.probeNames(), metadata=self.probeMetadata(), date_time=self.date_time, time_0=self.time_0, flush_interval=self.history_flush, verbose=self.verbose)
+        self.history_timer.start(2000) # [ms]
+
+    def followHistory(self):
+        '''
+        * With 'Follow', move the history plot to the last 'span' of the history, which reloads it.
+        '''
+        if self.history is None or self.history_dic['graph'] is None or not self.history_dic['graph'].isVisible():
+            return
         # ---  --- #
-        self.measureResistance()
-        self.setResistanceValue()
-        self.updateGraphs()
+        span = self.history.span()
+        if span is None:
+            return
+        # ---
+        if self.history_dic['follow'].isChecked():
+            span_s = self.history_span[self.history_dic['span'].currentText()]
+            t_0    = span[0] if span_s is None else max(span[0], span[1]-span_s)
+            self.history_dic['graph'].getViewBox().setXRange(t_0, span[1], padding=0.02) # reloads the history through sigXRangeChanged
+        else:
+            self.updateHistory()
+
+    def updateHistory(self):
+        '''
+        * Read from the ProbeHistory the samples in the visible time range, at most about two per pixel, i.e the
+          min/max envelope of the ticks of each pixel column, the samples not valid being left out.
+        '''
+        if self.history is None or self.history_dic['graph'] is None or not self.history_dic['graph'].isVisible():
+            return
+        # ---  --- #
+        (t_start, t_stop), _ = self.history_dic['graph'].getViewBox().viewRange()
+        max_points           = 2*max(self.history_dic['graph'].width(), 100)
+        t_, data_, valid_    = self.history.window(t_start, t_stop, self.graph_dic['data_display'].currentText(), max_points=max_points)
+        # ---  --- #
+        for slot, probe_id in enumerate(self.buffer_data.ids):
+            if slot>=len(t_):
+                break
+            display_msk = valid_[slot] & ~np.isnan(t_[slot]) & ~np.isnan(data_[slot])
+            self.history_dic['data_items'][probe_id].setData(x=t_[slot][display_msk], y=data_[slot][display_msk])
+
+    def update_record(self):
+        '''
+        * Launch a measure of all the probes. In 'async' mode the method returns immediately, and the
+          recording, display update and auto-save are done in recordResistance when the sweep is done.
+          In 'worker' mode, the worker is asked for a single sweep, recorded by drainSamples.
+        '''
+        if self.acquisition=='worker':
+            self.worker.trigger()
+        else:
+            self.measureResistance()
+
+    def drainSamples(self):
+        '''
+        * Record the samples queued by the worker since the last call, by slices of drain_slice ticks, until the
+          queue is empty or drain_budget of the display period is spent, and refresh the display once. The ticks
+          left in the queue are recorded by the next calls, so that the RenderScheduler paints between two calls.
+        * Each drain is counted in n_drains as stopped by the budget or having emptied the queue, which tells if a
+          replay played as fast as possible is limited by the GUI or by the replay source, cf drainReport.
+        '''
+        t_stop  = time.time() + self.drain_budget/self.display_fps
+        n_ticks = 0
+        limit   = 'empty'
+        while limit=='empty':
+            samples = self.worker.queue.drain(self.drain_slice)
+            for results in samples:
+                self.recordResistance(results, refresh=False)
+            n_ticks += len(samples)
+            if len(samples)<self.drain_slice:
+                break
+            limit    = 'budget' if time.time()>=t_stop else limit
         # ---  --- #
-        self.topBar_dic['state'].nextState()
+        if n_ticks:
+            self.n_drains[limit] += 1
+            self.refreshDisplay()
+            self.t_last_drain = time.time()
+        elif self.replay is not None and not self.replay_done and self.worker.done.is_set() and not len(self.worker.queue):
+            self.replay_done = True
+            print(self.worker.report(t_end=self.t_last_drain)) # samples/s through the whole pipeline
+            print(self.drainReport())
+
+    def drainReport(self):
+        n_drains = sum(self.n_drains.values())
+        if not n_drains:
+            return 'Drain: no tick drained'
+        limit    = 'the GUI (drain budget)' if self.n_drains['budget']>self.n_drains['empty'] else 'the source (replay speed or reading)'
+        return 'Drain: {0} drains of {1:.0f} ms at most, {2} stopped by the budget with ticks left, {3} emptied the queue --> rate limited by {4}'.format(
+                n_drains, 1e3*self.drain_budget/self.display_fps, self.n_drains['budget'], self.n_drains['empty'], limit)
+
+    def refreshDisplay(self):
+        '''
+        * Only mark the display as dirty, it is repainted by the RenderScheduler at its own rate.
+        '''
+        self.scheduler.markDirty('values', 'graphs', 'state', *(['network'] if self.network_panel else []))
+
+    def countRecord(self):
+        self.nbr_measure += 1
         # ---  --- #
         if self.nbr_measure==self.graph_dic['buffer_size'].value():
             self.nbr_measure = 0
-            # ---
-            if self.topBar_dic['auto_save'].isChecked():
-                print( 'Auto-save at : {0:04d}-{1:02d}-{2:02d}_{3:02d}:{4:02d}:{5:02d}'.format(*time.localtime(time.time())[:6]) )
-                # ---
-                self.saveData( filename='auto_save_{0:04d}-{1:02d}-{2:02d}'.format(*time.localtime(time.time())[:3]) )
 
     def updateGraphDisplayStyle(self, idx):
         '''
+        * Set the label and range of the plots built so far for the data displayed, the plots built later take
+          it from setGraphDisplayStyle.
         '''
-        if   idx==0: # Temperature
-            self.display_buffer_idx = 2
-            # ---
-            for i, key in enumerate(self.tempDispl['Devices']):
-                graph_wdg = self.graph_dic['probes'][key]['graph']
-                # ---  --- #
-                graph_wdg.setLabel(axis='left'  ,text='Temperature [K]')
-                graph_viewbox  = graph_wdg.getViewBox()
-                graph_viewbox.setRange(yRange=(0,+400))
-            for i, key in enumerate(self.graph_dic['multiplots']):
-                graph_wdg = self.graph_dic['multiplots'][key]['graph']
-                # ---  --- #
-                graph_wdg.setLabel(axis='left'  ,text='Temperature [K]')
-                graph_viewbox  = graph_wdg.getViewBox()
-                graph_viewbox.setRange(yRange=(0,+400))
-        elif idx==1: # Resistance
-            self.display_buffer_idx = 1
-            # ---
-            for i, key in enumerate(self.tempDispl['Devices']):
-                graph_wdg = self.graph_dic['probes'][key]['graph']
-                # ---  --- #
-                graph_wdg.setLabel(axis='left'  ,text='Resistance [Ohm]')
-                graph_viewbox  = graph_wdg.getViewBox()
-                graph_viewbox.setRange(yRange=(0,+10000))
-            for i, key in enumerate(self.graph_dic['multiplots']):
-                graph_wdg = self.graph_dic['multiplots'][key]['graph']
-                # ---  --- #
-                graph_wdg.setLabel(axis='left'  ,text='Resistance [Ohm]')
-                graph_viewbox  = graph_wdg.getViewBox()
-                graph_viewbox.setRange(yRange=(0,+10000))
+        self.display_buffer_idx = {0:2, 1:1}[idx] # Temperature, Resistance
+        # ---  --- #
+        graphs = [self.graph_dic['probe_plot']['graph']] + [multiplot['graph'] for multiplot in self.graph_dic['multiplots'].values()]
+        for graph_wdg in graphs:
+            if graph_wdg is not None:
+                self.setGraphDisplayStyle(graph_wdg)
+
+    def setGraphDisplayStyle(self, graph_wdg):
+        if self.graph_dic['data_display'].currentIndex()==0: # Temperature
+            graph_wdg.setLabel(axis='left'  ,text='Temperature [K]')
+            graph_wdg.getViewBox().setRange(yRange=(0,+400))
+        else: # Resistance
+            graph_wdg.setLabel(axis='left'  ,text='Resistance [Ohm]')
+            graph_wdg.getViewBox().setRange(yRange=(0,+10000))
 
     def changePlotScale(self, plot_wdg, idx):
         if   idx==0:
@@ -598,16 +1022,32 @@ class ThermometerMonitoring(QWidget):
             plot_wdg.setLogMode(x=False, y=True)
 
     def setPlot(self, multiplot, probe_key):
+        '''
+        * Add or remove the curve of probe_key in the multiplot, according to its check box. The curve and its
+          SeriesView are made at the first check.
+        '''
+        checked = multiplot['plot_choice_items'][probe_key].checkState()==Qt.Checked
+        if checked==(probe_key in multiplot['checked']): # eg the item was renamed
+            return
         # ---  --- #
-        if multiplot['plot_choice_box'][probe_key].isChecked():
+        if checked:
+            multiplot['checked'].add(probe_key)
+            if probe_key not in multiplot['data_items']:
+                multiplot['data_items'][probe_key] = pg.PlotDataItem(name=self.probes.probes[probe_key]['name'])
+                multiplot['data_items'][probe_key].setPen(pg.mkColor(self.probe_color[probe_key]))
+                multiplot['views'][probe_key] = self.graph_dic['series'][probe_key].subscribe(SeriesView(multiplot['data_items'][probe_key], multiplot['graph'],
+                                                                                                         enabled=lambda: probe_key in multiplot['checked']))
             #multiplot['data_items'][probe_key].setVisible(True)
             multiplot['graph'].addItem(   multiplot['data_items'][probe_key])
+            self.refreshViews({probe_key:multiplot['views'][probe_key]}) # the view skipped the data while unchecked
         else:
+            multiplot['checked'].discard(probe_key)
             #multiplot['data_items'][probe_key].setVisible(False)
             multiplot['graph'].removeItem(multiplot['data_items'][probe_key])
 
     def addMultiPlot(self, name):
         self.graph_dic['multiplots'][name] = self.makeMultiPlotWidget(name)
+        self.setGraphDisplayStyle(self.graph_dic['multiplots'][name]['graph'])
         self.graph_dic['multiplot_wdg'].addDock(self.graph_dic['multiplots'][name]['main_wdg'])
 
     def closeMultiPlotWidget(self, multiplot_name):
@@ -619,6 +1059,8 @@ class ThermometerMonitoring(QWidget):
             wdg.setParent(None)
             print('Deleting widget: ', wdg) if self.verbose else None
         # ---  --- #
+        for key, view in self.graph_dic['multiplots'][multiplot_name]['views'].items():
+            self.graph_dic['series'][key].unsubscribe(view)
         for key, data_item in self.graph_dic['multiplots'][multiplot_name]['data_items'].items():
             data_item.deleteLater()
             data_item.setParent(None)
@@ -633,71 +1075,136 @@ class ThermometerMonitoring(QWidget):
         #return time.mktime(time.localtime())+round(time.time()%1, 3)
         return round(time.time(), 3)
 
-    def epochToDate(self, t_epoch):
-        '''
-        * Convert an epoch time number to a readable date in YYYY-MM-DD_hh:mm:ss:msss
-          format.
-        '''
-        return '{0:04d}-{1:02d}-{2:02d}_{3:02d}:{4:02d}:{5:02d}:{6:03d}'.format(*time.localtime(t_epoch)[:6], int((t_epoch%1) * 1e3))
-
     def measureResistance(self):
-        for i, probe_id in enumerate(self.probes.probes):
+        if self.acquisition=='async':
+            self.probes.startSweep(self.buffer_data.ids) # the data are recorded by recordResistance, connected to sweep_done_sgnl
+            return
+        # ---  --- #
+        results = {}
+        for probe_id in self.buffer_data.ids:
             res = self.probes.getRESISTANCE(ID=probe_id)
-            t_  = self.getTime()#-self.time_0
+            results[probe_id] = (self.getTime(), res)
+        # ---  --- #
+        self.recordResistance(results)
+
+    def recordResistance(self, results, refresh=True):
+        '''
+        * Record the result of a measure of all the probes, given as a dictionary {probe_id: (time, resistance)}.
+        '''
+        N_probes = len(self.buffer_data)
+        t_L      = np.zeros(N_probes)
+        res_L    = np.zeros(N_probes)
+        valid_L  = np.zeros(N_probes, dtype=bool)
+        # ---  --- #
+        for probe_id, (t_, res) in results.items():
+            slot      = self.buffer_data.slot(probe_id)
+            t_L[slot] = round(t_, 3) if t_ else self.getTime()#-self.time_0
             # ---  --- #
             if not res: # if res is None, i.e measure did not work
-                #print('[{:s}] Error in measureResistance: measure of resistance did not work, returning a random value around 500 Ohm.'.format( self.epochToDate(time.time())[:-4] ))
-                print('[{:s}] Error in measureResistance: measure of resistance did not work, returning last measrued value.'.format( self.epochToDate(time.time())[:-4] ))
-                res  = self.buffer_data[probe_id]['last']['resistance'] # 500 + np.random.random()*10
-            # ---  --- #
-            temp = self.convertResToTemp(res, type=self.tempDispl['Devices'][probe_id]['probe_type'].currentText(), above70K=self.tempDispl['Devices'][probe_id]['Temp_thresh'].isChecked())
-            # ---  --- #
-            self.buffer_data[probe_id]['last'  ]['resistance']  = res
-            self.buffer_data[probe_id]['last'  ]['time'      ]  = t_
-            # ---
-            self.buffer_data[probe_id]['buffer']['time'       ].push_element(t_)
-            self.buffer_data[probe_id]['buffer']['resistance' ].push_element(res)
-            self.buffer_data[probe_id]['buffer']['temperature'].push_element(temp)
+                #print('[{:s}] Error in measureResistance: measure of resistance did not work, returning a random value around 500 Ohm.'.format( epochToDate(time.time())[:-4] ))
+                print('[{:s}] Error in measureResistance: measure of resistance did not work, returning last measrued value.'.format( epochToDate(time.time())[:-4] ))
+                res = self.buffer_data.last['resistance'][slot] # 500 + np.random.random()*10
+                self.net_stats.record('stale_values', probe_id)
+            else:
+                valid_L[slot] = True
+            res_L[slot] = res
+        # ---  --- #
+        temp_L = self.convertAllResToTemp(res_L)
         # ---  --- #
-        self.setResistanceValue()
+        self.buffer_data.push(time=t_L, resistance=res_L, temperature=temp_L, valid=valid_L)
+        if self.t_first_reading is None:
+            self.t_first_reading = time.time()
+            print('Startup timing: first reading after {:.3f} s'.format(self.t_first_reading-T_START)) if self.verbose else None
+        self.autoSaveTick(t_L, res_L, temp_L, valid_L)
+        if self.history is not None:
+            try:
+                self.history.append(t_L, res_L, temp_L, valid_L)
+            except OSError as error:
+                print('[{0:s}] Error in recordResistance: the history in {1} stopped: {2}'.format(epochToDate(time.time())[:-4], self.history.path_to_file, error))
+                self.history.close(wait=False)
+                self.history = None
+        # ---  --- #
+        self.countRecord()
+        if refresh:
+            self.refreshDisplay()
 
     def setResistanceValue(self):
-        for i,key in enumerate(self.tempDispl['Devices']):
-            res_val = self.buffer_data[key]['last']['resistance']
-            if res_val: # equivalent to 'if res_val is not None'
-                self.tempDispl['Devices'][key]['resistance'].setValue(res_val)
-                # ---
-                self.doConversion(key)
+        '''
+        * Show the last resistance of all the probes and its temperature, converted in one call per group of
+          probes, cf convertAllResToTemp.
+        '''
+        res_L = np.where(self.buffer_data.last['resistance']==self.buffer_dflt, np.nan, self.buffer_data.last['resistance'])
+        self.tempDispl['model'].setValues(res_L, self.convertAllResToTemp(res_L))
 
-    def doConversion(self, probe_id):
-        probe_type = self.tempDispl['Devices'][probe_id]['probe_type'].currentText()
+    def updateConverter(self, probe_id):
+        '''
+        * Fetch the conversion function of probe_id for the current probe type and T > 70 K state.
+        '''
+        probe_type = self.tempDispl['model'].probeType(probe_id)
+        above70K   = self.tempDispl['model'].above70K(probe_id)
         # ---  --- #
-        Temp_K = self.convertResToTemp(self.tempDispl['Devices'][probe_id]['resistance'].value(), type=probe_type, above70K=self.tempDispl['Devices'][probe_id]['Temp_thresh'].isChecked())
+        self.converters[probe_id] = self.getConverterHandle(probe_type, above70K)
         # ---
-        self.tempDispl['Devices'][probe_id]['temperature'].setText('{:.4f}'.format(Temp_K))
+        self.updateSaveMetadata()
 
-    def doConversionBuffer(self, probe_id):
+    def getConverterHandle(self, probe_type, above70K):
         '''
-        * Convert all res to temp from buffer.
+        * Returns the function R --> T of probe_type, going through the ConversionCache if any. The same
+          function is returned for the same (probe_type, above70K), which allows to gather the probes by
+          conversion.
         '''
+        converter = getConverter(probe_type)
+        above70K  = bool(above70K) and converter.uses_above70K
         # ---  --- #
-        for i,val in enumerate(self.buffer_data[probe_id]['buffer']['resistance']):
-            if val!=self.buffer_dflt:
-                self.buffer_data[probe_id]['buffer']['temperature'][i] = self.convertResToTemp(val, type=self.tempDispl['Devices'][probe_id]['probe_type'].currentText(), above70K=self.tempDispl['Devices'][probe_id]['Temp_thresh'].isChecked())
+        if self.conv_cache is None:
+            return converter.handle(above70K)
+        # ---
+        if not (probe_type, above70K) in self.cache_handles:
+            self.cache_handles[(probe_type, above70K)] = lambda R: self.conv_cache.convert(R, probe_type, above70K=above70K)
+        return self.cache_handles[(probe_type, above70K)]
+
+    def doConversion(self, probe_id):
+        res = self.tempDispl['model'].resistanceOf(probe_id)
+        if np.isnan(res):
+            return
+        # ---
+        self.tempDispl['model'].setTemperature(probe_id, self.converters[probe_id](res))
+
+    def doConversionBuffer(self, probe_id):
+        '''
+        * Convert all res to temp from buffer, in a single call of the converter of the probe on the samples
+          that are not default values.
+        * Above N_async_conv samples, the conversion is made in a thread on a copy of the resistances, and
+          the result is written back by writeConversionBuffer. The store count at the time of the copy allows
+          to realign the result on the samples pushed since, and each reconversion has a generation number,
+          so that the result of an outdated reconversion is dropped.
+        '''
+        res    = self.buffer_data.row('resistance', probe_id)
+        mask   = res!=self.buffer_dflt
+        handle = self.converters[probe_id]
+        gen    = self.conversion_gen.get(probe_id, 0) + 1
+        self.conversion_gen[probe_id] = gen
         # ---  --- #
-        self.updateGraphs()
+        if np.count_nonzero(mask)<self.N_async_conv:
+            self.writeConversionBuffer(probe_id, gen, handle(res[mask]), mask, self.buffer_data.count)
+            return
+        # ---
+        res, count = res.copy(), self.buffer_data.count
+        thread     = threading.Thread(target=lambda: self.conversion_done_sgnl.emit(probe_id, gen, handle(res[mask]), mask, count), daemon=True)
+        thread.start()
 
-    def toggleThreshButton(self, probe_id):
+    def writeConversionBuffer(self, probe_id, gen, temp, mask, count):
         '''
-        * Enable/Disable the threshold > 70K button for the probes that does not
-          need it.
-        * The probes that are in need of it are: "Mobile BT", "Mobile HT".
-        * One can check in the 'convertResToTemp' method.
+        * Write the temperatures of a reconversion in the buffer, if it is the last one asked for probe_id.
         '''
-        if self.tempDispl['Devices'][probe_id]['probe_type' ].currentText() in ["Mobile BT", "Mobile HT"]:
-            self.tempDispl['Devices'][probe_id]['Temp_thresh'].setEnabled(True)
-        else:
-            self.tempDispl['Devices'][probe_id]['Temp_thresh'].setEnabled(False)
+        if gen!=self.conversion_gen[probe_id]:
+            return
+        # ---  --- #
+        temp_ = np.full(mask.shape, np.nan)
+        temp_[mask] = temp
+        self.buffer_data.setRow('temperature', probe_id, temp_, mask=mask, count=count)
+        # ---  --- #
+        self.scheduler.markDirty('graphs')
 
     def convertResToTemp(self, res, **kwargs):
         '''
@@ -706,16 +1213,34 @@ class ThermometerMonitoring(QWidget):
         '''
         probe_type = kwargs.pop('type'    , None)
         above70K   = kwargs.pop('above70K', None)
-        # ---  --- # self.probe_type_L = ["Mobile BT","Mobile HT","NICO BT","PT100", "Mobile BM"]
-        if not probe_type in self.probe_type_L:
+        # ---  --- #
+        if getConverter(probe_type) is None:
             print('Error: in convertResToTemp, the probe type is not valid.')
             return None
         # ---  --- #
-        T = convert_RtoT(res, probe_type=probe_type, above70K=above70K, verbose=self.verbose) # "convert_RtoT" from Conversion_functions in lib directory
+        return self.getConverterHandle(probe_type, above70K)(res)
+
+    def convertAllResToTemp(self, res_L):
+        '''
+        * Convert an array of resistance ordered by slot of self.buffer_data, i.e one value per probe.
+        * The probes are gathered by conversion function, so that there is one conversion call per group
+          instead of one per probe.
+        '''
+        temp_L = np.full(np.shape(res_L), np.nan)
+        groups = {}
+        # ---  --- #
+        for slot, probe_id in enumerate(self.buffer_data.ids):
+            groups.setdefault(self.converters[probe_id], []).append(slot)
+        # ---
+        for handle, slots in groups.items():
+            temp_L[slots] = handle(np.asarray(res_L)[slots])
         # ---  --- #
-        return T
+        return temp_L
 
     def toggle_continuous_record_qtimer(self, state):
+        if self.acquisition=='worker': # the timer is always running to drain the samples of the worker
+            self.worker.setContinuous(state=='start')
+            return
         # ---  --- #
         if   state=='start':
             self.timer.start(int(1e3/self.fps)) # [ms]
@@ -748,32 +1273,61 @@ class ThermometerMonitoring(QWidget):
 
     def setFPS(self):
         self.fps = self.topBar_dic['fps_input'].value()
-        self.timer.setInterval(int(1e3/self.fps))
+        if self.acquisition=='worker':
+            self.worker.setFPS(self.fps)
+        else:
+            self.timer.setInterval(int(1e3/self.fps))
+
+    def stopAcquisition(self):
+        self.scheduler.stop()
+        self.timer.stop()
+        if self.worker:
+            self.worker.stop(timeout=2.0)
+        if self.network_log:
+            self.net_log_timer.stop()
+            self.dumpNetworkStats()
+        if self.auto_writer is not None:
+            self.auto_writer.close()
+        if self.history is not None:
+            self.history.close()
 
     def changeBufferSize(self, new_size):
         self.N_buffer = int(new_size)
         # ---  --- #
-        for i,key in enumerate(self.probes.probes):
-            self.buffer_data[key]['buffer']['time'       ].change_length(self.N_buffer, default_val=self.buffer_dflt)
-            self.buffer_data[key]['buffer']['resistance' ].change_length(self.N_buffer, default_val=self.buffer_dflt)
-            self.buffer_data[key]['buffer']['temperature'].change_length(self.N_buffer, default_val=self.buffer_dflt)
+        self.buffer_data.change_length(self.N_buffer)
 
     def setTimeWindowLabel(self):
         t_wind = self.N_buffer/self.fps
         self.graph_dic['time_window'].setText('{0:02d}h{1:02d}min{2:02d}s'.format(int(t_wind//3600), int((t_wind%3600)//60), int((t_wind%60)//1)))
 
     def updateGraphs(self):
+        '''
+        * Set the data of the SeriesModel of each probe, which updates the plots subscribed to it. Each plot
+          reduces the series with its own Decimator to what can be seen at its width, i.e the min/max envelope
+          per pixel column, or the raw points when zoomed in. The range is the one of the data if the plot is in
+          auto-range, and the one of the view otherwise.
+        * Nothing is done for a plot if it is hidden, eg in a tab behind another one, or unchecked in its
+          multiplot, nor if neither the data, nor its view range nor its width changed.
+        '''
         which_data  = self.graph_dic['data_display'].currentText()
-        for i, key in enumerate(self.probes.probes):
-            display_idx = self.N_buffer - np.where(np.array(self.buffer_data[key]['buffer']['time'])==self.buffer_dflt)[0].size # only for display effect, avoid displaying the default value when the buffer is not full of data
-            xdata = self.buffer_data[key]['buffer']['time'    ][-display_idx:]
-            ydata = self.buffer_data[key]['buffer'][which_data][-display_idx:]
-            # ---  --- #
-            self.graph_dic['probes'][key]['data'].setData(x=np.array(xdata)[~np.isnan(ydata)], y=np.array(ydata)[~np.isnan(ydata)])
-            # ---  --- #
-            for name, multiplot in self.graph_dic['multiplots'].items():
-                multiplot['data_items'][key].setData(x=self.graph_dic['probes'][key]['data'].xData,
-                                                     y=self.graph_dic['probes'][key]['data'].yData)
+        time_view   = self.buffer_data.view('time')
+        data_view   = self.buffer_data.view(which_data)
+        version     = (self.buffer_data.version, which_data)
+        # ---  --- #
+        for slot, key in enumerate(self.buffer_data.ids):
+            first = np.searchsorted(time_view[slot], self.buffer_dflt, side='right') # only for display effect, avoid displaying the default values when the buffer is not full of data
+            self.graph_dic['series'][key].setData(time_view[slot][first:], data_view[slot][first:], version)
+
+    def refreshAllViews(self):
+        for key, series in self.graph_dic['series'].items():
+            series.notify()
+
+    def refreshViews(self, views):
+        '''
+        * Update the SeriesView of the dictionary {probe_id: view}, eg after a zoom or when a probe is checked.
+        '''
+        for key, view in views.items():
+            view.update(self.graph_dic['series'][key])
 
 ##############################################################################################################
 # MAIN
@@ -782,6 +1336,9 @@ class ThermometerMonitoring(QWidget):
 if  __name__=="__main__":
     print('STARTING: Thermometer')
     myapp   = QApplication(sys.argv)
-    app     = MainWindow(verbose=False, IP={'IP1':'192.168.1.101','IP3':'192.168.1.103'})
+    replay  = sys.argv[sys.argv.index('--replay')+1] if '--replay' in sys.argv else None # --replay file.tca [--speed N], N=0 -> as fast as possible
+    speed   = float(sys.argv[sys.argv.index('--speed')+1]) if '--speed' in sys.argv else 1.
+    history = sys.argv[sys.argv.index('--history-dir')+1] if '--history-dir' in sys.argv else None # --history-dir dir/ -> ProbeHistory of the run in dir/
+    app     = MainWindow(verbose='--verbose' in sys.argv, IP={'IP1':'192.168.1.101','IP3':'192.168.1.103'}, replay=replay, replay_speed=speed, history_dir=history) # --verbose also prints the startup timing
     sys.exit(myapp.exec_())
     print('FINNISHED')
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import argparse
+import signal
+import sys, os
+sys.path.append('./')
+
+from lib.Miscellaneous              import getIPFromTxt
+from lib.MacrtClient_class          import MacrtClient
+from lib.HeadlessRecorder_class     import HeadlessRecorder
+from lib.NetworkStats_class         import NetworkStats
+from lib.ProbeConfig_functions      import loadProbeConfig
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+def parseArguments(argv=None):
+    path_abs = os.path.dirname(os.path.abspath(__file__)) + '/'
+    parser   = argparse.ArgumentParser(description='Record the temperatures of the cryostat without GUI.')
+    parser.add_argument('--fps'           , type=float, default=1.        , help='acquisition rate [Hz]')
+    parser.add_argument('--duration'      , type=float, default=None      , help='recording duration [s], until Ctrl+C or SIGTERM by default')
+    parser.add_argument('--save-dir'      , default=path_abs+'data/'      , help='directory of the auto_save files')
+    parser.add_argument('--format'        , default='txt', choices=list(HeadlessRecorder.writer_class), help='format of the auto_save files')
+    parser.add_argument('--history-dir'   , default=None                  , help='directory of the history archive of the run, no history by default')
+    parser.add_argument('--IP-file'       , default=path_abs+'IPs_connection.txt', help='txt file of the IP addresses of the MacRT servers')
+    parser.add_argument('--config'        , default=path_abs+'probes_config.json', help='json file of the probes, the same as the GUI')
+    parser.add_argument('--timeout'       , type=float, default=0.5       , help='deadline of the queries [s]')
+    parser.add_argument('--flush-interval', type=float, default=5.        , help='period of the writing of the files [s]')
+    parser.add_argument('--fsync'         , default='never', choices=['never', 'flush', 'close'])
+    parser.add_argument('--status-interval', type=float, default=3600.   , help='period of the status print [s]')
+    parser.add_argument('--network-log'   , default=None                  , help='json lines file where the network metrics are appended at each status print')
+    parser.add_argument('--above70K'      , nargs='*', default=[]         , help='names of the probes converted with T > 70 K')
+    parser.add_argument('--verbose'       , action='store_true')
+    # ---  --- #
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args   = parseArguments(argv)
+    IP_dic = getIPFromTxt(args.IP_file)
+    client = MacrtClient(timeout=args.timeout, stats=NetworkStats(), verbose=args.verbose)
+    # ---  --- #
+    probe_types = {}
+    for probe in loadProbeConfig(args.config, IP_dic):
+        probe_id = client.setProbe(probe['name'], probe['IP'], probe['probe_nbr'])
+        probe_types[probe_id] = (probe['probe_type'], probe['above70K'] or probe['name'] in args.above70K)
+    # ---  --- #
+    recorder = HeadlessRecorder(client, probe_types, fps=args.fps, save_dir=args.save_dir, format_=args.format, history_dir=args.history_dir,
+                                flush_interval=args.flush_interval, fsync=args.fsync, status_interval=args.status_interval, network_log=args.network_log,
+                                verbose=args.verbose)
+    signal.signal(signal.SIGTERM, lambda signum, frame: recorder.stop())
+    signal.signal(signal.SIGINT , lambda signum, frame: recorder.stop())
+    # ---  --- #
+    return recorder.run(duration=args.duration)
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    main()
+    print('FINNISHED')
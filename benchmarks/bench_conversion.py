@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import json
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import sys, os
+
+path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/'
+sys.path.append(path_root)
+
+import lib.Conversion_functions as cf
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+# ====== Cases ====== #
+# Each case is (name, function, input, T range [K], forward model):
+#   - the input is 'T' for the forward models R(T), and 'R' for the inverses, whose resistances are made with the
+#     forward model on the T range, or drawn in the R range when there is no forward model,
+#   - the forward model of an inverse is used for the accuracy cross-check, None if there is none.
+
+T_BT_low , T_BT_high = (0.02, 69.9), (71. , 400.)
+T_HT_low , T_HT_high = (1.2 , 78.8), (80. , 400.)
+
+forward_cases = [
+    ('PT100_RvsT'   , cf.PT100_RvsT   , 'T', (30.  , 400.), None),
+    ('C100_RvsT'    , cf.C100_RvsT    , 'T', (1.5  , 400.), None),
+    ('RuO2_RvsT'    , cf.RuO2_RvsT    , 'T', (0.01 , 400.), None),
+    ('ThermoBT_RvsT', cf.ThermoBT_RvsT, 'T', (0.01 , 400.), None),
+    ('ThermoHT_RvsT', cf.ThermoHT_RvsT, 'T', (1.5  , 400.), None),
+]
+
+inverse_cases = [
+    ('PT100_TvsR'                  , cf.PT100_TvsR        , 'R', (40. , 400.) , cf.PT100_RvsT   ),
+    ('C100_TvsR'                   , cf.C100_TvsR         , 'R', (2.  , 400.) , cf.C100_RvsT    ),
+    ('ThermoBT_TvsR'               , cf.ThermoBT_TvsR     , 'R', (0.05, 10. ) , cf.ThermoBT_RvsT), # asymptotic, low temperature only
+    ('ThermoNICO_TvsR'             , cf.ThermoNICO_TvsR   , 'R', (100., 1000.), None            ), # R range [Ohm]
+    ('ThermoNICOCAL_TvsR'          , cf.ThermoNICOCAL_TvsR, 'R', (1e3 , 3e4)  , None            ), # R range [Ohm]
+    ('ThermoBT_TvsR_spln below70K' , lambda R: cf.ThermoBT_TvsR_spln(R, above70K=False), 'R', T_BT_low , cf.ThermoBT_RvsT),
+    ('ThermoBT_TvsR_spln above70K' , lambda R: cf.ThermoBT_TvsR_spln(R, above70K=True ), 'R', T_BT_high, cf.ThermoBT_RvsT),
+    ('ThermoHT_TvsR_spln below70K' , lambda R: cf.ThermoHT_TvsR_spln(R, above70K=False), 'R', T_HT_low , cf.ThermoHT_RvsT),
+    ('ThermoHT_TvsR_spln above70K' , lambda R: cf.ThermoHT_TvsR_spln(R, above70K=True ), 'R', T_HT_high, cf.ThermoHT_RvsT),
+    ('ThermoBT_TvsR_root below70K' , lambda R: cf.ThermoBT_TvsR_root(R, above70K=False), 'R', T_BT_low , cf.ThermoBT_RvsT),
+    ('ThermoBT_TvsR_root above70K' , lambda R: cf.ThermoBT_TvsR_root(R, above70K=True ), 'R', T_BT_high, cf.ThermoBT_RvsT),
+    ('ThermoHT_TvsR_root below70K' , lambda R: cf.ThermoHT_TvsR_root(R, above70K=False), 'R', T_HT_low , cf.ThermoHT_RvsT),
+    ('ThermoHT_TvsR_root above70K' , lambda R: cf.ThermoHT_TvsR_root(R, above70K=True ), 'R', T_HT_high, cf.ThermoHT_RvsT),
+]
+
+probe_cases = { # probe type --> (T range below 70 K, T range above 70 K, forward model), for convert_RtoT
+    "Mobile BT"  : (T_BT_low    , T_BT_high   , cf.ThermoBT_RvsT),
+    "Mobile HT"  : (T_HT_low    , T_HT_high   , cf.ThermoHT_RvsT),
+    "PT100"      : ((40., 400.) , (40., 400.) , cf.PT100_RvsT   ),
+    "Mobile BM"  : ((0.05, 10.) , (0.05, 10.) , cf.ThermoBT_RvsT),
+    "NICO BT CAL": ((1e3, 3e4)  , (1e3, 3e4)  , None            ),
+    "NICO BT"    : ((100., 1e3) , (100., 1e3) , None            ),
+}
+
+def convertCases():
+    cases = []
+    for probe_type in cf.probeTypes():
+        if not probe_type in probe_cases:
+            continue
+        T_low, T_high, forward = probe_cases[probe_type]
+        for above70K, T_range in [(False, T_low), (True, T_high)]:
+            func = lambda R, probe_type=probe_type, above70K=above70K: cf.convert_RtoT(R, probe_type=probe_type, above70K=above70K)
+            cases.append(('convert_RtoT {0} above70K={1}'.format(probe_type, above70K), func, 'R', T_range, forward))
+    # ---  --- #
+    return cases
+
+def makeInput(n, kind, value_range, forward, seed=0):
+    '''
+    * Returns n inputs: temperatures drawn log-uniformly in value_range for kind 'T', and for kind 'R' the
+      resistances of such temperatures through forward, or resistances drawn in value_range if forward is None.
+    '''
+    rng = np.random.default_rng(seed)
+    x   = np.exp(rng.uniform(np.log(value_range[0]), np.log(value_range[1]), n))
+    if kind=='R' and forward is not None:
+        x = np.asarray(forward(x), dtype=float).reshape(n)
+    # ---  --- #
+    return x
+
+def timeCall(func, x, min_time=0.1, repeat=3):
+    '''
+    * Returns the best time of one call of func(x) [s], each measure looping on func(x) for min_time at least.
+    '''
+    t_   = time.perf_counter()
+    func(x)
+    t_1  = time.perf_counter() - t_
+    loop = max(1, int(min_time/max(t_1, 1e-9)))
+    # ---  --- #
+    best = t_1
+    for i in range(repeat):
+        t_ = time.perf_counter()
+        for j in range(loop):
+            func(x)
+        best = min(best, (time.perf_counter()-t_)/loop)
+    # ---  --- #
+    return best
+
+def peakMemory(func, x):
+    '''
+    * Returns the peak of memory allocated by one call of func(x) [bytes], the input excluded.
+    '''
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func(x)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # ---  --- #
+    return peak
+
+def benchCase(case, sizes, max_call=2.0, min_time=0.1):
+    '''
+    * Time a case on a scalar and on arrays of the given sizes. The larger sizes are skipped once a call takes
+      more than max_call seconds.
+    '''
+    name, func, kind, value_range, forward = case
+    results = []
+    skip    = False
+    # ---  --- #
+    for size in ['scalar'] + list(sizes):
+        n = 1 if size=='scalar' else int(size)
+        if skip:
+            results.append({'name':name, 'size':size, 'skipped':True})
+            continue
+        x = makeInput(n, kind, value_range, forward)
+        x = float(x[0]) if size=='scalar' else x
+        # ---
+        t_call = timeCall(func, x, min_time=min_time)
+        peak   = peakMemory(func, x)
+        results.append({'name':name, 'size':size, 'time_per_call':t_call, 'throughput':n/t_call, 'peak_bytes':peak, 'bytes_per_element':peak/n})
+        skip   = t_call>max_call
+    # ---  --- #
+    return results
+
+def accuracyCase(case, n=100000):
+    '''
+    * Cross-check of an inverse against its forward model: T --> R = forward(T) --> T_ = inverse(R). Returns
+      the errors on T_, and on forward(T_) - R, which does not depend on the flat parts of the inverse.
+    '''
+    name, func, kind, T_range, forward = case
+    if forward is None:
+        return {'name':name, 'checked':False}
+    # ---  --- #
+    T_ref = np.geomspace(T_range[0], T_range[1], n)
+    R_    = np.asarray(forward(T_ref), dtype=float)
+    with np.errstate(all='ignore'):
+        T_    = np.asarray(func(R_), dtype=float)
+        R_bck = np.asarray(forward(T_), dtype=float)
+    # ---  --- #
+    finite = np.isfinite(T_)
+    err_T  = np.abs(T_-T_ref)[finite]
+    err_R  = np.abs(R_bck-R_)[finite]
+    return {'name':name, 'checked':True, 'n':n, 'T_range':list(T_range), 'nan_fraction':1-np.count_nonzero(finite)/n,
+            'max_abs_err_T':float(err_T.max()) if err_T.size else None, 'max_rel_err_T':float((err_T/T_ref[finite]).max()) if err_T.size else None,
+            'rms_err_T':float(np.sqrt(np.mean(err_T**2))) if err_T.size else None, 'max_rel_err_R':float((err_R/np.abs(R_[finite])).max()) if err_R.size else None}
+
+def environment():
+    try:
+        commit = subprocess.run(['git', '-C', path_root, 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    # ---  --- #
+    return {'date':time.strftime('%Y-%m-%d_%H:%M:%S'), 'python':platform.python_version(), 'numpy':np.__version__,
+            'platform':platform.platform(), 'processor':platform.processor(), 'commit':commit}
+
+def compareResults(new, old, threshold=0.1):
+    '''
+    * Print the ratio of the throughputs new/old of each (case, size), and the accuracies that got worse by
+      more than threshold. Returns the nbr of regressions.
+    '''
+    old_timing = {(r['name'], str(r['size'])):r for r in old['timing'] if not r.get('skipped')}
+    old_acc    = {r['name']:r for r in old['accuracy'] if r.get('checked')}
+    n_regress  = 0
+    # ---  --- #
+    print('{0:<48s}{1:>10s}{2:>10s}'.format('case', 'size', 'new/old'))
+    for r in new['timing']:
+        key = (r['name'], str(r['size']))
+        if r.get('skipped') or not key in old_timing:
+            continue
+        ratio = r['throughput']/old_timing[key]['throughput']
+        flag  = '  <-- slower' if ratio<1-threshold else ''
+        n_regress += 1 if flag else 0
+        print('{0:<48s}{1:>10s}{2:>10.2f}{3}'.format(r['name'], str(r['size']), ratio, flag))
+    # ---
+    for r in new['accuracy']:
+        if not r.get('checked') or not r['name'] in old_acc or r['max_rel_err_T'] is None or old_acc[r['name']]['max_rel_err_T'] is None:
+            continue
+        if r['max_rel_err_T']>(1+threshold)*old_acc[r['name']]['max_rel_err_T'] + 1e-15:
+            n_regress += 1
+            print('Accuracy regression in {0}: max relative error {1:.3e} (was {2:.3e})'.format(r['name'], r['max_rel_err_T'], old_acc[r['name']]['max_rel_err_T']))
+    # ---  --- #
+    return n_regress
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark of the conversion functions of lib/Conversion_functions.')
+    parser.add_argument('--max-size', type=float, default=1e7 , help='largest array size, the sizes being the powers of 10 up to it')
+    parser.add_argument('--max-call', type=float, default=2.  , help='[s], the larger sizes of a case are skipped once a call takes longer')
+    parser.add_argument('--min-time', type=float, default=0.1 , help='[s], minimum duration of a timing loop')
+    parser.add_argument('--filter'  , default=''              , help='only run the cases whose name contains this string')
+    parser.add_argument('--output'  , default=None            , help='JSON file of the results, benchmarks/results/bench_conversion_DATE.json by default')
+    parser.add_argument('--compare' , default=None            , help='JSON file of a previous run to compare with')
+    # ---  --- #
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args  = parseArguments(argv)
+    sizes = [10**k for k in range(int(np.log10(args.max_size))+1)]
+    cases = [case for case in forward_cases+inverse_cases+convertCases() if args.filter in case[0]]
+    # ---  --- #
+    results = {'environment':environment(), 'sizes':sizes, 'timing':[], 'accuracy':[]}
+    for case in cases:
+        timing = benchCase(case, sizes, max_call=args.max_call, min_time=args.min_time)
+        results['timing'] += timing
+        for r in timing:
+            if not r.get('skipped'):
+                print('{0:<48s}{1:>10s}  {2:10.3e} s/call  {3:10.3e} /s  {4:8.1f} B/elt'.format(r['name'], str(r['size']), r['time_per_call'], r['throughput'], r['bytes_per_element']))
+        # ---
+        if case[2]=='R':
+            accuracy = accuracyCase(case)
+            results['accuracy'].append(accuracy)
+            if accuracy['checked']:
+                print('{0:<48s}  accuracy: max |dT| {1:.3e} K, max |dT|/T {2:.3e}, max |dR|/R {3:.3e}, nan {4:.2%}'.format(case[0], accuracy['max_abs_err_T'], accuracy['max_rel_err_T'], accuracy['max_rel_err_R'], accuracy['nan_fraction']))
+    # ---  --- #
+    output = args.output or os.path.join(path_root, 'benchmarks', 'results', 'bench_conversion_{}.json'.format(results['environment']['date'].replace(':', '-')))
+    if not os.path.isdir(os.path.dirname(output)):
+        os.makedirs(os.path.dirname(output))
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=1)
+    print('Results saved in {}'.format(output))
+    # ---  --- #
+    if args.compare:
+        with open(args.compare) as f:
+            return compareResults(results, json.load(f))
+    return 0
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import argparse
+import tempfile
+import sys, os
+
+path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/'
+sys.path.append(path_root)
+
+from lib.DataArchive_class    import ArchiveWriter
+from lib.Conversion_functions import ThermoBT_RvsT, ThermoHT_RvsT, PT100_RvsT
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+# End-to-end benchmark of the GUI: a recording is replayed by a ReplayWorker in place of the probes, through
+# drainSamples --> recordResistance --> conversion --> buffers --> display, as fast as the GUI drains it or at
+# N times the recorded speed, and the samples/s achieved are reported.
+
+forward_models = [('Mobile BT', ThermoBT_RvsT), ('Mobile HT', ThermoHT_RvsT), ('PT100', PT100_RvsT)]
+
+def makeArchive(path_to_file, n_probes, n_ticks, period=1., tau=3600., invalid=0.):
+    '''
+    * Write a synthetic recording of n_probes cooling down from 300 K with the time constant tau [s], one tick
+      every 'period' [s], a fraction 'invalid' of the samples being failed measures.
+    '''
+    rng      = np.random.default_rng(0)
+    metadata = []
+    for i in range(n_probes):
+        probe_type = forward_models[i%len(forward_models)][0]
+        metadata.append({'name':'probe_{}'.format(i), 'IP':'127.0.0.1', 'probe_nbr':i%8+1, 'probe_type':probe_type, 'above70K':False})
+    writer   = ArchiveWriter(path_to_file, [probe['name'] for probe in metadata], metadata=metadata)
+    # ---  --- #
+    t_0 = time.time()
+    for k in range(0, n_ticks, 1000):
+        t_   = t_0 + period*np.arange(k, min(k+1000, n_ticks))
+        T_   = 4. + 296.*np.exp(-(t_-t_0)/tau)
+        R_   = np.array([forward_models[i%len(forward_models)][1](T_) for i in range(n_probes)], dtype=float)
+        for j in range(len(t_)):
+            writer.append(np.full(n_probes, t_[j]), R_[:, j], np.full(n_probes, np.nan), valid=rng.random(n_probes)>=invalid)
+    writer.close()
+
+def runReplay(path_to_file, speed, display_fps=10, drain_budget=0.5, timeout=600.):
+    '''
+    * Replay path_to_file in the GUI, started as by the play button, until its end or 'timeout' [s].
+      Returns the worker and the GUI widget.
+    '''
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore    import QTimer
+    import Thermometrie_Cryo_GUI as gui
+    # ---  --- #
+    app    = QApplication.instance() or QApplication(sys.argv)
+    window = gui.MainWindow(replay=path_to_file, replay_speed=speed, display_fps=display_fps, drain_budget=drain_budget)
+    widget = window.main_widget
+    widget.startStop_continuous_record()
+    t_end  = time.time() + timeout
+    # ---
+    def poll():
+        if widget.replay_done or time.time()>t_end:
+            app.quit()
+    timer  = QTimer()
+    timer.timeout.connect(poll)
+    timer.start(50)
+    app.exec_()
+    timer.stop()
+    window.close()
+    # ---  --- #
+    return widget.worker, widget
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of the GUI, replaying a recording through the live pipeline.')
+    parser.add_argument('--file'       , default=None            , help='archive tca or txt file to replay, a synthetic archive is made if not given')
+    parser.add_argument('--probes'     , type=int  , default=6   , help='nbr of probes of the synthetic archive')
+    parser.add_argument('--ticks'      , type=int  , default=20000, help='nbr of ticks of the synthetic archive')
+    parser.add_argument('--period'     , type=float, default=1.  , help='[s], period of the ticks of the synthetic archive')
+    parser.add_argument('--invalid'    , type=float, default=0.  , help='fraction of failed measures in the synthetic archive')
+    parser.add_argument('--speed'      , type=float, default=0.  , help='replay speed, 0 -> as fast as possible')
+    parser.add_argument('--display-fps', type=float, default=10. , help='[Hz], refresh rate of the display')
+    parser.add_argument('--drain-budget', type=float, default=0.5, help='fraction of the display period spent at most in a drain of the GUI')
+    parser.add_argument('--timeout'    , type=float, default=600., help='[s]')
+    parser.add_argument('--offscreen'  , action='store_true'     , help='run without a display, QT_QPA_PLATFORM=offscreen')
+    # ---  --- #
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parseArguments(argv)
+    if args.offscreen:
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    # ---  --- #
+    path_to_file = args.file
+    if path_to_file is None:
+        path_to_file = os.path.join(tempfile.mkdtemp(), 'bench_replay.tca')
+        t_ = time.time()
+        makeArchive(path_to_file, args.probes, args.ticks, period=args.period, invalid=args.invalid)
+        print('Synthetic archive of {0} ticks of {1} probes made in {2:.2f} s'.format(args.ticks, args.probes, time.time()-t_))
+    # ---
+    worker, widget = runReplay(path_to_file, args.speed or None, display_fps=args.display_fps, drain_budget=args.drain_budget, timeout=args.timeout)
+    # ---  --- #
+    print('GUI: {0} ticks recorded, {1} frames painted, last drain {2:.3f} s after the first tick'.format(
+          worker.n_ticks-len(worker.queue), widget.scheduler.n_frames, (widget.t_last_drain or np.nan)-(worker.t_start or np.nan)))
+    if not worker.done.is_set():
+        print('Timeout: the replay did not end after {} s'.format(args.timeout))
+        return 1
+    return 0
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    sys.exit(main())
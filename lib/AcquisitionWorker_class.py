@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import time
+import threading
+import sys, os
+from collections import deque
+
+try:
+	from ResistanceProbe_class import ResistanceProbe
+except:
+	sys.path.append("../")
+	from lib.ResistanceProbe_class import ResistanceProbe
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class SampleQueue():
+    '''
+    Bounded queue between the acquisition thread and the GUI.
+    * Based on collections.deque, whose append and popleft are atomic, so that one producer and one consumer
+      do not need any lock.
+    * When the queue is full the oldest sample is dropped, and counted in 'dropped'.
+    '''
+    def __init__(self, maxlen=10000):
+        self.queue   = deque(maxlen=maxlen)
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def put(self, item):
+        if len(self.queue)==self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(item)
+
+    def drain(self, max_items=None):
+        '''
+        * Returns the list of the queued items, oldest first.
+        '''
+        items = []
+        # ---  --- #
+        while max_items is None or len(items)<max_items:
+            try:
+                items.append(self.queue.popleft())
+            except IndexError:
+                break
+        # ---  --- #
+        return items
+
+class AcquisitionWorker(threading.Thread):
+    '''
+    Thread that measures the resistance of the probes, independently of the GUI refresh.
+    * The thread owns its ResistanceProbe, made in 'run' so that its sockets live in this thread, and sharing
+      the dictionary of the probes settings with the GUI.
+    * Each sweep over the probes puts a dictionary {probe_id: (time, resistance)} in the SampleQueue 'queue',
+      which the GUI drains at its own refresh rate.
+    * In continuous mode a sweep is started every 1/fps seconds, or as soon as the previous one is done if it
+      took longer. Otherwise the thread waits for 'trigger' to make a single sweep.
+    '''
+    def __init__(self, probes, **kwargs):
+        super().__init__(daemon=True)
+        self.verbose    = kwargs.pop('verbose'   , False)
+        self.fps        = kwargs.pop('fps'       , 1) # Hz
+        self.timeout    = kwargs.pop('timeout'   , 0.5) # [s]
+        self.queue      = SampleQueue(kwargs.pop('queue_size', 10000))
+        self.stats      = kwargs.pop('stats'     , None) # NetworkStats, filled by the tracker of the ResistanceProbe of the thread
+        self.probes_dic = probes # dictionary of the probes settings, shared with the GUI ResistanceProbe
+        self.probes     = None   # ResistanceProbe, made in the thread
+        # ---  --- #
+        self.continuous = threading.Event()
+        self.triggered  = threading.Event()
+        self.stopped    = threading.Event()
+
+    def setFPS(self, fps):
+        self.fps = fps
+        self.triggered.set() # wake up the thread to take the new period into account
+
+    def setContinuous(self, state):
+        if state:
+            self.continuous.set()
+        else:
+            self.continuous.clear()
+        self.triggered.set()
+
+    def trigger(self):
+        '''
+        * Make a single sweep, when not in continuous mode.
+        '''
+        self.triggered.set()
+
+    def stop(self, timeout=None):
+        '''
+        * timeout: if not None, wait for the end of the sweep in progress at most timeout seconds.
+        '''
+        self.stopped.set()
+        self.triggered.set()
+        if timeout is not None and self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        self.probes = ResistanceProbe(probes=self.probes_dic, interface=False, timeout=self.timeout, stats=self.stats, verbose=self.verbose)
+        t_next      = time.time()
+        # ---  --- #
+        while not self.stopped.is_set():
+            if self.continuous.is_set():
+                wait = t_next - time.time()
+                if wait>0:
+                    self.triggered.wait(wait)
+                    self.triggered.clear()
+                    if time.time()<t_next: # woken up by setFPS/setContinuous/stop
+                        t_next = min(t_next, time.time()+1./self.fps)
+                        continue
+            else:
+                self.triggered.wait()
+                self.triggered.clear()
+                if self.stopped.is_set() or self.continuous.is_set():
+                    t_next = time.time()
+                    continue
+            # ---  --- #
+            self.queue.put( self.probes.sweep(list(self.probes_dic), timeout=self.timeout) )
+            # ---
+            t_next = max(t_next+1./self.fps, time.time()) if self.continuous.is_set() else time.time()
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    probes_dic = {1:{'name':'Boite Mel', 'IP':'192.168.1.101', 'probe_nbr':1}}
+    worker     = AcquisitionWorker(probes_dic, fps=2, verbose=True)
+    worker.start()
+    worker.setContinuous(True)
+    time.sleep(2)
+    worker.stop()
+    print(worker.queue.drain())
+    print('FINNISHED')
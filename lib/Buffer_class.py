@@ -9,51 +9,153 @@ import numpy as np
 import time
 import sys, os
 
-from PyQt5 import QtNetwork
-
 ##############################################################################################################
 # FUNCTION
 ##############################################################################################################
 
-class Buffer(list):
+class Buffer():
     '''
     Class that behaves like a buffer.
-    Inherit from list object in python.
+    * Fixed-capacity circular buffer backed by a numpy array. Pushing an element is O(1): the oldest element
+      is overwritten instead of shifting the whole list.
+    * The storage is mirrored, i.e each element is written twice at 'i' and 'i+capacity', so that the
+      elements in chronological order are always a contiguous slice of the storage. Thus 'view' returns
+      the content of the buffer without any copy, and can be given directly to plotting or saving functions.
+    * Only the last 'len(buffer)' elements are exposed. The elements that get out of the window when the
+      length is reduced are kept in the storage as long as they are not overwritten, so that growing again
+      the buffer up to its capacity is O(1).
+    * Still behaves like a list for indexing (buffer[i], buffer[-n:], buffer[i] = val), len and iteration.
+    * With the 'rows' argument, the buffer holds several series of the same length in a 2-D (rows, length)
+      array, pushed together one column at a time. Indexing then follows the numpy convention, eg:
+      buffer[row], buffer[row, -n:], buffer[:, -1].
     '''
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(self, data=[], **kwargs):
+        default_val = kwargs.pop('default_val', np.nan)
+        capacity    = kwargs.pop('capacity'   , None)
+        dtype       = kwargs.pop('dtype'      , float)
+        rows        = kwargs.pop('rows'       , None)
+        # ---  --- #
+        data_            = np.array(data, dtype=dtype, ndmin=1 if rows is None else 2)
+        self.default_val = default_val
+        self.length      = data_.shape[-1]
+        self.capacity    = max(int(capacity or 0), self.length, 1)
+        self.count       = 0 # total nbr of elements pushed since the creation of the buffer
+        self._head       = 0 # position in the storage of the next element to push, in [0, capacity)
+        self._data       = np.full(data_.shape[:-1]+(2*self.capacity,), default_val, dtype=dtype)
+        # ---  --- #
+        self._data[..., self.capacity-self.length:self.capacity]     = data_
+        self._data[..., 2*self.capacity-self.length:2*self.capacity] = data_
+
+    @property
+    def rows(self):
+        return self._data.shape[0] if self._data.ndim==2 else None
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.array(self.view(), dtype=dtype)
+
+    def __repr__(self):
+        return 'Buffer({})'.format(self.view().tolist())
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def __setitem__(self, key, value):
+        '''
+        * Write in the storage, and its mirror, at the position of the element(s) 'key' of the view.
+        '''
+        if   self._data.ndim==1:
+            lead, col_key = (), key
+        elif isinstance(key, tuple):
+            lead, col_key = key[:-1], key[-1]
+        elif isinstance(key, np.ndarray) and key.ndim==2: # 2-D boolean mask
+            lead, col_key = np.nonzero(key)[:-1], np.nonzero(key)[-1]
+        else:
+            lead, col_key = (key,), slice(None)
+        # ---  --- #
+        if isinstance(col_key, (int, np.integer)):
+            col = col_key + self.length if col_key<0 else col_key
+        else:
+            col = np.arange(self.length)[col_key]
+            if isinstance(col_key, slice) and lead and np.ndim(lead[0])>0: # numpy convention: array of rows x slice selects a block
+                rows_ = np.asarray(lead[0])
+                lead  = ((np.nonzero(rows_)[0] if rows_.dtype==bool else rows_)[..., None],)
+        phys = (self._head - self.length + col) % self.capacity
+        # ---  --- #
+        self._data[lead+(phys,)]               = value
+        self._data[lead+(phys+self.capacity,)] = value
+
+    def view(self):
+        '''
+        * Returns a read-only numpy view of the buffer in chronological order (oldest first), without copy.
+        * The view is only valid until the next push_element or change_length.
+        '''
+        start = self._head + self.capacity - self.length
+        view_ = self._data[..., start:start+self.length]
+        view_.flags.writeable = False
+        # ---  --- #
+        return view_
 
     def push_element(self, elmt):
-        self[:] = self[1:]+[elmt]
+        '''
+        * Push a new element, or a column of 'rows' elements, at the end of the buffer.
+        '''
+        self._data[..., self._head]               = elmt
+        self._data[..., self._head+self.capacity] = elmt
+        self._head   = (self._head + 1) % self.capacity
+        self.count  += 1
+        # ---  --- #
+        return self
+
+    def add_rows(self, nbr=1, **kwargs):
+        '''
+        * Add 'nbr' series filled with 'default_val' to a buffer created with the 'rows' argument.
+        '''
+        default_val = kwargs.pop('default_val', self.default_val)
+        # ---  --- #
+        new_rows   = np.full((nbr, self._data.shape[-1]), default_val, dtype=self._data.dtype)
+        self._data = np.concatenate([self._data, new_rows], axis=0)
+        # ---  --- #
         return self
 
     def change_length(self, new_len, **kwargs):
-        default_val = kwargs.pop('default_val', None)
+        '''
+        * Change the number of elements exposed by the buffer.
+        * O(1) as long as new_len is smaller than the capacity, otherwise the storage is reallocated with
+          at least twice the capacity, and the new elements are set to 'default_val'.
+        '''
+        default_val = kwargs.pop('default_val', self.default_val)
         # ---  --- #
-        curr_len = len(self)
+        new_len = int(new_len)
+        if new_len>self.capacity:
+            self.reallocate(max(new_len, 2*self.capacity), default_val=default_val)
         # ---
-        if curr_len>=new_len:
-            self[:] = self[-new_len:]
-        else:
-            self[:] = [default_val]*(new_len-curr_len) + self[:]
+        self.length = new_len
         # ---  --- #
         return self
-    '''
-    Trying to modify list class method in order to conserve the Buffer class when we make operation on the lists.
-    Indeed even if Buffer inherite from list class, when we make operation such as: Buffer[slice1] +  Buffer[slice2],
-    it will return a list object type, because the operator '+' defined in the list class returns a list object.
-    Eg:     buffer = Buffer( [i for i in range(10)] )
-            print(type(buffer))    --> <class '__main__.Buffer'>
-            print(type(buffer[:])) --> <class 'list'>
-    However, using the '[:]' seems to circonvene the problem without redefining the add operator.
-
-    def __add__(self, x):
-        return self.__class__(super().__add__(x))
-
-    def __getitem__(self, i):
-        res = super().__getitem__(i)
-        return self.__class__(res) if isinstance(res, list) else res
-    '''
+
+    def reallocate(self, new_capacity, **kwargs):
+        '''
+        * Change the capacity of the storage, keeping the last elements in chronological order.
+        '''
+        default_val = kwargs.pop('default_val', self.default_val)
+        # ---  --- #
+        new_capacity = int(new_capacity)
+        n_keep       = min(self.capacity, new_capacity)
+        start        = self._head + self.capacity - n_keep
+        kept         = self._data[..., start:start+n_keep].copy()
+        # ---
+        self._data    = np.full(self._data.shape[:-1]+(2*new_capacity,), default_val, dtype=self._data.dtype)
+        self._data[..., new_capacity-n_keep:new_capacity]     = kept
+        self._data[..., 2*new_capacity-n_keep:2*new_capacity] = kept
+        self._head    = 0
+        self.capacity = new_capacity
+        self.length   = min(self.length, new_capacity)
 
 ##############################################################################################################
 # MAIN
@@ -62,15 +164,21 @@ class Buffer(list):
 if  __name__=="__main__":
     print('STARTING: Thermometer')
     list_  = [i for i in range(10)]
-    buffer = Buffer(list_)
+    buffer = Buffer(list_, capacity=20, default_val=-1)
     print(buffer)
     print(type(buffer))
     print(type(buffer[:]))
-    buffer.push_element('hello world')
+    buffer.push_element(42)
     buffer.push_element(23)
     print(buffer)
     buffer.change_length(5)
     print(buffer)
     buffer.change_length(15)
     print(buffer)
+    buffer.change_length(25)
+    print(buffer)
+    buffer_2d = Buffer([[i for i in range(5)], [10*i for i in range(5)]], rows=2, capacity=10)
+    buffer_2d.push_element([5, 50])
+    buffer_2d[1, -1] = 55
+    print(buffer_2d)
     print('FINNISHED')
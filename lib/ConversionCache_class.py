@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import threading
+import sys, os
+from collections import OrderedDict
+
+try:
+	from Conversion_functions import convert_RtoT
+except:
+	sys.path.append("../")
+	from lib.Conversion_functions import convert_RtoT
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class ConversionCache():
+    '''
+    Memoization of the resistance to temperature conversion.
+    * The MacRT readings are quantized, so that during a stable period the same resistances come back many
+      times. The temperatures are thus kept in a LRU dictionary of bounded size 'maxsize', keyed by
+      (probe_type, above70K, round(R/dR_quant)).
+    * The temperature of a key is the conversion of the quantized resistance round(R/dR_quant)*dR_quant,
+      so that the result does not depend on the order of the lookups, and differs from convert_RtoT(R) by
+      at most the conversion of dR_quant/2 [Ohm]. With dR_quant=0 the resistances are used as they are.
+    * 'convert' works on scalars and arrays: the distinct keys of the array are looked up once, and all the
+      misses are converted together in a single convert_RtoT call.
+    * The non finite resistances are converted without being cached.
+    * The table is shared by the GUI thread and the threads of doConversionBuffer, its lookups and updates take a
+      lock, which is not held during the conversion of the misses.
+    '''
+    def __init__(self, **kwargs):
+        self.maxsize  = int(kwargs.pop('maxsize' , 4096))
+        self.dR_quant = kwargs.pop('dR_quant', 1e-3) # [Ohm]
+        self.verbose  = kwargs.pop('verbose' , False)
+        self.kwargs   = kwargs # other arguments given to convert_RtoT, eg method
+        # ---  --- #
+        self.table  = OrderedDict() # (probe_type, above70K, quantized R) --> T, least recently used first
+        self.lock   = threading.Lock()
+        self.hits   = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def __repr__(self):
+        return 'ConversionCache(size={0}/{1}, hits={2}, misses={3})'.format(len(self), self.maxsize, self.hits, self.misses)
+
+    def clear(self):
+        with self.lock:
+            self.table.clear()
+            self.hits   = 0
+            self.misses = 0
+
+    def hitRate(self):
+        return self.hits/(self.hits+self.misses) if self.hits+self.misses else 0.
+
+    def quantize(self, R_):
+        '''
+        * Returns the integer keys of the resistances R_, and the resistances they stand for.
+        '''
+        if not self.dR_quant:
+            return R_, R_
+        # ---  --- #
+        q = np.round(R_/self.dR_quant)
+        return q, q*self.dR_quant
+
+    def convert(self, R, probe_type, above70K=False):
+        '''
+        * Returns the temperature of R, a scalar or an array, as convert_RtoT.
+        '''
+        if np.ndim(R)==0 and np.isfinite(R): # scalar fast path
+            q   = round(R/self.dR_quant) if self.dR_quant else float(R)
+            key = (probe_type, bool(above70K), float(q))
+            with self.lock:
+                T = self.table.get(key, None)
+                if T is not None:
+                    self.hits += 1
+                    self.table.move_to_end(key)
+                    return T
+        # ---  --- #
+        R_ = np.array(R, ndmin=1, dtype=float)
+        T  = np.full(R_.shape, np.nan)
+        # ---  --- #
+        finite = np.isfinite(R_)
+        if not finite.all():
+            T[~finite] = convert_RtoT(R_[~finite], probe_type=probe_type, above70K=above70K, verbose=self.verbose, **self.kwargs)
+        # ---
+        q, R_q       = self.quantize(R_[finite])
+        q_u, idx, inv = np.unique(q, return_index=True, return_inverse=True)
+        T_u          = np.empty(q_u.shape)
+        missed       = []
+        with self.lock:
+            for i, q_ in enumerate(q_u.tolist()):
+                key = (probe_type, bool(above70K), q_)
+                T_  = self.table.get(key, None)
+                if T_ is not None:
+                    self.table.move_to_end(key)
+                    T_u[i] = T_
+                else:
+                    missed.append(i)
+            # ---
+            self.hits   += len(q) - len(missed) # the repetitions of a missed key in the array count as hits
+            self.misses += len(missed)
+        if missed:
+            T_u[missed] = convert_RtoT(R_q[idx[missed]], probe_type=probe_type, above70K=above70K, verbose=self.verbose, **self.kwargs)
+            with self.lock:
+                for i in missed:
+                    self.table[(probe_type, bool(above70K), q_u[i].item())] = T_u[i]
+                while len(self.table)>self.maxsize:
+                    self.table.popitem(last=False)
+        # ---
+        T[finite] = T_u[inv.reshape(-1)]
+        # ---  --- #
+        return T[0] if np.ndim(R)==0 else T.reshape(np.shape(R))
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    cache = ConversionCache(maxsize=100, dR_quant=1e-3)
+    R     = 1200 + np.round(np.random.randn(10000), 2)
+    T     = cache.convert(R, 'Mobile BT')
+    print(cache, cache.hitRate())
+    print(np.max(np.abs(T - convert_RtoT(R, probe_type='Mobile BT'))))
+    print(cache.convert(1200.004, 'Mobile BT'), convert_RtoT(1200.004, probe_type='Mobile BT'))
+    print('FINNISHED')
@@ -81,6 +81,64 @@ def ThermoHT_RvsT(T):
     '''
     return 1.01625*C100_RvsT(T)+PT100_RvsT(T)
 
+# ====== Derivative : dR/dT ====== #
+
+def PT100_dRdT(T, **kwargs):
+    '''
+    * Derivative of PT100_RvsT.
+    '''
+    a = kwargs.pop('a',   6.690566222875814e-9)
+    b = kwargs.pop('b', - 6.954505159584381e-5)
+    c = kwargs.pop('c',   0.4291105897341029  )
+    # ---  --- #
+    return 3*a*T**2 + 2*b*T + c
+
+def C100_dRdT(T, **kwargs):
+    '''
+    * Derivative of C100_RvsT, null bellow 1 K where the resistance is set to 1e6 Ohms.
+    '''
+    R0    = kwargs.pop('R0',  42.8)
+    T0    = kwargs.pop('T0',  0.43)
+    T1    = kwargs.pop('T1',  42.8)
+    alpha = kwargs.pop('mu',-0.476)
+    # ---  --- #
+    T_ = np.array(T, ndmin=1)
+    dR = np.zeros(T_.shape)
+    # ---  --- #
+    u        = (T_[T_>1]-T0)/T1
+    dR[T_>1] = R0*np.exp(u**alpha) * alpha*u**(alpha-1)/T1
+    # ---  --- #
+    return dR[0] if dR.size == 1 else dR
+
+def RuO2_dRdT(T, **kwargs):
+    '''
+    * Derivative of RuO2_RvsT.
+    '''
+    R0    = kwargs.pop('R0'   , 864.3237440617243     )
+    T0    = kwargs.pop('T0'   ,   0.8839588539497837  )
+    a     = kwargs.pop('a'    ,   0.01                )
+    alpha = kwargs.pop('alpha',  -0.33621556108985157 )
+    # ---  --- #
+    T_ = np.array(T, ndmin=1)
+    v  = (T_ + a)/T0
+    dR = R0*np.exp(v**alpha) * alpha*v**(alpha-1)/T0
+    # ---  --- #
+    return dR[0] if dR.size == 1 else dR
+
+def ThermoBT_dRdT(T):
+    '''
+    * Derivative of ThermoBT_RvsT.
+    '''
+    R_C, R_Ru = C100_RvsT(T), RuO2_RvsT(T)
+    # ---  --- #
+    return (C100_dRdT(T)/R_C**2 + RuO2_dRdT(T)/R_Ru**2) / (1/R_C+1/R_Ru)**2 + PT100_dRdT(T)
+
+def ThermoHT_dRdT(T):
+    '''
+    * Derivative of ThermoHT_RvsT.
+    '''
+    return 1.01625*C100_dRdT(T)+PT100_dRdT(T)
+
 # ====== function R --> T ====== #
 
 def ThermoBT_TvsR(R, **kwargs):
@@ -177,25 +235,96 @@ def C100_TvsR(R):
 
 # ====== revser function depending on >70 K ====== #
 
+def newtonArray(func, dfunc, y, x0, bracket, **kwargs):
+    '''
+    * Solve func(x) = y for all the elements of the array y together, with the Newton method safeguarded
+      by bisection (as 'rtsafe' in Numerical Recipes):
+        - each element keeps a bracket [lo, hi] where func(x)-y changes sign, updated at each iteration,
+        - when the Newton step goes out of the bracket, or the derivative vanishes, a bisection step is made,
+        - the elements stop iterating once converged, according to their own convergence mask.
+    * Returns (x, success), success being False for the elements with no sign change in the bracket
+      (no root), or not converged after maxiter iterations.
+    * Arguments:
+        - func, dfunc, the function and its derivative, working on numpy arrays
+        - x0, starting point, scalar or array
+        - bracket, (lo, hi) bounds of the search, scalars or arrays
+    '''
+    xtol    = kwargs.pop('xtol'   , 1e-12) # relative tolerance on x
+    maxiter = kwargs.pop('maxiter', 100)
+    # ---  --- #
+    evalf   = lambda x, y_: np.asarray(func(x), dtype=float).reshape(x.shape) - y_
+    evaldf  = lambda x    : np.asarray(dfunc(x), dtype=float).reshape(x.shape)
+    # ---  --- #
+    y_      = np.array(y, ndmin=1, dtype=float)
+    lo      = np.broadcast_to(np.asarray(bracket[0], dtype=float), y_.shape).copy()
+    hi      = np.broadcast_to(np.asarray(bracket[1], dtype=float), y_.shape).copy()
+    x       = np.broadcast_to(np.asarray(x0        , dtype=float), y_.shape).copy()
+    f_lo    = evalf(lo, y_)
+    f_hi    = evalf(hi, y_)
+    # ---
+    active  = np.isfinite(f_lo) & np.isfinite(f_hi) & (np.sign(f_lo)!=np.sign(f_hi)) # elements with a root in the bracket
+    success = active & ((f_lo==0) | (f_hi==0))
+    x[active & (f_lo==0)] = lo[active & (f_lo==0)]
+    x[active & (f_hi==0)] = hi[active & (f_hi==0)]
+    active &= ~success
+    outside = active & ((x<=np.minimum(lo, hi)) | (x>=np.maximum(lo, hi))) # starting point out of the bracket
+    x[outside] = 0.5*(lo+hi)[outside]
+    # ---  --- #
+    for i in range(maxiter):
+        idx = np.nonzero(active)[0]
+        if idx.size==0:
+            break
+        # ---
+        x_  = x[idx]
+        f   = evalf(x_, y_[idx])
+        df  = evaldf(x_)
+        # --- update bracket, keeping f(lo) and f(hi) of opposite signs
+        same_lo       = np.sign(f)==np.sign(f_lo[idx])
+        lo[idx[ same_lo]], f_lo[idx[ same_lo]] = x_[ same_lo], f[ same_lo]
+        hi[idx[~same_lo]], f_hi[idx[~same_lo]] = x_[~same_lo], f[~same_lo]
+        # --- Newton step, or bisection when out of the bracket
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = x_ - f/df
+        bisect        = ~np.isfinite(x_new) | (x_new<=np.minimum(lo[idx], hi[idx])) | (x_new>=np.maximum(lo[idx], hi[idx]))
+        x_new[bisect] = 0.5*(lo[idx]+hi[idx])[bisect]
+        # ---
+        done          = (f==0) | (np.abs(x_new-x_) <= xtol*np.maximum(np.abs(x_new), 1e-300))
+        x[idx]        = np.where(f==0, x_, x_new)
+        success[idx[done]] = True
+        active[idx[done]]  = False
+    # ---  --- #
+    return x, success
+
+def localMinimum(func, T_min, T_max, nbr=10001):
+    '''
+    * Temperature of the minimum of func on [T_min, T_max], on a grid of 'nbr' points.
+    '''
+    T_ = np.linspace(T_min, T_max, nbr)
+    return T_[np.argmin(func(T_))]
+
+# ---  --- #
+# The resistances have a local minimum just above the boundaries 70 K and 78.88 K, where R(T) is not monotonous.
+# The search above the boundary starts at this minimum, so that the bracket contains a single root.
+ThermoBT_T_Rmin70K = localMinimum(ThermoBT_RvsT, 7e1  , 7.5e1) # [K]
+ThermoHT_T_Rmin70K = localMinimum(ThermoHT_RvsT, 78.88, 8.5e1) # [K]
+
 def ThermoBT_TvsR_root(R, above70K=False, **kwargs):
     '''
     * For "Mobile BT"
     * Reference BT RuO2 C100 PT100, (pour le moment, ne l'utiliser qu'a haute temperature)
-    * scipy.optimize.newton( func, x0, *args, **kwargs), find the root of the function
-      'func(x)', while beginning at an initiate x0, close to the actual zero.
+    * Exact inverse of ThermoBT_RvsT, solved for all the elements together by newtonArray, with the analytic
+      derivative ThermoBT_dRdT. The root is searched in [~70.3 K, 1e4 K] if above70K, in [1e-3 K, 70 K] otherwise,
+      and the elements without root in this bracket are set to T_dflt.
     '''
     verbose = kwargs.pop('verbose', False)
     T_dflt  = kwargs.pop('T_dflt' , None) # [K]
+    bracket = kwargs.pop('bracket', (ThermoBT_T_Rmin70K, 1e4) if above70K else (1e-3, 7e1))
     # ---  --- #
-    R_      = np.array(R, ndmin=1)
-    T       = np.zeros(R_.shape)
+    T, success = newtonArray(ThermoBT_RvsT, ThermoBT_dRdT, R, 200 if above70K else 0.02, bracket, **kwargs)
     # ---  --- #
-    for i,r in enumerate(R_):
-        try:
-            T[i] = scipy.optimize.newton( (lambda T:ThermoBT_RvsT(T)-r) , 200 if above70K else 0.02)
-        except RuntimeError:
-            print('RuntimeError in ThermoBTTvsR_reverse: no value found with scipy.optimize.newton.') if verbose else None
-            T[i] = T_dflt
+    if not success.all():
+        print('Error in ThermoBT_TvsR_root: no value found for {:d} resistance(s).'.format(np.count_nonzero(~success))) if verbose else None
+        T[~success] = np.nan if T_dflt is None else T_dflt
     # ---  --- #
     return T[0] if T.size == 1 else T
 
@@ -203,78 +332,165 @@ def ThermoHT_TvsR_root(R, above70K=False, **kwargs):
     '''
     * For "Mobile HT"
     * Reference HT C100-PT100
-    * scipy.optimize.newton( func, x0, *args, **kwargs), find the root of the function
-      'func(x)', while beginning at an initiate x0, close to the actual zero.
+    * Exact inverse of ThermoHT_RvsT, solved for all the elements together by newtonArray, with the analytic
+      derivative ThermoHT_dRdT. The root is searched in [~78.9 K, 1e4 K] if above70K, in [1 K, 78.88 K]
+      otherwise, and the elements without root in this bracket are set to T_dflt.
     '''
     verbose = kwargs.pop('verbose', False)
     T_dflt  = kwargs.pop('T_dflt' , None) # [K]
+    bracket = kwargs.pop('bracket', (ThermoHT_T_Rmin70K, 1e4) if above70K else (1e0, 78.88))
     # ---  --- #
-    R_      = np.array(R, ndmin=1)
-    T       = np.zeros(R_.shape)
+    T, success = newtonArray(ThermoHT_RvsT, ThermoHT_dRdT, R, 200 if above70K else 2, bracket, **kwargs)
     # ---  --- #
-    for i,r in enumerate(R_):
-        try:
-            T[i] = scipy.optimize.newton( (lambda T:ThermoHT_RvsT(T)-r) , 200 if above70K else 2)
-        except RuntimeError:
-            print('RuntimeError in ThermoHTRvsT_reverse: no value found with scipy.optimize.newton.') if verbose else None
-            T[i] = T_dflt
+    if not success.all():
+        print('Error in ThermoHT_TvsR_root: no value found for {:d} resistance(s).'.format(np.count_nonzero(~success))) if verbose else None
+        T[~success] = np.nan if T_dflt is None else T_dflt
     # ---  --- #
     return T[0] if T.size == 1 else T
 
+# ====== Spline tables ====== #
+
+"""
+* Coefficients and domain of the cubic splines approximating the inverse of ThermoBT_RvsT and ThermoHT_RvsT,
+  from a manual optimisation made using cubicSpline_coeff_computing. On the segment k, for R in
+  [R_b[0], R_b[1]], T = a + b*(R-R_b[0]) + c*(R-R_b[0])**2 + d*(R-R_b[0])**3 with (a,b,c,d) = coeff.
+* The tables are compiled once at import by compileSplineTable, see ThermoBT_TvsR_spln.
+"""
+
+ThermoBT_spln_dic = {
+    0 : {'above70K':True , 'boundary': [ThermoBT_RvsT(7e1), 137.43235776204997], 'coeff': (70.0, 22.52365474990894, -6.9770467433559284, 0.8742043290186831)},
+    1 : {'above70K':True , 'boundary': [137.43235776204997, 200.98685724080576], 'coeff': (100.0, 4.766682114127137, -0.04579688972296893, 0.00031957563563563733)},
+    2 : {'above70K':True , 'boundary': [200.98685724080576, 435.85541705435446], 'coeff': (300.0, 2.8157229834824213, 0.00013794515044629046, 2.397764032829255e-06)},
+    3 : {'above70K':True , 'boundary': [435.85541705435446, 4090.247318593811 ], 'coeff': (1000.0, 3.2822226189393215, -3.633959540639026e-05, -5.141557734090797e-08)},
+    4 : {'above70K':False, 'boundary': [ThermoBT_RvsT(7e1), 134.09501041298557], 'coeff': (70.0, -309.14808022234035, 39455.93555381805, -1965549.9973341406)},
+    5 : {'above70K':False, 'boundary': [134.09501041298557, 134.1912335225398 ], 'coeff': (69.0, -69.79751530978243, 683.9821465446398, -2937.1689978712166)},
+    6 : {'above70K':False, 'boundary': [134.1912335225398, 134.61880261470728 ], 'coeff': (66.0, -19.75248316910303, 29.32324139567444, -24.501473836976256)},
+    7 : {'above70K':False, 'boundary': [134.61880261470728, 136.5008817453887 ], 'coeff': (61.0, -8.114794733567383, 2.7162611322203483, -0.5023313955667926)},
+    8 : {'above70K':False, 'boundary': [136.5008817453887, 144.34985840396163 ], 'coeff': (52.0, -3.2284656949032393, 0.28175447078524485, -0.012444975728843245)},
+    9 : {'above70K':False, 'boundary': [144.34985840396163, 164.85858143908155], 'coeff': (38.0, -1.1055689151400592, 0.033743005718536195, -0.0005238459754895229)},
+    10: {'above70K':False, 'boundary': [164.85858143908155, 221.29467734671675], 'coeff': (25.0, -0.38251798281257127, 0.004999813612340653, -2.9689707617719814e-05)},
+    11: {'above70K':False, 'boundary': [221.29467734671675, 333.69256212664845], 'coeff': (14.0, -0.10186615027810998, 0.0006394690872973255, -1.8515066294783854e-06)},
+    12: {'above70K':False, 'boundary': [333.69256212664845, 518.3387557892462 ], 'coeff': (8.0, -0.02828803471755293, 9.36815790651613e-05, -1.5419626481484084e-07)},
+    13: {'above70K':False, 'boundary': [518.3387557892462, 895.3730377547383  ], 'coeff': (5.0, -0.009463743398995247, 1.6166815445787894e-05, -1.362076413593773e-08)},
+    14: {'above70K':False, 'boundary': [895.3730377547383, ThermoBT_RvsT(1e0) ], 'coeff': (3.0, -0.0030816291312388147, 2.30140128889834e-06, -8.351750508849628e-10)},
+    15: {'above70K':False, 'boundary': [ThermoBT_RvsT(1e0), 2857.215303444065 ], 'coeff': (1.0, -0.001403090273183254, 1.360737411081143e-06, -6.306275276488724e-10)},
+    16: {'above70K':False, 'boundary': [2857.215303444065 , 4233.24990567035  ], 'coeff': (0.5, -0.0004398413920480902, 2.503027512871836e-07, -6.091160370287172e-11)},
+    17: {'above70K':False, 'boundary': [4233.24990567035  , 7393.954522712528 ], 'coeff': (0.21, -9.654104187203177e-05, 2.7399044169510914e-08, -3.1220365644014624e-12)},
+    18: {'above70K':False, 'boundary': [7393.954522712528 , 14441.30260446487 ], 'coeff': (0.08, -1.6696735059732812e-05, 2.137936093789363e-09, -1.100352259007167e-13)},
+    19: {'above70K':False, 'boundary': [14441.30260446487 , 29899.177715334856], 'coeff': (0.03, -2.8662308097586417e-06, 1.5707126658763552e-10, -3.5807105027714794e-15)},
+    20: {'above70K':False, 'boundary': [29899.177715334856, 63950.41097093372 ], 'coeff': (0.01, -5.382182297889829e-07, 1.204188705294153e-11, -1.1740583816654862e-16)},
+}
+
+def ThermoHT_spln_dic(dR_bnd=1e-5):
+    '''
+    * The upper boundary of the last segment depends on dR_bnd.
+    '''
+    return {
+        0 : {'above70K':True , 'boundary': [ThermoHT_RvsT(78.88),  150.61524966725247], 'coeff': (78.87, 56.1844528190399, -115.21650595296315, 92.91011161676585)},
+        1 : {'above70K':True , 'boundary': [ 150.61524966725247 ,  151.78900178948638], 'coeff': (90.0, 9.803150644715748, -0.9541498222969034, -0.11869751514322234)},
+        2 : {'above70K':True , 'boundary': [ 151.78900178948638 ,  178.07012929774106], 'coeff': (100.0, 6.44617832053299, -0.17477612688316743, 0.002826341030047476)},
+        3 : {'above70K':True , 'boundary': [ 178.07012929774106 ,  349.907262631601  ], 'coeff': (200.0, 3.0852288333006377, -0.0026543562764718516, 9.503525585446059e-06)},
+        4 : {'above70K':True , 'boundary': [ 349.907262631601   ,  445.274437748751  ], 'coeff': (700.0, 3.0317556045995855, 0.000969502342940667, 2.366398942705002e-06)},
+        5 : {'above70K':True , 'boundary': [ 445.274437748751   , 1442.1881228478064 ], 'coeff': (1000.0, 3.3104272074809544, 0.003208419044933503, -2.0073843666710245e-06)},
+        6 : {'above70K':True , 'boundary': [1442.1881228478064  , ThermoHT_RvsT(1e4) ], 'coeff': (5500.0, 3.538239255543073, -0.0011155413449810807, 1.5858861298707488e-07)},
+        7 : {'above70K':False, 'boundary': [ThermoHT_RvsT(78.88),    150.63460484496625], 'coeff': (78.89, -49.68664219148569, 98.12112288640778, -74.13358972012989)},
+        8 : {'above70K':False, 'boundary': [  150.63460484496625,    152.08990434374232], 'coeff': (69.0, -6.996422594399698, 0.9709034007228218, 0.04075605632432042)},
+        9 : {'above70K':False, 'boundary': [  152.08990434374232,    166.90080016951902], 'coeff': (61.0, -3.459361554206645, 0.20552366262672184, -0.005185654321098554)},
+        10: {'above70K':False, 'boundary': [  166.90080016951902,    195.3079427383702 ], 'coeff': (38.0, -0.7325487027356796, 0.01299398006621569, -0.00011673918843419716)},
+        11: {'above70K':False, 'boundary': [  195.3079427383702 ,    275.4114419501825 ], 'coeff': (25.0, -0.2605281681704082, 0.0022282978159015687, -8.616538071755353e-06)},
+        12: {'above70K':False, 'boundary': [  275.4114419501825 ,    453.72525498106404], 'coeff': (14.0, -0.06518297122915089, 0.00025748929720128286, -4.5224409957563403e-07)},
+        13: {'above70K':False, 'boundary': [  453.72525498106404,    817.5436713623418 ], 'coeff': (8.0, -0.015373704581517638, 2.8043857128286924e-05, -2.3231713819859912e-08)},
+        14: {'above70K':False, 'boundary': [  817.5436713623418 ,   1998.6568610417357 ], 'coeff': (5.0, -0.0038667687689848936, 2.8542271727440443e-06, -8.585591732787398e-10)},
+        15: {'above70K':False, 'boundary': [ 1998.6568610417357 ,   5433.732919117695  ], 'coeff': (3.0, -0.0006492945639255994, 1.6059978003971705e-07, -1.6398000404073262e-11)},
+        16: {'above70K':False, 'boundary': [ 5433.732919117695  ,  18759.700620748117  ], 'coeff': (2.0, -0.00011146840690453101, 7.938633457490856e-09, -2.2156844989306396e-13)},
+        17: {'above70K':False, 'boundary': [18759.700620748117  ,  60276.239081227555  ], 'coeff': (1.4, -1.5172329659141793e-05, 2.86508463044623e-10, -2.290840867286958e-15)},
+        18: {'above70K':False, 'boundary': [60276.239081227555  ,ThermoHT_RvsT(1e0+dR_bnd)], 'coeff': (1.1, -2.598913621689561e-06, 5.380814434880268e-12, 1.0165656652245034e-16)},
+    }
+
+def compileSplineTable(spln_dic, dR_bnd=1e-5):
+    '''
+    * Compile the spline dictionary into contiguous arrays, for each value of 'above70K':
+        table[above70K] = (R_lo, R_hi, coeff, depth)
+      where R_lo and R_hi are the boundaries of the segments sorted by R_lo, coeff the (4, n_segments) array
+      of the (a,b,c,d) coefficients, and depth the maximal nbr of previous segments overlapping a segment
+      once the boundaries are extended by dR_bnd.
+    '''
+    table = {}
+    # ---  --- #
+    for above70K in [True, False]:
+        keys  = [key for key in spln_dic if spln_dic[key]['above70K']==above70K]
+        keys  = sorted(keys, key=lambda key: spln_dic[key]['boundary'][0])
+        R_lo  = np.array([spln_dic[key]['boundary'][0] for key in keys], dtype=float)
+        R_hi  = np.array([spln_dic[key]['boundary'][1] for key in keys], dtype=float)
+        coeff = np.array([spln_dic[key]['coeff'      ] for key in keys], dtype=float).T.copy()
+        # ---
+        depth = 0
+        for k in range(len(keys)):
+            overlap = np.nonzero(R_hi[:k]+dR_bnd >= R_lo[k]-dR_bnd)[0]
+            depth   = max(depth, k-overlap.min()) if overlap.size else depth
+        # ---
+        table[above70K] = (R_lo, R_hi, coeff, depth)
+    # ---  --- #
+    return table
+
+def evalSplineTable(R_, table, dR_bnd=1e-5):
+    '''
+    * Returns the sum of the splines of 'table' whose domain, extended by dR_bnd, contains R_ (a numpy array).
+      The segment of each element is found with a single np.searchsorted, and the polynomials are evaluated
+      with the Horner scheme. The contributions of the segments overlapping on their boundaries are added,
+      as it is done by the loop over the segments of the spline dictionary.
+    '''
+    R_lo, R_hi, coeff, depth = table
+    T = np.zeros(R_.shape)
+    # ---  --- #
+    k = np.searchsorted(R_lo-dR_bnd, R_, side='right') - 1
+    for offset in range(depth+1):
+        j       = k - offset
+        msk     = (j>=0) & (R_ <= R_hi[np.maximum(j, 0)]+dR_bnd)
+        j_      = j[msk]
+        x       = R_[msk] - R_lo[j_]
+        a,b,c,d = coeff[:, j_]
+        # ---
+        T[msk] += a + x*(b + x*(c + x*d))
+    # ---  --- #
+    return T
+
+# ====== Spline R --> T ====== #
+
+ThermoBT_R70K     = ThermoBT_RvsT(7e+1)
+ThermoBT_Rmin     = ThermoBT_RvsT(1e+4)
+ThermoBT_Rmax     = ThermoBT_RvsT(1e-3)
+ThermoBT_spln_tab = {1e-5: compileSplineTable(ThermoBT_spln_dic)} # compiled table for each dR_bnd
+
+ThermoHT_Rmin     = ThermoHT_RvsT(1e+4)
+ThermoHT_Rmax     = ThermoHT_RvsT(1e0 )
+ThermoHT_spln_tab = {1e-5: compileSplineTable(ThermoHT_spln_dic(1e-5))} # compiled table for each dR_bnd
+
 def ThermoBT_TvsR_spln(R, above70K=False, **kwargs):
     '''
     * Inverse of ThermoBT_RvsT, in order to get the temperature from a resistance measurement.
       However, one must take the distinction between the part above 70 K, and the one bellow 70K.
     * Without any analytical inverse function, the evaluation of T=func(R) is made using approximation
       cubic spline functions, defines in specific range of R. It commes from a manual optimisation, and
-      the good enough spline coefficient are stored in the function.
-    * The spline optimisation has been made using cubicSpline_coeff_computing.
+      the good enough spline coefficient are stored in ThermoBT_spln_dic.
+    * The spline table is compiled at import, and evaluated with evalSplineTable.
     '''
     verbose  = kwargs.pop('verbose', False)
     dR_bnd   = kwargs.pop('dR_bnd' , 1e-5) # [Ohm]
-    R_inv    = kwargs.pop('R_inv'  , ThermoBT_RvsT(7e+1))
+    R_inv    = kwargs.pop('R_inv'  , ThermoBT_R70K)
     T_inv    = kwargs.pop('T_inv'  , np.nan)
-    # --- Spline coefficient and domain definition --- #
-    spln_dic = {
-        0 : {'above70K':True , 'boundary': [ThermoBT_RvsT(7e1), 137.43235776204997], 'coeff': (70.0, 22.52365474990894, -6.9770467433559284, 0.8742043290186831)},
-        1 : {'above70K':True , 'boundary': [137.43235776204997, 200.98685724080576], 'coeff': (100.0, 4.766682114127137, -0.04579688972296893, 0.00031957563563563733)},
-        2 : {'above70K':True , 'boundary': [200.98685724080576, 435.85541705435446], 'coeff': (300.0, 2.8157229834824213, 0.00013794515044629046, 2.397764032829255e-06)},
-        3 : {'above70K':True , 'boundary': [435.85541705435446, 4090.247318593811 ], 'coeff': (1000.0, 3.2822226189393215, -3.633959540639026e-05, -5.141557734090797e-08)},
-        4 : {'above70K':False, 'boundary': [ThermoBT_RvsT(7e1), 134.09501041298557], 'coeff': (70.0, -309.14808022234035, 39455.93555381805, -1965549.9973341406)},
-        5 : {'above70K':False, 'boundary': [134.09501041298557, 134.1912335225398 ], 'coeff': (69.0, -69.79751530978243, 683.9821465446398, -2937.1689978712166)},
-        6 : {'above70K':False, 'boundary': [134.1912335225398, 134.61880261470728 ], 'coeff': (66.0, -19.75248316910303, 29.32324139567444, -24.501473836976256)},
-        7 : {'above70K':False, 'boundary': [134.61880261470728, 136.5008817453887 ], 'coeff': (61.0, -8.114794733567383, 2.7162611322203483, -0.5023313955667926)},
-        8 : {'above70K':False, 'boundary': [136.5008817453887, 144.34985840396163 ], 'coeff': (52.0, -3.2284656949032393, 0.28175447078524485, -0.012444975728843245)},
-        9 : {'above70K':False, 'boundary': [144.34985840396163, 164.85858143908155], 'coeff': (38.0, -1.1055689151400592, 0.033743005718536195, -0.0005238459754895229)},
-        10: {'above70K':False, 'boundary': [164.85858143908155, 221.29467734671675], 'coeff': (25.0, -0.38251798281257127, 0.004999813612340653, -2.9689707617719814e-05)},
-        11: {'above70K':False, 'boundary': [221.29467734671675, 333.69256212664845], 'coeff': (14.0, -0.10186615027810998, 0.0006394690872973255, -1.8515066294783854e-06)},
-        12: {'above70K':False, 'boundary': [333.69256212664845, 518.3387557892462 ], 'coeff': (8.0, -0.02828803471755293, 9.36815790651613e-05, -1.5419626481484084e-07)},
-        13: {'above70K':False, 'boundary': [518.3387557892462, 895.3730377547383  ], 'coeff': (5.0, -0.009463743398995247, 1.6166815445787894e-05, -1.362076413593773e-08)},
-        14: {'above70K':False, 'boundary': [895.3730377547383, ThermoBT_RvsT(1e0) ], 'coeff': (3.0, -0.0030816291312388147, 2.30140128889834e-06, -8.351750508849628e-10)},
-        15: {'above70K':False, 'boundary': [ThermoBT_RvsT(1e0), 2857.215303444065 ], 'coeff': (1.0, -0.001403090273183254, 1.360737411081143e-06, -6.306275276488724e-10)},
-        16: {'above70K':False, 'boundary': [2857.215303444065 , 4233.24990567035  ], 'coeff': (0.5, -0.0004398413920480902, 2.503027512871836e-07, -6.091160370287172e-11)},
-        17: {'above70K':False, 'boundary': [4233.24990567035  , 7393.954522712528 ], 'coeff': (0.21, -9.654104187203177e-05, 2.7399044169510914e-08, -3.1220365644014624e-12)},
-        18: {'above70K':False, 'boundary': [7393.954522712528 , 14441.30260446487 ], 'coeff': (0.08, -1.6696735059732812e-05, 2.137936093789363e-09, -1.100352259007167e-13)},
-        19: {'above70K':False, 'boundary': [14441.30260446487 , 29899.177715334856], 'coeff': (0.03, -2.8662308097586417e-06, 1.5707126658763552e-10, -3.5807105027714794e-15)},
-        20: {'above70K':False, 'boundary': [29899.177715334856, 63950.41097093372 ], 'coeff': (0.01, -5.382182297889829e-07, 1.204188705294153e-11, -1.1740583816654862e-16)},
-    }
     # ---  --- #
-    R_ = np.array(R, ndmin=1)
+    if not dR_bnd in ThermoBT_spln_tab:
+        ThermoBT_spln_tab[dR_bnd] = compileSplineTable(ThermoBT_spln_dic, dR_bnd)
+    # ---  --- #
+    R_ = np.array(R, ndmin=1, dtype=float)
     T  = np.zeros(R_.shape)
     # --- Set out of range default values
-    T[R_>ThermoBT_RvsT(1e+4)] += 1e4*above70K
-    T[R_>ThermoBT_RvsT(1e-3)] += 1e-3*(not above70K)
-    T[R_<R_inv              ]  = T_inv
+    T[R_>ThermoBT_Rmin] += 1e4*above70K
+    T[R_>ThermoBT_Rmax] += 1e-3*(not above70K)
+    T[R_<R_inv        ]  = T_inv
     # --- Computing T from splines
-    for spl_key in spln_dic:
-        R_b     = spln_dic[spl_key]['boundary']
-        a,b,c,d = spln_dic[spl_key]['coeff']
-        # ---
-        idx_g   = np.where(R_b[0]-dR_bnd<=R_)[0]
-        idx_l   = np.where(R_<=R_b[1]+dR_bnd)[0]
-        idx     = list(set(idx_g).intersection(set(idx_l)))
-        # ---
-        T[idx] += (a + b*(R_[idx]-R_b[0])**1 + c*(R_[idx]-R_b[0])**2 + d*(R_[idx]-R_b[0])**3) * int(spln_dic[spl_key]['above70K']==above70K)
+    T += evalSplineTable(R_, ThermoBT_spln_tab[dR_bnd][bool(above70K)], dR_bnd)
     # ---  --- #
     return T[0] if T.size == 1 else T
 
@@ -284,82 +500,134 @@ def ThermoHT_TvsR_spln(R, above70K=False, **kwargs):
       However, one must take the distinction between the part above 70 K, and the one bellow 70K.
     * Without any analytical inverse function, the evaluation of T=func(R) is made using approximation
       cubic spline functions, defines in specific range of R. It commes from a manual optimisation, and
-      the good enough spline coefficient are stored in the function.
-    * The spline optimisation has been made using cubicSpline_coeff_computing.
+      the good enough spline coefficient are stored in ThermoHT_spln_dic.
+    * The spline table is compiled at import, and evaluated with evalSplineTable.
     '''
     verbose  = kwargs.pop('verbose', False)
     dR_bnd   = kwargs.pop('dR_bnd' , 1e-5) # [Ohm]
     T_thrs   = kwargs.pop('T_thrs' ,78.88)
-    # --- Spline coefficient and domain definition --- #
-    spln_dic = {
-        0 : {'above70K':True , 'boundary': [ThermoHT_RvsT(78.88),  150.61524966725247], 'coeff': (78.87, 56.1844528190399, -115.21650595296315, 92.91011161676585)},
-        1 : {'above70K':True , 'boundary': [ 150.61524966725247 ,  151.78900178948638], 'coeff': (90.0, 9.803150644715748, -0.9541498222969034, -0.11869751514322234)},
-        2 : {'above70K':True , 'boundary': [ 151.78900178948638 ,  178.07012929774106], 'coeff': (100.0, 6.44617832053299, -0.17477612688316743, 0.002826341030047476)},
-        3 : {'above70K':True , 'boundary': [ 178.07012929774106 ,  349.907262631601  ], 'coeff': (200.0, 3.0852288333006377, -0.0026543562764718516, 9.503525585446059e-06)},
-        4 : {'above70K':True , 'boundary': [ 349.907262631601   ,  445.274437748751  ], 'coeff': (700.0, 3.0317556045995855, 0.000969502342940667, 2.366398942705002e-06)},
-        5 : {'above70K':True , 'boundary': [ 445.274437748751   , 1442.1881228478064 ], 'coeff': (1000.0, 3.3104272074809544, 0.003208419044933503, -2.0073843666710245e-06)},
-        6 : {'above70K':True , 'boundary': [1442.1881228478064  , ThermoHT_RvsT(1e4) ], 'coeff': (5500.0, 3.538239255543073, -0.0011155413449810807, 1.5858861298707488e-07)},
-        7 : {'above70K':False, 'boundary': [ThermoHT_RvsT(78.88),    150.63460484496625], 'coeff': (78.89, -49.68664219148569, 98.12112288640778, -74.13358972012989)},
-        8 : {'above70K':False, 'boundary': [  150.63460484496625,    152.08990434374232], 'coeff': (69.0, -6.996422594399698, 0.9709034007228218, 0.04075605632432042)},
-        9 : {'above70K':False, 'boundary': [  152.08990434374232,    166.90080016951902], 'coeff': (61.0, -3.459361554206645, 0.20552366262672184, -0.005185654321098554)},
-        10: {'above70K':False, 'boundary': [  166.90080016951902,    195.3079427383702 ], 'coeff': (38.0, -0.7325487027356796, 0.01299398006621569, -0.00011673918843419716)},
-        11: {'above70K':False, 'boundary': [  195.3079427383702 ,    275.4114419501825 ], 'coeff': (25.0, -0.2605281681704082, 0.0022282978159015687, -8.616538071755353e-06)},
-        12: {'above70K':False, 'boundary': [  275.4114419501825 ,    453.72525498106404], 'coeff': (14.0, -0.06518297122915089, 0.00025748929720128286, -4.5224409957563403e-07)},
-        13: {'above70K':False, 'boundary': [  453.72525498106404,    817.5436713623418 ], 'coeff': (8.0, -0.015373704581517638, 2.8043857128286924e-05, -2.3231713819859912e-08)},
-        14: {'above70K':False, 'boundary': [  817.5436713623418 ,   1998.6568610417357 ], 'coeff': (5.0, -0.0038667687689848936, 2.8542271727440443e-06, -8.585591732787398e-10)},
-        15: {'above70K':False, 'boundary': [ 1998.6568610417357 ,   5433.732919117695  ], 'coeff': (3.0, -0.0006492945639255994, 1.6059978003971705e-07, -1.6398000404073262e-11)},
-        16: {'above70K':False, 'boundary': [ 5433.732919117695  ,  18759.700620748117  ], 'coeff': (2.0, -0.00011146840690453101, 7.938633457490856e-09, -2.2156844989306396e-13)},
-        17: {'above70K':False, 'boundary': [18759.700620748117  ,  60276.239081227555  ], 'coeff': (1.4, -1.5172329659141793e-05, 2.86508463044623e-10, -2.290840867286958e-15)},
-        18: {'above70K':False, 'boundary': [60276.239081227555  ,ThermoHT_RvsT(1e0+dR_bnd)], 'coeff': (1.1, -2.598913621689561e-06, 5.380814434880268e-12, 1.0165656652245034e-16)},
-    }
     # ---  --- #
-    R_ = np.array(R, ndmin=1)
+    if not dR_bnd in ThermoHT_spln_tab:
+        ThermoHT_spln_tab[dR_bnd] = compileSplineTable(ThermoHT_spln_dic(dR_bnd), dR_bnd)
+    # ---  --- #
+    R_ = np.array(R, ndmin=1, dtype=float)
     T  = np.zeros(R_.shape)
     # --- Set out of range default values
-    T[R_>ThermoHT_RvsT(1e+4)  ] += 1e4*above70K
-    T[R_>ThermoHT_RvsT(1e0 )  ] += 1e-3*(not above70K)
+    T[R_>ThermoHT_Rmin        ] += 1e4*above70K
+    T[R_>ThermoHT_Rmax        ] += 1e-3*(not above70K)
     T[R_<ThermoHT_RvsT(T_thrs)]  = np.nan
     # --- Computing T from splines
-    for spl_key in spln_dic:
-        R_b     = spln_dic[spl_key]['boundary']
-        a,b,c,d = spln_dic[spl_key]['coeff']
-        # ---
-        idx_g   = np.where(R_b[0]-dR_bnd<=R_)[0]
-        idx_l   = np.where(R_<=R_b[1]+dR_bnd)[0]
-        idx     = list(set(idx_g).intersection(set(idx_l)))
-        # ---
-        T[idx] += (a + b*(R_[idx]-R_b[0])**1 + c*(R_[idx]-R_b[0])**2 + d*(R_[idx]-R_b[0])**3) * int(spln_dic[spl_key]['above70K']==above70K)
+    T += evalSplineTable(R_, ThermoHT_spln_tab[dR_bnd][bool(above70K)], dR_bnd)
     # ---  --- #
     return T[0] if T.size == 1 else T
 
 
 
+# ====== Converter registry ====== #
+
+class ProbeConverter():
+    '''
+    Conversion R --> T of a probe type, with its prepared state.
+    * TvsR(R, above70K=..., **kwargs) is the conversion function working on arrays, whose compiled tables are
+      made at import, and TvsR_root an optional exact inverse used with method='root'.
+    * uses_above70K tells if the conversion depends on the T > 70 K state, which is otherwise ignored.
+    * R_range = (R_min, R_max) is the range of resistances where the conversion is valid, None if unknown.
+    * 'handle(above70K)' returns the function R --> T for this state, made once and reused, so that the
+      callers can fetch it when the probe type changes instead of dispatching at each sample.
+    '''
+    def __init__(self, name, TvsR, **kwargs):
+        self.name          = name
+        self.TvsR          = TvsR
+        self.TvsR_root     = kwargs.pop('TvsR_root'    , None)
+        self.uses_above70K = kwargs.pop('uses_above70K', False)
+        self.R_range       = kwargs.pop('R_range'      , None) # [Ohm]
+        self.description   = kwargs.pop('description'  , '')
+        # ---  --- #
+        self.handles = {}
+
+    def __repr__(self):
+        return 'ProbeConverter({})'.format(self.name)
+
+    def convert(self, R, above70K=False, **kwargs):
+        '''
+        * Returns the temperature of R, a scalar or an array.
+        '''
+        method = kwargs.pop('method', 'spln')
+        # ---  --- #
+        if method=='root' and self.TvsR_root:
+            return self.TvsR_root(R, above70K=above70K, **kwargs)
+        if self.uses_above70K:
+            return self.TvsR(R, above70K=above70K)
+        return self.TvsR(R)
+
+    def handle(self, above70K=False):
+        above70K = bool(above70K) and self.uses_above70K
+        # ---  --- #
+        if not above70K in self.handles:
+            if self.uses_above70K:
+                self.handles[above70K] = lambda R: self.TvsR(R, above70K=above70K)
+            else:
+                self.handles[above70K] = self.TvsR
+        # ---  --- #
+        return self.handles[above70K]
+
+    def isValid(self, R):
+        '''
+        * Returns the mask of the resistances in R_range.
+        '''
+        R_ = np.asarray(R, dtype=float)
+        if self.R_range is None:
+            return np.isfinite(R_)
+        # ---  --- #
+        return (self.R_range[0]<=R_) & (R_<=self.R_range[1])
+
+converters = {} # probe_type --> ProbeConverter, in the order of registration
+
+def registerConverter(converter):
+    '''
+    * Add a ProbeConverter to the registry, replacing the one of the same name if any.
+    '''
+    converters[converter.name] = converter
+    return converter
+
+def getConverter(probe_type):
+    '''
+    * Returns the ProbeConverter of probe_type, None if it is not registered.
+    '''
+    return converters.get(probe_type, None)
+
+def probeTypes():
+    return list(converters)
+
+registerConverter(ProbeConverter("Mobile BT"  , ThermoBT_TvsR_spln, TvsR_root=ThermoBT_TvsR_root, uses_above70K=True, R_range=(ThermoBT_Rmin, ThermoBT_Rmax), description="reference BT RuO2 C100 PT100, (pour le moment, ne l'utiliser qu'a haute temperature)"))
+registerConverter(ProbeConverter("Mobile HT"  , ThermoHT_TvsR_spln, TvsR_root=ThermoHT_TvsR_root, uses_above70K=True, R_range=(ThermoHT_Rmin, ThermoHT_Rmax), description="reference HT C100-PT100"))
+registerConverter(ProbeConverter("PT100"      , PT100_TvsR        , description="PT100 seule"))
+registerConverter(ProbeConverter("Mobile BM"  , ThermoBT_TvsR     , description="Mobile BM BT RuO2 C100 PT100, (a utiliser uniquement a basse temperature pour les thermometres mobiles)"))
+registerConverter(ProbeConverter("NICO BT CAL", ThermoNICOCAL_TvsR, description="Thermo NICO"))
+registerConverter(ProbeConverter("NICO BT"    , ThermoNICO_TvsR   , R_range=(0, 1000), description="Thermo NICO"))
+
 # ====== Global conversion ====== #
 
 def convert_RtoT(R, **kwargs):
     '''
+    * Conversion with the ProbeConverter of probe_type in the registry.
+    * method, for "Mobile BT" and "Mobile HT": 'spln' for the spline approximation, 'root' for the exact
+      inverse computed with newtonArray.
     '''
     verbose    = kwargs.pop('verbose'   , False)
     probe_type = kwargs.pop('probe_type', 'Mobile BM')
     above70K   = kwargs.pop('above70K'  , False)
     T_dflt     = kwargs.pop('T_dflt'    , 500) # [K]
+    method     = kwargs.pop('method'    , 'spln')
     # ---  --- #
-    if   probe_type in ["Mobile BT"]: # reference BT RuO2 C100 PT100, (pour le moment, ne l'utiliser qu'a haute temperature)
-        #T = ThermoBT_TvsR_root(R, above70K=above70K, T_dflt=T_dflt)
-        T = ThermoBT_TvsR_spln(R, above70K=above70K)
-    elif probe_type in ["Mobile HT"]: # reference HT C100-PT100
-        #T = ThermoHT_TvsR_root(R, above70K=above70K, T_dflt=T_dflt)
-        T = ThermoHT_TvsR_spln(R, above70K=above70K)
-    elif probe_type in ["NICO BT CAL"]: # Thermo NICO
-        T = ThermoNICOCAL_TvsR(R)
-    elif probe_type in ["NICO BT"]:     # Thermo NICO
-        T = ThermoNICO_TvsR(R)
-    elif probe_type in ["PT100"]:       # PT100 seule
-        T = PT100_TvsR(R)
-    elif probe_type in ["Mobile BM"]:   # Mobile BM BT RuO2 C100 PT100, (a utiliser uniquement a basse temperature pour les thermometres mobiles)
-        T = ThermoBT_TvsR(R)
+    converter = getConverter(probe_type)
+    if converter is None:
+        print('Error: in convert_RtoT, the probe type {} is not valid.'.format(probe_type)) if verbose else None
+        return None
     # ---  --- #
-    return T
+    if method=='root':
+        return converter.convert(R, above70K=above70K, method=method, T_dflt=T_dflt, verbose=verbose)
+    return converter.convert(R, above70K=above70K)
 
 
 
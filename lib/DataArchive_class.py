@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import json
+import struct
+import sys, os
+
+try:
+	from DataWriter_class import DataWriter
+except:
+	sys.path.append("../")
+	from lib.DataWriter_class import DataWriter
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+# ====== File layout ====== #
+# The archive is made of:
+#   - a fixed part: magic (8 bytes), header size (uint64), nbr of ticks written (uint64),
+#   - the header, a json dictionary padded with spaces up to 'header size' bytes, so that it can be rewritten
+#     in place when the metadata change,
+#   - the chunks, each one a float64 array (4, n_probes, chunk_size) of the columns time, resistance,
+#     temperature and valid (0. or 1.) of chunk_size ticks. A flush only writes the ticks queued since the last
+#     one, i.e the slice of each (column, probe) row, so that its cost does not depend on chunk_size. The file
+#     is extended to the end of a chunk when the chunk is started, the part of the last chunk not written yet
+#     being undefined (zeros) and never read, cf ArchiveReader.read.
+
+ARCHIVE_MAGIC   = b'TCARCH01'
+ARCHIVE_FIXED   = struct.Struct('<8sQQ')
+ARCHIVE_COLUMNS = ['time', 'resistance', 'temperature', 'valid']
+
+class ArchiveWriter(DataWriter):
+    '''
+    DataWriter of the chunked binary archive, cf the file layout above.
+    * metadata: list of one dictionary per probe, in the order of 'names', eg {'name', 'IP', 'probe_nbr',
+      'channel', 'probe_type', 'above70K'}.
+    * The nbr of ticks in the fixed part is written after the chunks at each flush, so that a reader never
+      sees ticks that are not written yet.
+    '''
+    def openFile(self, **kwargs):
+        self.chunk_size  = int(kwargs.pop('chunk_size' , 4096)) # nbr of ticks per chunk
+        metadata         = kwargs.pop('metadata'   , [{'name':name} for name in self.names])
+        header_size      = int(kwargs.pop('header_size', 16384)) # [bytes]
+        # ---  --- #
+        self.n_probes = len(self.names)
+        self.header   = {'version':1, 'columns':ARCHIVE_COLUMNS, 'chunk_size':self.chunk_size, 'n_probes':self.n_probes,
+                         'time_start_date':self.date_time, 'time_start_epoch':self.time_0, 'probes':metadata}
+        header_       = json.dumps(self.header).encode()
+        self.header_size = max(header_size, 8*(len(header_)//8+1))
+        self.data_start  = ARCHIVE_FIXED.size + self.header_size
+        # ---
+        self.chunk    = np.full((len(ARCHIVE_COLUMNS), self.n_probes, self.chunk_size), np.nan) # chunk being filled
+        self.n_ticks  = 0
+        # ---  --- #
+        self.file = open(self.path_to_file, 'wb')
+        self.file.write(ARCHIVE_FIXED.pack(ARCHIVE_MAGIC, self.header_size, 0))
+        self.file.write(header_.ljust(self.header_size))
+
+    def updateMetadata(self, metadata):
+        '''
+        * Rewrite the metadata of the probes in the header, eg when a probe type changes. The header is
+          queued with the ticks, and written in place by the thread at the next flush.
+        '''
+        self.header['probes'] = metadata
+        if self.error is not None: # the thread stopped, cf DataWriter.run
+            return
+        header_ = json.dumps(self.header).encode()
+        if len(header_)>self.header_size:
+            print('Error: in updateMetadata, the header of {} is full.'.format(self.path_to_file)) if self.verbose else None
+            return
+        # ---  --- #
+        self.queue.append(('header', header_.ljust(self.header_size)))
+
+    def chunkOffset(self, k):
+        return self.data_start + k*self.chunk.nbytes
+
+    def writeSlice(self, k, j0, j1):
+        '''
+        * Write the ticks [j0, j1) of the chunk k: the whole chunk at once if it is full and not written yet,
+          and otherwise the slice [j0, j1) of each (column, probe) row at its offset.
+        '''
+        offset = self.chunkOffset(k)
+        if j0==0 and j1==self.chunk_size:
+            self.file.seek(offset)
+            self.file.write(self.chunk.tobytes())
+            return
+        # ---  --- #
+        if j0==0: # new chunk: extend the file to its end
+            self.file.seek(offset + self.chunk.nbytes - self.chunk.itemsize)
+            self.file.write(self.chunk[-1, -1, -1:].tobytes())
+        rows = self.chunk.reshape(-1, self.chunk_size)
+        for r in range(len(rows)):
+            self.file.seek(offset + (r*self.chunk_size + j0)*self.chunk.itemsize)
+            self.file.write(rows[r, j0:j1].tobytes())
+
+    def writeTicks(self, ticks):
+        j0 = self.n_ticks % self.chunk_size # first tick of the chunk not written yet
+        for tick in ticks:
+            if isinstance(tick[0], str): # header rewritten by updateMetadata
+                self.file.seek(ARCHIVE_FIXED.size)
+                self.file.write(tick[1])
+                continue
+            # ---
+            j = self.n_ticks % self.chunk_size
+            for col, values in enumerate(tick):
+                self.chunk[col, :, j] = values
+            self.n_ticks += 1
+            # ---
+            if j==self.chunk_size-1: # full chunk
+                self.writeSlice(self.n_ticks//self.chunk_size-1, j0, self.chunk_size)
+                self.chunk[:] = np.nan
+                j0 = 0
+        # --- partial chunk
+        j1 = self.n_ticks % self.chunk_size
+        if j1>j0:
+            self.writeSlice(self.n_ticks//self.chunk_size, j0, j1)
+        # ---  --- #
+        self.file.flush()
+        self.file.seek(0)
+        self.file.write(ARCHIVE_FIXED.pack(ARCHIVE_MAGIC, self.header_size, self.n_ticks))
+
+class ArchiveReader():
+    '''
+    Read an archive written by ArchiveWriter, by memory-mapping the chunks without parsing them.
+    * 'chunks' is the (n_chunks, 4, n_probes, chunk_size) memmap, and 'read(key, start, stop)' returns the
+      (n_probes, stop-start) array of the ticks [start, stop), which only touches the chunks in this range.
+    * 'refresh' maps the ticks written since the opening, the archive being readable while it is recorded.
+    * 'searchTime' finds a tick by its time with two binary searches, on the first time of each chunk and then
+      in a single chunk, so that a time window is found without reading the whole time column.
+    '''
+    def __init__(self, path_to_file):
+        self.path_to_file = path_to_file
+        self.chunks       = None
+        self.refresh()
+
+    def __len__(self):
+        return self.n_ticks
+
+    def refresh(self):
+        with open(self.path_to_file, 'rb') as f:
+            magic, header_size, n_ticks = ARCHIVE_FIXED.unpack(f.read(ARCHIVE_FIXED.size))
+            if magic!=ARCHIVE_MAGIC:
+                raise ValueError('{} is not an archive of ThermometerCryo.'.format(self.path_to_file))
+            self.header = json.loads(f.read(header_size).decode())
+        # ---  --- #
+        self.metadata   = self.header['probes']
+        self.names      = [probe['name'] for probe in self.metadata]
+        self.n_probes   = self.header['n_probes']
+        self.chunk_size = self.header['chunk_size']
+        self.n_ticks    = n_ticks
+        n_chunks        = -(-n_ticks//self.chunk_size)
+        # ---
+        if self.chunks is None or len(self.chunks)!=n_chunks:
+            self.chunks = np.memmap(self.path_to_file, dtype=np.float64, mode='r', offset=ARCHIVE_FIXED.size+header_size,
+                                    shape=(n_chunks, len(ARCHIVE_COLUMNS), self.n_probes, self.chunk_size)) if n_chunks else np.zeros((0, len(ARCHIVE_COLUMNS), self.n_probes, self.chunk_size))
+        # ---  --- #
+        return self.n_ticks
+
+    def read(self, key, start=0, stop=None, step=1):
+        '''
+        * Returns the (n_probes, n) array of the column 'key' for the ticks range(start, stop, step).
+        * With step>1 only the ticks asked are read, so that the memory used depends on the nbr of ticks
+          returned, not on the range.
+        '''
+        col   = ARCHIVE_COLUMNS.index(key)
+        start = max(0, start)
+        stop  = self.n_ticks if stop is None else min(stop, self.n_ticks)
+        if stop<=start:
+            return np.zeros((self.n_probes, 0), dtype=bool if key=='valid' else float)
+        # ---  --- #
+        if step>1:
+            ticks = np.arange(start, stop, step)
+            data  = self.chunks[ticks//self.chunk_size, col, :, ticks%self.chunk_size].T
+        else:
+            k0, k1 = start//self.chunk_size, (stop-1)//self.chunk_size+1
+            data   = np.concatenate(self.chunks[k0:k1, col], axis=-1)[:, start-k0*self.chunk_size:stop-k0*self.chunk_size]
+        # ---  --- #
+        return data==1. if key=='valid' else data
+
+    def searchTime(self, t, slot=0):
+        '''
+        * Returns the index of the first tick whose time is >= t for the probe 'slot', as np.searchsorted.
+        '''
+        if self.n_ticks==0:
+            return 0
+        # ---  --- #
+        k = np.searchsorted(self.firstTimes()[slot], t, side='left') - 1 # chunk of the tick
+        if k<0:
+            return 0
+        n = min(self.chunk_size, self.n_ticks-k*self.chunk_size) # nbr of ticks in the chunk
+        # ---  --- #
+        return k*self.chunk_size + int(np.searchsorted(self.chunks[k, 0, slot, :n], t, side='left'))
+
+    def firstTimes(self):
+        '''
+        * Returns the time of the first tick of each chunk, for each probe, as a (n_probes, n_chunks) view.
+        '''
+        return self.chunks[:, 0, :, 0].T
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    import time
+    writer = ArchiveWriter('test_archive.tca', ['Boite Mel', 'Bouilleur'], chunk_size=4, flush_interval=0.1)
+    reader = None
+    for i in range(10):
+        writer.append([time.time()]*2, [1000.+i, 2000.+i], [0.1*i, 0.2*i], valid=[True, i%3!=0])
+        if i==5:
+            writer.flush()
+            time.sleep(0.2)
+            reader = ArchiveReader('test_archive.tca')
+            print(len(reader), reader.read('resistance'))
+    writer.close()
+    reader.refresh()
+    print(len(reader), reader.names, os.path.getsize('test_archive.tca'))
+    print(reader.read('resistance', 3, 9))
+    print(reader.read('valid'))
+    os.remove('test_archive.tca')
+    print('FINNISHED')
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import sys, os
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+# ====== Dates of epochToDate ====== #
+# The dates 'YYYY-MM-DD_hh:mm:ss:msss' of epochToDate are parsed in bulk: the fixed-width bytes are read as a
+# (n, 23) array of digits, the wall time is made with datetime64 as if it was UTC, and the offset of the local
+# time is added, computed with time.mktime once per distinct hour instead of once per date. During the hour
+# repeated at the end of the daylight saving time, the dates are ambiguous, and mktime picks one of the two.
+
+DATE_LENGTH     = 23
+DATE_SEPARATORS = {4:b'-', 7:b'-', 10:b'_', 13:b':', 16:b':', 19:b':'}
+DATE_DIGITS     = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18, 20, 21, 22]
+
+def localOffsets(hours):
+    '''
+    * Offset [s] epoch - wall time of the local time zone, for wall times given in nbr of hours since the epoch.
+    '''
+    return np.array([time.mktime(time.gmtime(int(hour)*3600)[:8]+(-1,)) - int(hour)*3600 for hour in hours], dtype=float)
+
+def parseDates(dates):
+    '''
+    * Epoch times of the array of bytes 'dates' written by epochToDate, nan for the other ones, eg 'None'.
+    '''
+    dates  = np.asarray(dates, dtype='S{}'.format(DATE_LENGTH))
+    epoch  = np.full(len(dates), np.nan)
+    if not len(dates):
+        return epoch
+    chars  = dates.view(np.uint8).reshape(len(dates), DATE_LENGTH)
+    digits = chars[:, DATE_DIGITS].astype(np.int64) - ord('0')
+    ok     = np.all((digits>=0) & (digits<=9), axis=1)
+    for col, sep in DATE_SEPARATORS.items():
+        ok &= chars[:, col]==ord(sep)
+    if not ok.any():
+        return epoch
+    # ---  --- #
+    d      = digits[ok]
+    number = lambda *cols: sum(d[:, c]*10**(len(cols)-1-k) for k, c in enumerate(cols))
+    months = (number(0, 1, 2, 3)-1970)*12 + number(4, 5)-1
+    days   = months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) + number(6, 7)-1
+    wall   = days*86400 + number(8, 9)*3600 + number(10, 11)*60 + number(12, 13)
+    # ---
+    hours, inverse = np.unique(wall//3600, return_inverse=True)
+    epoch[ok] = wall + localOffsets(hours)[inverse] + number(14, 15, 16)*1e-3
+    # ---  --- #
+    return epoch
+
+def parseFloats(values):
+    '''
+    * Array of the floats of the array of bytes 'values', nan for the ones that are not a number, eg 'None'.
+    '''
+    try:
+        return values.astype(float)
+    except ValueError:
+        floats = np.full(len(values), np.nan)
+        for k, value in enumerate(values.tolist()):
+            try:
+                floats[k] = float(value)
+            except ValueError:
+                pass
+        return floats
+
+def readTextHeader(path_to_file):
+    '''
+    * Returns (header, names, data_start) of a txt file: the '#' lines at the top of the file, as bytes, the names of
+      the probes of the last one, i.e '#time  name(R)  name(T) ...', and the offset [bytes] of the first data line.
+    '''
+    header = []
+    with open(path_to_file, 'rb') as f:
+        while True:
+            line = f.readline()
+            if not line.startswith(b'#'):
+                break
+            header.append(line)
+        data_start = sum(len(line) for line in header)
+    # ---  --- #
+    columns = header[-1][1:].decode().rstrip('\r\n').rstrip('\t').split('\t') if header else []
+    names   = [column[:-3] for column in columns[1::3]] # 'name(R)' --> 'name'
+    if not names or columns[0::3]!=['time']*len(names):
+        raise ValueError('{} has no header of the columns "time  name(R)  name(T)".'.format(path_to_file))
+    # ---  --- #
+    return header, names, data_start
+
+class TextReader():
+    '''
+    Read a txt file written by DataWriter or saveData, cf the format in DataWriter.
+    * 'chunks' reads the file by blocks of about chunk_size bytes, and yields for each block the dictionary
+      {'time', 'resistance', 'temperature', 'valid'} of (n_probes, n) arrays, the time being in epoch. A sample
+      is not valid if its time is 'None' (default value of a buffer not full) or not a date, or if its resistance
+      is 'nan' (value not measured, cf DataWriter), its values being nan.
+    * The lines that are not a tick of all the probes are skipped: the header rows repeated by saveData at each
+      append, the blank lines, and a last line not fully written.
+    * 'read' returns {name: {'time', 'resistance', 'temperature'}} of the valid samples of each probe, eg to
+      plot a file, and 'load' only keeps 'step' ticks out of one, so that a large file can be looked at quickly.
+    * The names are the ones of the header, whose spaces are replaced by '_'.
+    '''
+    def __init__(self, path_to_file, **kwargs):
+        self.chunk_size = int(kwargs.pop('chunk_size', 16<<20)) # [bytes]
+        # ---  --- #
+        self.path_to_file = path_to_file
+        self.header       = {}
+        header_lines, self.names, self.data_start = readTextHeader(path_to_file)
+        # ---
+        for line in header_lines[:-1]: # '# filename=...', '#time_start_date=..., time_start_epoch=...'
+            for item in line[1:].decode().rstrip('\r\n').split(','):
+                key, _, value = item.strip().partition('=')
+                if value:
+                    self.header[key] = value
+        self.n_probes = len(self.names)
+        self.metadata = [{'name':name} for name in self.names]
+
+    def parseLines(self, lines):
+        '''
+        * Block of the ticks of 'lines', a list of bytes. The columns are parsed by np.loadtxt, the dates as bytes
+          for parseDates, and the values that are not a number, eg 'None', are read one by one by parseFloats.
+        '''
+        n_fields = 3*self.n_probes
+        ticks    = [line for line in lines if line[:1] not in (b'#', b't', b'\n', b'\r', b'') and line.count(b'\t') in (n_fields-1, n_fields)]
+        if not ticks:
+            return {key:np.zeros((self.n_probes, 0), dtype=bool if key=='valid' else float) for key in ['time', 'resistance', 'temperature', 'valid']}
+        dates    = np.loadtxt(ticks, delimiter='\t', usecols=range(0, n_fields, 3), dtype='S{}'.format(DATE_LENGTH), comments=None, ndmin=2)
+        try:
+            values = np.loadtxt(ticks, delimiter='\t', usecols=[col for col in range(n_fields) if col%3], dtype=float, comments=None, ndmin=2)
+        except ValueError:
+            strings = np.loadtxt(ticks, delimiter='\t', usecols=[col for col in range(n_fields) if col%3], dtype=bytes, comments=None, ndmin=2)
+            values  = parseFloats(strings.ravel()).reshape(strings.shape)
+        # ---  --- #
+        time_       = parseDates(dates.T.ravel()).reshape(self.n_probes, len(ticks))
+        valid       = np.isfinite(time_) & np.isfinite(values[:, 0::2].T)
+        resistance  = np.where(valid, values[:, 0::2].T, np.nan)
+        temperature = np.where(valid, values[:, 1::2].T, np.nan)
+        # ---  --- #
+        return {'time':time_, 'resistance':resistance, 'temperature':temperature, 'valid':valid}
+
+    def chunks(self, chunk_size=None):
+        with open(self.path_to_file, 'rb') as f:
+            f.seek(self.data_start)
+            while True:
+                lines = f.readlines(chunk_size or self.chunk_size)
+                if not lines:
+                    break
+                block = self.parseLines(lines)
+                if block['time'].shape[1]:
+                    yield block
+
+    def load(self, step=1):
+        '''
+        * Returns the block of all the ticks, one out of 'step'.
+        '''
+        blocks = []
+        skip   = 0
+        for block in self.chunks():
+            n    = block['time'].shape[1]
+            blocks.append({key:values[:, skip::step] for key, values in block.items()})
+            skip = (skip-n) % step
+        # ---  --- #
+        if not blocks:
+            return {key:np.zeros((self.n_probes, 0), dtype=bool if key=='valid' else float) for key in ['time', 'resistance', 'temperature', 'valid']}
+        return {key:np.concatenate([block[key] for block in blocks], axis=1) for key in blocks[0]}
+
+    def read(self, step=1):
+        block = self.load(step)
+        data  = {}
+        for slot, name in enumerate(self.names):
+            valid      = block['valid'][slot]
+            data[name] = {key:block[key][slot][valid] for key in ['time', 'resistance', 'temperature']}
+        # ---  --- #
+        return data
+
+def loadTextData(path_to_file, step=1):
+    '''
+    * Returns {name: {'time', 'resistance', 'temperature'}} of the txt file path_to_file, cf TextReader.
+    '''
+    return TextReader(path_to_file).read(step)
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    try:
+        from DataWriter_class import DataWriter
+    except:
+        sys.path.append("../")
+        from lib.DataWriter_class import DataWriter
+    writer = DataWriter('test_DataReader.txt', ['Boite Mel', 'Bouilleur'], flush_interval=0.1)
+    t_0    = time.time()
+    for i in range(10):
+        writer.append([t_0+i]*2, [1000.+i, 2000.+i], [0.1*i, 0.2*i])
+    writer.close()
+    with open('test_DataReader.txt', 'a') as f:
+        f.write('None\t-1\t-1\tNone\t-1\t-1\t\n\ntime\tBoite_Mel(R)\tBoite_Mel(T)\ttime\tBouilleur(R)\tBouilleur(T)\t\n')
+    data = loadTextData('test_DataReader.txt')
+    print(data['Boite_Mel']['time']-t_0, data['Bouilleur']['resistance'])
+    os.remove('test_DataReader.txt')
+    print('FINNISHED')
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import threading
+import sys, os
+from collections import deque
+
+try:
+	from Miscellaneous import epochToDate
+except:
+	sys.path.append("../")
+	from lib.Miscellaneous import epochToDate
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class DataWriter(threading.Thread):
+    '''
+    Streaming writer of the recorded data in a txt file, kept open for the whole recording.
+    * 'append' queues one tick of all the probes, which costs a constant time, and the thread writes the
+      queued ticks every 'flush_interval' seconds, so that the GUI thread never formats nor writes the data.
+    * The file has the same format as the one of saveData:
+            # filename=...
+            #time_start_date=..., time_start_epoch=...
+            #time  probe_name_1(R)  probe_name_1(T)  time  probe_name_2(R) ...
+            t1_0      R1_0             T1_0          t2_0      R2_0      ...
+      with one line per tick, each tick being written once. The samples that are not valid, eg the last value
+      reused after a failed query, are written with 'nan' as resistance and temperature.
+    * fsync: 'never' (let the OS write the file), 'flush' (fsync after each flush, safer against a crash of
+      the computer), or 'close'.
+    * An error of the thread, eg a full disk or a removed drive, stops the writing: it is kept in 'error', the
+      queued ticks are dropped, and 'append' raises an OSError, so that the caller knows that the file is not
+      written anymore instead of queuing the ticks without end.
+    * Other file formats are made by overloading 'openFile' and 'writeTicks', cf ArchiveWriter.
+    '''
+    def __init__(self, path_to_file, names, **kwargs):
+        super().__init__(daemon=True)
+        self.flush_interval = kwargs.pop('flush_interval', 5.0) # [s]
+        self.fsync          = kwargs.pop('fsync'         , 'never')
+        self.verbose        = kwargs.pop('verbose'       , False)
+        self.date_time      = kwargs.pop('date_time'     , '{0:04d}-{1:02d}-{2:02d}_{3:02d}:{4:02d}:{5:02d}'.format(*time.localtime()[:6]))
+        self.time_0         = kwargs.pop('time_0'        , round(time.time(), 3))
+        # ---  --- #
+        self.path_to_file = path_to_file
+        self.names        = list(names)
+        self.queue        = deque()
+        self.written      = 0 # nbr of ticks written in the file
+        self.error        = None # exception that stopped the thread, cf run
+        self.wakeup       = threading.Event()
+        self.stopped      = threading.Event()
+        # ---  --- #
+        self.openFile(**kwargs)
+        self.start()
+
+    def openFile(self, **kwargs):
+        new_file  = not os.path.isfile(self.path_to_file)
+        self.file = open(self.path_to_file, 'a')
+        if new_file:
+            filename = os.path.splitext(os.path.basename(self.path_to_file))[0]
+            header   = '# filename={0}\n#time_start_date={1}, time_start_epoch={2}'.format(filename, self.date_time, self.time_0)
+            header  += '\n#' + ''.join('time\t{0}(R)\t{0}(T)\t'.format(name.replace(' ', '_')) for name in self.names) + '\n'
+            self.file.write(header)
+
+    def __len__(self):
+        return len(self.queue)
+
+    def append(self, time_, resistance, temperature, valid=True):
+        '''
+        * Queue one tick, given as arrays of one value per probe, in the order of 'names'. Raises an OSError
+          if the writing stopped.
+        '''
+        if self.error is not None:
+            raise OSError('{0} is not written anymore: {1}'.format(self.path_to_file, self.error))
+        self.queue.append((np.array(time_, dtype=float), np.array(resistance, dtype=float), np.array(temperature, dtype=float), np.broadcast_to(np.asarray(valid, dtype=bool), np.shape(time_)).copy()))
+
+    def appendBlock(self, time_, resistance, temperature, valid=True):
+        '''
+        * Queue several ticks, given as 2-D (n_probes, n_ticks) arrays.
+        '''
+        valid_ = np.broadcast_to(np.asarray(valid, dtype=bool), np.shape(time_))
+        for j in range(np.shape(time_)[-1]):
+            self.append(time_[:, j], resistance[:, j], temperature[:, j], valid_[:, j])
+
+    def updateMetadata(self, metadata):
+        '''
+        * The txt header only has the names of the probes, set at the creation of the file.
+        '''
+        pass
+
+    def flush(self):
+        self.wakeup.set()
+
+    def close(self, wait=True):
+        '''
+        * Write the queued ticks and close the file, waiting for it if 'wait'.
+        '''
+        self.stopped.set()
+        self.wakeup.set()
+        if wait:
+            self.join()
+
+    def formatTick(self, time_, resistance, temperature, valid):
+        return ''.join('{0:}\t{1:}\t{2:}\t'.format(epochToDate(t_), r_, T_) if v_ else '{0:}\tnan\tnan\t'.format(epochToDate(t_))
+                       for t_, r_, T_, v_ in zip(time_, resistance, temperature, valid)) + '\n'
+
+    def writeTicks(self, ticks):
+        self.file.write(''.join(self.formatTick(*tick) for tick in ticks))
+
+    def writeQueue(self):
+        ticks = []
+        while True:
+            try:
+                ticks.append(self.queue.popleft())
+            except IndexError:
+                break
+        # ---  --- #
+        if ticks:
+            self.writeTicks(ticks)
+            self.file.flush()
+            if self.fsync=='flush':
+                os.fsync(self.file.fileno())
+            self.written += len(ticks)
+
+    def run(self):
+        try:
+            while not self.stopped.is_set():
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
+                self.writeQueue()
+            # ---  --- #
+            self.writeQueue()
+            if self.fsync in ['flush', 'close']:
+                os.fsync(self.file.fileno())
+        except Exception as error: # eg OSError, the thread must not die silently
+            self.error = error
+            self.queue.clear()
+            print('Error: DataWriter stopped after {0} ticks written in {1}: {2}'.format(self.written, self.path_to_file, error))
+        # ---  --- #
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        print('DataWriter: {0} ticks written in {1}'.format(self.written, self.path_to_file)) if self.verbose else None
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    writer = DataWriter('test_DataWriter.txt', ['Boite Mel', 'Bouilleur'], flush_interval=0.1, verbose=True)
+    for i in range(10):
+        writer.append([time.time()]*2, [1000.+i, 2000.+i], [0.1*i, 0.2*i])
+    writer.close()
+    print(open('test_DataWriter.txt').read())
+    os.remove('test_DataWriter.txt')
+    print('FINNISHED')
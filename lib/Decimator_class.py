@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import sys, os
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+def visibleSlice(x, x_min, x_max):
+    '''
+    * Returns the slice of the sorted array x in [x_min, x_max], plus one point on each side so that the
+      curve reaches the edges of the view.
+    '''
+    i0 = max(int(np.searchsorted(x, x_min, side='left' )) - 1, 0)
+    i1 = min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+    return slice(i0, i1)
+
+def reduceMinMax(y, starts):
+    '''
+    * Min and max of the blocks y[..., starts[k]:starts[k+1]] along the last axis, interleaved as min, max, min,
+      max, ... in a (..., 2*len(starts)) array. The nan values are ignored, a block of nan values giving nan.
+    '''
+    y_dec = np.empty(np.shape(y)[:-1] + (2*len(starts),))
+    y_dec[..., 0::2] = np.fmin.reduceat(y, starts, axis=-1)
+    y_dec[..., 1::2] = np.fmax.reduceat(y, starts, axis=-1)
+    # ---  --- #
+    return y_dec
+
+def minMaxEnvelope(x, y, x_min, x_max, n_bins):
+    '''
+    * Reduce the series (x, y), x being sorted, to its min/max envelope on n_bins columns of equal width
+      in [x_min, x_max]: each column with data gives two points (x_col, min) and (x_col, max), x_col being
+      the x of its first sample. The nan values of y are ignored.
+    * Returns (x_dec, y_dec), with 2*n_bins points at most.
+    '''
+    edges  = np.linspace(x_min, x_max, n_bins+1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], side='left'))
+    starts = starts[starts<len(x)]
+    if len(starts)==0:
+        return x[:0], y[:0]
+    # ---  --- #
+    y_dec  = reduceMinMax(y, starts).reshape(-1, 2)
+    keep   = ~np.isnan(y_dec[:, 0]) # columns with only nan values
+    # ---  --- #
+    x_dec  = np.repeat(x[starts][keep], 2)
+    y_dec  = y_dec[keep].ravel()
+    # ---  --- #
+    return x_dec, y_dec
+
+class Decimator():
+    '''
+    Level of detail of a series displayed in a plot of 'n_pixels' columns.
+    * When the visible part of the series has more than 2 points per pixel column, it is reduced to its min/max
+      envelope per column, which draws the same picture as the raw series with much less vertices. Otherwise,
+      eg when zoomed in, the raw points of the view are returned, without their nan values.
+    * The result is cached, and only recomputed when the data version, the view range or the nbr of pixels
+      changes. 'decimate' returns None in this case, so that the caller can skip setting the data of the plot.
+    '''
+    def __init__(self):
+        self.key    = None
+        self.result = None
+
+    def clear(self):
+        self.key = None
+
+    def decimate(self, x, y, x_range, n_pixels, version):
+        '''
+        * x_range: (x_min, x_max) of the view, None for the whole series.
+        * version: anything that changes when the data of the series change, eg the nbr of ticks recorded.
+        '''
+        n_pixels = max(int(n_pixels), 1)
+        if x_range is None:
+            x_range = (x[0], x[-1]) if len(x) else (0., 0.)
+        key = (version, float(x_range[0]), float(x_range[1]), n_pixels)
+        if key==self.key:
+            return None
+        # ---  --- #
+        sl     = visibleSlice(x, *x_range)
+        x_, y_ = x[sl], y[sl]
+        if len(x_)>2*n_pixels and x_range[1]>x_range[0]:
+            self.result = minMaxEnvelope(x_, y_, x_range[0], x_range[1], n_pixels)
+        else:
+            finite      = ~np.isnan(y_)
+            self.result = (x_[finite], y_[finite])
+        self.key = key
+        # ---  --- #
+        return self.result
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    x = np.arange(1e5)
+    y = np.sin(x/1e3) + np.random.randn(len(x))*0.1
+    decimator  = Decimator()
+    x_d, y_d   = decimator.decimate(x, y, None, 1000, version=0)
+    print(len(x_d), y_d.min()==y.min(), y_d.max()==y.max())
+    print(decimator.decimate(x, y, None, 1000, version=0))
+    x_d, y_d   = decimator.decimate(x, y, (500, 900), 1000, version=0)
+    print(len(x_d), x_d[[0, -1]])
+    print('FINNISHED')
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import threading
+import sys, os
+
+try:
+	from Conversion_functions  import getConverter
+	from Miscellaneous         import freeFilename
+	from RequestTracker_class  import macrtChannel
+	from DataWriter_class      import DataWriter
+	from DataArchive_class     import ArchiveWriter
+	from ProbeHistory_class    import ProbeHistory
+except:
+	sys.path.append("../")
+	from lib.Conversion_functions  import getConverter
+	from lib.Miscellaneous         import freeFilename
+	from lib.RequestTracker_class  import macrtChannel
+	from lib.DataWriter_class      import DataWriter
+	from lib.DataArchive_class     import ArchiveWriter
+	from lib.ProbeHistory_class    import ProbeHistory
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class HeadlessRecorder():
+    '''
+    Recording of the probes without GUI, eg for weeks on a lab server.
+    * Each tick, all the probes are queried at once by a MacrtClient, converted to temperature, and appended to
+      the file auto_save_YYYY-MM-DD_k of 'save_dir' by a DataWriter (format 'txt') or an ArchiveWriter (format
+      'tca'), a new file being opened each day as in the auto-save of the GUI. With 'history_dir', the ticks
+      are also appended to the ProbeHistory of the run.
+    * If the file cannot be written anymore, eg a full disk or a removed drive, the recording goes on and a new
+      file is tried at each tick, the ticks not saved being counted in 'n_unsaved', cf writeTick.
+    * The ticks are scheduled at 'fps' without drift. When a sweep takes longer than the period, the next
+      one starts right away and the late ticks are counted in 'n_late'.
+    * Only numpy and the standard library are used, no Qt.
+    * If the client has a NetworkStats, the status print includes the network metrics per probe and per host,
+      and with 'network_log' they are appended to this json lines file every 'status_interval'.
+    * probe_types: dictionary {probe_id: (probe_type, above70K)}, the probe types being the ones of the
+      converter registry of Conversion_functions.
+    '''
+    writer_class = {'txt':DataWriter, 'tca':ArchiveWriter}
+
+    def __init__(self, client, probe_types, **kwargs):
+        self.fps             = kwargs.pop('fps'            , 1) # Hz
+        self.save_dir        = kwargs.pop('save_dir'       , './')
+        self.format_         = kwargs.pop('format_'        , 'txt')
+        self.flush_interval  = kwargs.pop('flush_interval' , 5.0) # [s]
+        self.fsync           = kwargs.pop('fsync'          , 'never')
+        self.history_dir     = kwargs.pop('history_dir'    , None)
+        self.status_interval = kwargs.pop('status_interval', 3600.) # [s], period of the status print, None -> never
+        self.network_log     = kwargs.pop('network_log'    , None)
+        self.verbose         = kwargs.pop('verbose'        , False)
+        # ---  --- #
+        self.client      = client
+        self.ids         = list(client.probes)
+        self.probe_types = probe_types
+        self.date_time   = '{0:04d}-{1:02d}-{2:02d}_{3:02d}:{4:02d}:{5:02d}'.format(*time.localtime()[:6])
+        self.time_0      = round(time.time(), 3)
+        self.stopped     = threading.Event()
+        self.writer      = None
+        self.writer_date = None # (year, month, day) of the file of writer
+        self.history     = None
+        self.n_ticks     = 0
+        self.n_failed    = 0 # nbr of queries without reply
+        self.n_late      = 0
+        self.n_unsaved   = 0 # nbr of ticks that could not be written in the file
+        self.write_error = None # last error of the writing, printed once
+        # ---  --- #
+        self.groups = {} # conversion function --> slots of the probes converted by it
+        for slot, probe_id in enumerate(self.ids):
+            probe_type, above70K = self.probe_types[probe_id]
+            converter = getConverter(probe_type)
+            if converter is None:
+                raise ValueError('unknown probe type {0} for {1}'.format(probe_type, self.client.probes[probe_id]['name']))
+            self.groups.setdefault(converter.handle(bool(above70K) and converter.uses_above70K), []).append(slot)
+        # ---
+        self.last_res = np.full(len(self.ids), np.nan)
+
+    def probeNames(self):
+        return [self.client.probes[probe_id]['name'] for probe_id in self.ids]
+
+    def probeMetadata(self):
+        metadata = []
+        for probe_id in self.ids:
+            probe = self.client.probes[probe_id]
+            metadata.append({'name':probe['name'], 'IP':probe['IP'], 'probe_nbr':probe['probe_nbr'], 'channel':macrtChannel(probe['probe_nbr']),
+                             'probe_type':self.probe_types[probe_id][0], 'above70K':bool(self.probe_types[probe_id][1])})
+        # ---  --- #
+        return metadata
+
+    def openWriter(self):
+        '''
+        * Open the file of the day, closing the previous one.
+        '''
+        if self.writer is not None:
+            self.writer.close(wait=False)
+        # ---  --- #
+        if not os.path.isdir(self.save_dir):
+            os.makedirs(self.save_dir)
+        self.writer_date = time.localtime()[:3]
+        filename         = freeFilename(self.save_dir, 'auto_save_{0:04d}-{1:02d}-{2:02d}'.format(*self.writer_date), self.format_, start=0)
+        self.writer      = self.writer_class[self.format_](os.path.join(self.save_dir, '{}.{}'.format(filename, self.format_)), self.probeNames(),
+                                                           metadata=self.probeMetadata(), date_time=self.date_time, time_0=self.time_0,
+                                                           flush_interval=self.flush_interval, fsync=self.fsync, verbose=self.verbose)
+        print('Recording in : {}'.format(self.writer.path_to_file))
+
+    def openHistory(self):
+        if self.history_dir is None:
+            return
+        # ---  --- #
+        if not os.path.isdir(self.history_dir):
+            os.makedirs(self.history_dir)
+        filename     = freeFilename(self.history_dir, 'history_{}'.format(self.date_time.replace(':', '-')), 'tca')
+        self.history = ProbeHistory(os.path.join(self.history_dir, filename+'.tca'), self.probeNames(), metadata=self.probeMetadata(),
+                                    date_time=self.date_time, time_0=self.time_0, verbose=self.verbose)
+
+    def convert(self, res_L):
+        temp_L = np.full(np.shape(res_L), np.nan)
+        for handle, slots in self.groups.items():
+            temp_L[slots] = handle(res_L[slots])
+        # ---  --- #
+        return temp_L
+
+    def recordSweep(self, results):
+        '''
+        * Record the result of a sweep, given as a dictionary {probe_id: (time, resistance)}. A probe without
+          reply is recorded with its last resistance and flagged as not valid.
+        '''
+        t_L     = np.zeros(len(self.ids))
+        res_L   = np.zeros(len(self.ids))
+        valid_L = np.zeros(len(self.ids), dtype=bool)
+        # ---  --- #
+        for slot, probe_id in enumerate(self.ids):
+            t_, res    = results.get(probe_id, (None, None))
+            t_L[slot]  = round(t_, 3) if t_ else round(time.time(), 3)
+            if res is None:
+                self.n_failed += 1
+                self.client.stats.record('stale_values', probe_id) if self.client.stats is not None else None
+                res_L[slot] = self.last_res[slot]
+            else:
+                valid_L[slot] = True
+                res_L[slot]   = res
+        self.last_res = res_L
+        temp_L        = self.convert(res_L)
+        # ---  --- #
+        self.writeTick(t_L, res_L, temp_L, valid_L)
+        if self.history is not None:
+            try:
+                self.history.append(t_L, res_L, temp_L, valid_L)
+            except OSError as error:
+                print('Error: the history in {0} stopped: {1}'.format(self.history.path_to_file, error))
+                self.history.close(wait=False)
+                self.history = None
+        self.n_ticks += 1
+        # ---  --- #
+        return t_L, res_L, temp_L, valid_L
+
+    def writeTick(self, t_L, res_L, temp_L, valid_L):
+        '''
+        * Append the tick to the file of the day. After an OSError of the writer, the file is closed and a new one
+          is opened at the next tick, the ticks lost meanwhile being counted in n_unsaved. The ticks queued by the
+          writer when its thread failed are lost too, but not counted.
+        '''
+        try:
+            if self.writer is None or time.localtime()[:3]!=self.writer_date:
+                self.openWriter()
+            self.writer.append(t_L, res_L, temp_L, valid_L)
+            self.write_error = None
+        except OSError as error:
+            self.n_unsaved += 1
+            if str(error)!=self.write_error: # once per error, not at each tick
+                print('Error: cannot record in {0} ({1}), a new file is tried at each tick.'.format(self.save_dir, error))
+                self.write_error = str(error)
+            if self.writer is not None:
+                self.writer.close(wait=False)
+                self.writer = None
+
+    def status(self):
+        status = '[{0}] {1} ticks recorded, {2} queries failed, {3} late ticks, {4} ticks not saved'.format(time.strftime('%Y-%m-%d %H:%M:%S'), self.n_ticks, self.n_failed, self.n_late, self.n_unsaved)
+        if self.client.stats is not None:
+            status += '\n' + self.client.stats.report(self.statsNames())
+        # ---  --- #
+        return status
+
+    def statsNames(self):
+        return {probe_id:self.client.probes[probe_id]['name'] for probe_id in self.ids}
+
+    def dumpNetworkStats(self):
+        if self.network_log is None or self.client.stats is None:
+            return
+        # ---  --- #
+        try:
+            self.client.stats.dump(self.network_log, self.statsNames())
+        except OSError as error:
+            print('Error: cannot write the network log {0}: {1}'.format(self.network_log, error))
+
+    def run(self, duration=None, n_ticks=None):
+        '''
+        * Record until 'stop' is called, or for 'duration' seconds, or 'n_ticks' ticks.
+        '''
+        self.openWriter()
+        self.openHistory()
+        t_start  = time.time()
+        t_next   = t_start
+        t_status = t_start + self.status_interval if self.status_interval else None
+        # ---  --- #
+        try:
+            while not self.stopped.is_set():
+                if (duration is not None and time.time()-t_start>=duration) or (n_ticks is not None and self.n_ticks>=n_ticks):
+                    break
+                # ---
+                t_L, res_L, temp_L, valid_L = self.recordSweep(self.client.sweep(self.ids))
+                print(' '.join('{:.4f}'.format(T_) for T_ in temp_L)) if self.verbose else None
+                # ---
+                t_next += 1./self.fps
+                if t_next<time.time():
+                    self.n_late += 1
+                    t_next = time.time()
+                if t_status is not None and time.time()>=t_status:
+                    print(self.status())
+                    self.dumpNetworkStats()
+                    t_status += self.status_interval
+                self.stopped.wait(max(0., t_next-time.time()))
+        finally:
+            self.close()
+        # ---  --- #
+        return self.n_ticks
+
+    def stop(self):
+        self.stopped.set()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        self.client.close()
+        print(self.status())
+        self.dumpNetworkStats()
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    try:
+        from MacrtClient_class import MacrtClient
+    except:
+        from lib.MacrtClient_class import MacrtClient
+    client   = MacrtClient(timeout=0.2)
+    id1      = client.setProbe('Boite Mel', '192.168.1.101', 1)
+    recorder = HeadlessRecorder(client, {id1:("Mobile BT", False)}, fps=5, save_dir='./test_headless/')
+    recorder.run(n_ticks=5)
+    import shutil
+    shutil.rmtree('./test_headless/')
+    print('FINNISHED')
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import time
+import socket
+import selectors
+import sys, os
+
+try:
+	from RequestTracker_class import RequestTracker
+except:
+	sys.path.append("../")
+	from lib.RequestTracker_class import RequestTracker
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class MacrtClient():
+    '''
+    Client of the MacRT servers made of plain UDP sockets, without Qt, eg for the headless recording.
+    * It speaks the same protocol as ResistanceProbe: the MACRTGET queries are sent from the port
+      'query_port', the replies of all the servers arrive on 'resp_port', and they are given to the query
+      they answer by a RequestTracker.
+    * 'sweep' sends the queries of all the probes at once, and waits for the replies with a selector until
+      each query is answered or timed out, so that a sweep costs one network round trip.
+    * probes: dictionary of the probes settings {probe_id: {'name', 'IP', 'probe_nbr'}}, as made by setProbe.
+    '''
+    def __init__(self, **kwargs):
+        self.verbose    = kwargs.pop('verbose'   , False)
+        self.timeout    = kwargs.pop('timeout'   , 0.5) # [s] deadline of the queries of a sweep
+        self.query_port = kwargs.pop('query_port', 8001)
+        self.resp_port  = kwargs.pop('resp_port' , 12000)
+        self.probes     = kwargs.pop('probes'    , {})
+        self.stats      = kwargs.pop('stats'     , None) # NetworkStats of the queries
+        self.tracker    = RequestTracker(timeout=self.timeout, max_in_flight=kwargs.pop('max_in_flight', 3), stats=self.stats, verbose=self.verbose)
+        # ---  --- #
+        self.UDP_query = None # made by openSockets, at the first sweep
+        self.UDP_resp  = None
+        self.selector  = None
+
+    def setProbe(self, name, IP, nbr):
+        probe_dic             = {'name':name, 'IP':IP, 'probe_nbr':nbr}
+        id_probe              = id(probe_dic)
+        self.probes[id_probe] = probe_dic
+        # ---
+        return id_probe
+
+    def openSockets(self):
+        if self.UDP_query is not None:
+            return
+        # ---  --- #
+        self.UDP_query = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.UDP_resp  = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.UDP_query.bind(('', self.query_port))
+        self.UDP_resp.bind(( '', self.resp_port ))
+        self.UDP_resp.setblocking(False)
+        print('UDP query/response sockets bound on ports {0}/{1}'.format(self.query_port, self.resp_port)) if self.verbose else None
+        # ---  --- #
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.UDP_resp, selectors.EVENT_READ)
+
+    def close(self):
+        if self.UDP_query is None:
+            return
+        # ---  --- #
+        self.selector.close()
+        self.UDP_query.close()
+        self.UDP_resp.close()
+        self.UDP_query, self.UDP_resp, self.selector = None, None, None
+
+    def sendRequests(self, requests):
+        for request in requests:
+            try:
+                self.UDP_query.sendto(request['query'].encode(), (request['host'], request['port']))
+            except OSError as error:
+                print('Connection error, cannot send {0} to {1}: {2}'.format(request['query'], request['host'], error)) if self.verbose else None
+            self.tracker.markSent(request) # an unsent query times out as a lost one
+
+    def readReplies(self):
+        '''
+        * Read the pending datagrams, and returns the list of the requests they answer.
+        '''
+        matched = []
+        # ---  --- #
+        while True:
+            try:
+                datagram, (host, port) = self.UDP_resp.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError: # eg ICMP port unreachable reported on the socket
+                continue
+            request, value, to_send = self.tracker.matchReply(datagram, host, port)
+            self.sendRequests(to_send)
+            if request is not None:
+                matched.append(request)
+        # ---  --- #
+        return matched
+
+    def sweep(self, ids=None, **kwargs):
+        '''
+        * Query all the probes in 'ids' (by default all the probes), and returns the dictionary
+          {probe_id: (time, resistance)} when all the queries are answered or timed out, with resistance None
+          if the query timed out.
+        '''
+        timeout = kwargs.pop('timeout', self.timeout)
+        # ---  --- #
+        self.openSockets()
+        ids     = list(self.probes) if ids is None else ids
+        results = {probe_id:(None, None) for probe_id in ids}
+        pending = set(ids)
+        # ---  --- #
+        for probe_id in ids:
+            request = self.tracker.makeRequest(probe_id, self.probes[probe_id]['IP'], self.probes[probe_id]['probe_nbr'], timeout=timeout)
+            self.sendRequests(self.tracker.submit(request))
+        # ---
+        while pending:
+            deadline = self.tracker.nextDeadline()
+            self.selector.select(max(0., deadline-time.time()) if deadline is not None else 0.)
+            # ---
+            for request in self.readReplies():
+                if request['key'] in pending:
+                    results[request['key']] = (request['reply'], request['value'])
+                    pending.discard(request['key'])
+            # ---
+            t_ = time.time()
+            expired, to_send = self.tracker.expire(t_)
+            for request in expired:
+                if request['key'] in pending:
+                    print('Warning: query of {} timed out.'.format(self.probes[request['key']]['name'])) if self.verbose else None
+                    results[request['key']] = (t_, None)
+                    pending.discard(request['key'])
+            self.sendRequests(to_send)
+            # ---
+            if pending and self.tracker.nextDeadline() is None: # nothing left in flight for the pending probes
+                for probe_id in pending:
+                    results[probe_id] = (t_, None)
+                pending = set()
+        # ---  --- #
+        return results
+
+    def getRESISTANCE(self, **kwargs):
+        '''
+        * Blocking query of the probe 'ID', returns its resistance, None if the query failed.
+        '''
+        probe_id = kwargs.pop('ID', None)
+        # ---  --- #
+        return self.sweep([probe_id], **kwargs)[probe_id][1]
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    IP_dic = {'IP1':'192.168.1.101', 'IP3':'192.168.1.103'}
+    client = MacrtClient(verbose=True)
+    client.setProbe('Boite Mel', IP_dic['IP1'], 1)
+    client.setProbe('Etage 4 K', IP_dic['IP3'], 1)
+    print(client.sweep())
+    client.close()
+    print('FINNISHED')
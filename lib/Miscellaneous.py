@@ -38,6 +38,30 @@ def fixpath(path):
     '''
     return os.path.abspath(os.path.expanduser(path))
 
+import time
+def epochToDate(t_epoch):
+    '''
+    * Convert an epoch time number to a readable date in YYYY-MM-DD_hh:mm:ss:msss
+      format.
+    '''
+    return '{0:04d}-{1:02d}-{2:02d}_{3:02d}:{4:02d}:{5:02d}:{6:03d}'.format(*time.localtime(t_epoch)[:6], int((t_epoch%1) * 1e3))
+
+def freeFilename(path, filename, ext, start=None):
+    '''
+    * Returns the first filename in 'path' that does not exist yet, among filename.ext (if start is None),
+      filename_{start}.ext, filename_{start+1}.ext, ...
+    '''
+    k = start
+    if k is None:
+        if not os.path.exists(os.path.join(path, '{0}.{1}'.format(filename, ext))):
+            return filename
+        k = 1
+    # ---  --- #
+    while os.path.exists(os.path.join(path, '{0}_{1:d}.{2}'.format(filename, k, ext))):
+        k += 1
+    # ---  --- #
+    return '{0}_{1:d}'.format(filename, k)
+
 ##############################################################################################################
 # MAIN
 ##############################################################################################################
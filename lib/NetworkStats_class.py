@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import json
+import threading
+import sys, os
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+RTT_BINS_PER_DECADE = 20
+RTT_EDGES = np.concatenate([[0.], 1e-5*10.**(np.arange(6*RTT_BINS_PER_DECADE+1)/RTT_BINS_PER_DECADE)]) # [s], bins of the RTT histogram: 0, 10 us, 11.2 us, ..., 10 s, and above
+
+def emptyCounters():
+    return {'sent':0, 'replies':0, 'timeouts':0, 'malformed':0, 'stale':0, 'duplicate':0, 'unknown':0, 'stale_values':0,
+            'rtt_hist':np.zeros(len(RTT_EDGES), dtype=np.int64), 'rtt_sum':0., 'rtt_max':0., 'rtt_last':None, 't_last_reply':None}
+
+def histogramPercentile(hist, q):
+    '''
+    * Percentile q (in [0, 100]) [s] of the RTT histogram 'hist', interpolated in the bin where it is reached, the
+      RTTs of a bin being taken as spread evenly on a log scale (linear scale for the first bin). Returns inf
+      for the last bin, which has no upper edge, and None if the histogram is empty.
+    '''
+    n = hist.sum()
+    if n==0:
+        return None
+    cum  = np.cumsum(hist)
+    rank = q/100.*n
+    k    = int(np.searchsorted(cum, rank, side='left')) if rank>0 else int(np.argmax(hist>0))
+    if k+1>=len(RTT_EDGES):
+        return np.inf
+    # ---  --- #
+    f      = (rank - (cum[k-1] if k else 0)) / hist[k] # fraction of the bin below the percentile
+    lo, hi = RTT_EDGES[k], RTT_EDGES[k+1]
+    return float(lo + f*(hi-lo) if lo==0 else lo*(hi/lo)**f)
+
+class NetworkStats():
+    '''
+    Network metrics of the MacRT queries, per probe and per host (IP of a MacRT server).
+    * The RequestTracker records each query sent, each reply with its round trip time (RTT), each timeout, and
+      the discarded replies: 'malformed', 'stale' (reply to a query already timed out), 'duplicate' and
+      'unknown'. The discarded replies are only known by host. The recording of the data counts the
+      'stale_values', i.e the ticks where the last value of a probe is reused because its query failed.
+    * The RTTs are counted in a histogram of log bins, 20 per decade from 10 us to 10 s, so that the memory used
+      does not depend on the duration of the run, and the percentiles are interpolated in its bins, cf
+      histogramPercentile, and bounded by the max RTT.
+    * The records can come from the acquisition thread while the GUI reads them, 'snapshot' takes a lock.
+    '''
+    def __init__(self):
+        self.lock   = threading.Lock()
+        self.t_0    = time.time()
+        self.probes = {} # probe key --> counters
+        self.hosts  = {} # host --> counters
+
+    def reset(self):
+        with self.lock:
+            self.t_0    = time.time()
+            self.probes = {}
+            self.hosts  = {}
+
+    def counters(self, key, host):
+        L = []
+        if key is not None:
+            L.append(self.probes.setdefault(key, emptyCounters()))
+        if host is not None:
+            L.append(self.hosts.setdefault(host, emptyCounters()))
+        return L
+
+    def record(self, event, key=None, host=None):
+        '''
+        * Count an event: 'sent', 'timeouts', 'malformed', 'stale', 'duplicate', 'unknown', 'stale_values'.
+        '''
+        with self.lock:
+            for counters in self.counters(key, host):
+                counters[event] += 1
+
+    def recordReply(self, key, host, rtt, t_reply=None):
+        k = min(int(np.searchsorted(RTT_EDGES, rtt, side='right'))-1, len(RTT_EDGES)-1)
+        with self.lock:
+            for counters in self.counters(key, host):
+                counters['replies' ] += 1
+                counters['rtt_hist'][max(k, 0)] += 1
+                counters['rtt_sum' ] += rtt
+                counters['rtt_max' ]  = max(counters['rtt_max'], rtt)
+                counters['rtt_last']  = rtt
+                counters['t_last_reply'] = time.time() if t_reply is None else t_reply
+
+    def summarize(self, counters):
+        '''
+        * Returns the counters with the loss rate and the RTT statistics [s], without the histogram. The
+          percentiles, interpolated in the bins of the histogram, are bounded by the max RTT observed.
+        '''
+        summary = {name:value for name, value in counters.items() if name!='rtt_hist'}
+        summary['loss']     = counters['timeouts']/counters['sent'] if counters['sent'] else None
+        summary['rtt_mean'] = counters['rtt_sum']/counters['replies'] if counters['replies'] else None
+        for q in [50, 90, 99]:
+            p = histogramPercentile(counters['rtt_hist'], q)
+            summary['rtt_p{}'.format(q)] = None if p is None else min(p, counters['rtt_max'])
+        summary['rtt_hist'] = counters['rtt_hist'].tolist()
+        # ---  --- #
+        return summary
+
+    def snapshot(self, names=None):
+        '''
+        * Returns {'time', 'duration', 'probes':{name: summary}, 'hosts':{host: summary}}, the probes being named
+          by 'names', a dictionary {probe key: name}, if given.
+        '''
+        names = names or {}
+        with self.lock:
+            snapshot = {'time':time.time(), 'duration':time.time()-self.t_0, 'rtt_edges':RTT_EDGES.tolist(),
+                        'probes':{names.get(key, str(key)):self.summarize(counters) for key, counters in self.probes.items()},
+                        'hosts' :{host:self.summarize(counters) for host, counters in self.hosts.items()}}
+        # ---  --- #
+        return snapshot
+
+    def report(self, names=None):
+        '''
+        * Returns a table of the metrics as text, one line per probe and per host.
+        '''
+        snapshot = self.snapshot(names)
+        ms       = lambda t_: '-' if t_ is None else '{:.2f}'.format(t_*1e3)
+        lines    = ['{0:<16s}{1:>8s}{2:>8s}{3:>9s}{4:>7s}{5:>10s}{6:>7s}{7:>6s}{8:>8s}{9:>7s}{10:>8s}{11:>8s}{12:>8s}{13:>8s}'.format(
+                    '', 'sent', 'replies', 'timeouts', 'loss', 'malformed', 'stale', 'dup', 'unknown', 'reused', 'p50[ms]', 'p90[ms]', 'p99[ms]', 'max[ms]')]
+        for kind in ['probes', 'hosts']:
+            for name, s in snapshot[kind].items():
+                lines.append('{0:<16s}{1:>8d}{2:>8d}{3:>9d}{4:>7s}{5:>10d}{6:>7d}{7:>6d}{8:>8d}{9:>7d}{10:>8s}{11:>8s}{12:>8s}{13:>8s}'.format(
+                             name[:15], s['sent'], s['replies'], s['timeouts'], '-' if s['loss'] is None else '{:.1%}'.format(s['loss']),
+                             s['malformed'], s['stale'], s['duplicate'], s['unknown'], s['stale_values'], ms(s['rtt_p50']), ms(s['rtt_p90']), ms(s['rtt_p99']), ms(s['rtt_max'] if s['replies'] else None)))
+        # ---  --- #
+        return '\n'.join(lines)
+
+    def dump(self, path_to_file, names=None):
+        '''
+        * Append the snapshot to the log path_to_file, as one json line.
+        '''
+        with open(path_to_file, 'a') as f:
+            f.write(json.dumps(self.snapshot(names)) + '\n')
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    stats = NetworkStats()
+    for i in range(100):
+        stats.record('sent', 1, '192.168.1.101')
+        if i%10:
+            stats.recordReply(1, '192.168.1.101', 0.002+1e-4*i)
+        else:
+            stats.record('timeouts', 1, '192.168.1.101')
+    stats.record('malformed', host='192.168.1.101')
+    stats.record('duplicate', host='192.168.1.101')
+    print(stats.report({1:'Boite Mel'}))
+    print('FINNISHED')
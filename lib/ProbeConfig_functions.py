@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import json
+import colorsys
+import sys, os
+
+try:
+	from Conversion_functions import getConverter
+except:
+	sys.path.append("../")
+	from lib.Conversion_functions import getConverter
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+# ====== Probes of the lab cryostat, used when there is no config file ====== #
+DEFAULT_PROBES = [
+    {'name':'Boite Mel'  , 'IP':'IP1', 'probe_nbr':1, 'probe_type':"Mobile BT", 'above70K':True, 'color':'#ff0000'},
+    {'name':'Bouilleur'  , 'IP':'IP1', 'probe_nbr':2, 'probe_type':"Mobile BT", 'above70K':True, 'color':'#00ff00'},
+    {'name':'Anneau 80mK', 'IP':'IP1', 'probe_nbr':3, 'probe_type':"Mobile BT", 'above70K':True, 'color':'#0000ff'},
+    {'name':'Etage   4 K', 'IP':'IP3', 'probe_nbr':1, 'probe_type':"Mobile HT", 'above70K':True, 'color':'#00ffff'},
+    {'name':'Etage  20 K', 'IP':'IP3', 'probe_nbr':2, 'probe_type':"Mobile HT", 'above70K':True, 'color':'#ff00ff'},
+    {'name':'Etage 100 K', 'IP':'IP3', 'probe_nbr':3, 'probe_type':"PT100"    , 'above70K':True, 'color':'#ffff00'},
+]
+
+def generateColor(i):
+    '''
+    * Colour '#rrggbb' of the i-th probe without colour in the config. The hues are spaced by the golden ratio,
+      so that any nbr of probes get distinct colours, the neighbours being far apart, and the value alternates
+      to separate the close hues of the large configs.
+    '''
+    hue   = (0.61803398875*i) % 1.
+    value = 1. if (i//7)%2==0 else 0.75
+    # ---  --- #
+    return '#{0:02x}{1:02x}{2:02x}'.format(*(int(round(255*c)) for c in colorsys.hsv_to_rgb(hue, 0.85, value)))
+
+def loadProbeConfig(path_to_file=None, IP_dic=None):
+    '''
+    * Returns the list of the probes of the json file path_to_file, in the form
+          {"probes": [{"name": ..., "IP": ..., "probe_nbr": ..., "probe_type": ..., "above70K": ..., "color": ...}, ...]}
+      or DEFAULT_PROBES if path_to_file is None or does not exist.
+    * The IP is either an address, or the name of an address in IP_dic, cf getIPFromTxt. Only 'IP' and
+      'probe_nbr' are required, the name defaults to 'probe_k', the probe type to "Mobile BT", above70K to False,
+      and the colour is made by generateColor. An optional "group" (eg the cryostat) is kept as is.
+    * Raises ValueError if a probe is not valid.
+    '''
+    if path_to_file is not None and os.path.isfile(path_to_file):
+        with open(path_to_file, 'r') as f:
+            config = json.load(f)
+        probes_in = config['probes'] if isinstance(config, dict) else config
+    else:
+        probes_in = DEFAULT_PROBES
+    # ---  --- #
+    return makeProbeConfig(probes_in, IP_dic, path_to_file)
+
+def makeProbeConfig(probes_in, IP_dic=None, source=None):
+    '''
+    * Returns the list of the probes probes_in completed and checked as in loadProbeConfig, eg for the probes of a
+      recording, cf ReplaySource. 'source' only names where the probes come from in the errors.
+    '''
+    IP_dic = IP_dic or {}
+    probes = []
+    for i, probe_in in enumerate(probes_in):
+        if 'IP' not in probe_in or 'probe_nbr' not in probe_in:
+            raise ValueError('probe {0} of {1}: "IP" and "probe_nbr" are required'.format(i, source))
+        probe = {'name'      : str(probe_in.get('name', 'probe_{}'.format(i))),
+                 'IP'        : IP_dic.get(probe_in['IP'], probe_in['IP']),
+                 'probe_nbr' : int(probe_in['probe_nbr']),
+                 'probe_type': probe_in.get('probe_type', "Mobile BT"),
+                 'above70K'  : bool(probe_in.get('above70K', False)),
+                 'color'     : probe_in.get('color', None) or generateColor(i)}
+        if 'group' in probe_in:
+            probe['group'] = probe_in['group']
+        if getConverter(probe['probe_type']) is None:
+            raise ValueError('probe {0}: unknown probe type {1}'.format(probe['name'], probe['probe_type']))
+        probes.append(probe)
+    # ---  --- #
+    return probes
+
+def saveProbeConfig(path_to_file, probes):
+    with open(path_to_file, 'w') as f:
+        json.dump({'probes':probes}, f, indent=4)
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    probes = loadProbeConfig(None, {'IP1':'192.168.1.101', 'IP3':'192.168.1.103'})
+    for probe in probes:
+        print(probe)
+    print([generateColor(i) for i in range(10)])
+    print('FINNISHED')
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import sys, os
+
+try:
+	from Buffer_class import Buffer
+except:
+	sys.path.append("../")
+	from lib.Buffer_class import Buffer
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class ProbeDataStore():
+    '''
+    Columnar storage of the data recorded for all the probes.
+    * Each probe ID is mapped to a dense integer slot, which is the row of the probe in 2-D (n_probes, length)
+      circular buffers for the time, the resistance and the temperature, plus a validity mask.
+    * A measurement tick for all the probes is then a single column push, and the conversion, plotting and
+      saving can work on whole 2-D arrays instead of looping over the probes and the keys.
+    * The validity mask is True where the resistance is an actual measurement, and False for the default
+      values of a buffer not yet full, or when the last measured value was reused because the measure failed.
+    * The 'last' dictionary keeps the last valid time and resistance of each probe, indexed by slot.
+    * 'version' is incremented at each change of the data, so that the displays can cache what they compute
+      from them.
+    '''
+    data_keys = ['time', 'resistance', 'temperature']
+
+    def __init__(self, probe_ids=[], **kwargs):
+        self.length      = int(kwargs.pop('length'     , 50))
+        self.capacity    = int(kwargs.pop('capacity'   , self.length))
+        self.default_val = kwargs.pop('default_val', -1)
+        # ---  --- #
+        self.slots  = {} # probe_id --> slot
+        self.ids    = [] # slot     --> probe_id
+        self.buffer = {key: Buffer(np.full((0, self.length), self.default_val), rows=0, capacity=self.capacity, default_val=self.default_val) for key in self.data_keys}
+        self.buffer['valid'] = Buffer(np.zeros((0, self.length), dtype=bool), rows=0, capacity=self.capacity, default_val=False, dtype=bool)
+        self.last   = {'time':np.zeros(0), 'resistance':np.zeros(0)}
+        self.version = 0
+        # ---  --- #
+        self.addProbes(probe_ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, probe_id):
+        return probe_id in self.slots
+
+    @property
+    def count(self):
+        '''
+        * Total nbr of ticks pushed in the store.
+        '''
+        return self.buffer['time'].count
+
+    def addProbe(self, probe_id):
+        '''
+        * Give a new slot to probe_id, and returns it.
+        '''
+        return self.addProbes([probe_id])[0]
+
+    def addProbes(self, probe_ids):
+        '''
+        * Give a new slot to each probe ID of probe_ids, and returns their slots. The rows of all the new probes
+          are added at once, so that the storage is reallocated once whatever their nbr.
+        '''
+        new_ids = []
+        for probe_id in probe_ids:
+            if probe_id not in self.slots and probe_id not in new_ids:
+                new_ids.append(probe_id)
+        # ---  --- #
+        for probe_id in new_ids:
+            self.slots[probe_id] = len(self.ids)
+            self.ids.append(probe_id)
+        # ---
+        if new_ids:
+            for key in self.buffer:
+                self.buffer[key].add_rows(len(new_ids))
+            self.last['time'      ] = np.append(self.last['time'      ], np.full(len(new_ids), np.nan))
+            self.last['resistance'] = np.append(self.last['resistance'], np.full(len(new_ids), self.default_val, dtype=float))
+        # ---  --- #
+        return [self.slots[probe_id] for probe_id in probe_ids]
+
+    def slot(self, probe_id):
+        return self.slots[probe_id]
+
+    def push(self, time, resistance, temperature, valid=True):
+        '''
+        * Push one sample for all the probes. Each argument is either a scalar, or an array of size n_probes
+          ordered by slot.
+        '''
+        valid_ = np.broadcast_to(np.asarray(valid, dtype=bool), (len(self),))
+        # ---  --- #
+        self.buffer['time'       ].push_element(time)
+        self.buffer['resistance' ].push_element(resistance)
+        self.buffer['temperature'].push_element(temperature)
+        self.buffer['valid'      ].push_element(valid_)
+        # ---
+        self.last['time'      ][valid_] = np.broadcast_to(time      , (len(self),))[valid_]
+        self.last['resistance'][valid_] = np.broadcast_to(resistance, (len(self),))[valid_]
+        self.version += 1
+
+    def view(self, key):
+        '''
+        * Returns the read-only 2-D (n_probes, length) view of the data 'key', in chronological order.
+        '''
+        return self.buffer[key].view()
+
+    def row(self, key, probe_id):
+        '''
+        * Returns the read-only view of the data 'key' for probe_id, in chronological order.
+        '''
+        return self.buffer[key].view()[self.slots[probe_id]]
+
+    def setRow(self, key, probe_id, values, mask=None, count=None):
+        '''
+        * Write the row 'values' of probe_id in the data 'key', where 'mask' is True.
+        * 'count' is the value of self.count when the row was read, eg to compute the values in another
+          thread. The values are then shifted by the nbr of ticks pushed since, so that each one is written
+          at the position of its sample, and the ones whose sample got out of the buffer are dropped.
+        '''
+        values = np.asarray(values)
+        mask   = np.ones(values.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        count  = self.count if count is None else count
+        # ---  --- #
+        idx  = np.nonzero(mask)[0] + (count - len(mask)) - (self.count - self.length) # position of the samples in the current view
+        kept = (idx>=0) & (idx<self.length)
+        # ---  --- #
+        col = np.zeros(self.length, dtype=bool)
+        col[idx[kept]] = True
+        self.buffer[key][self.slots[probe_id], col] = values[mask][kept]
+        self.version += 1
+
+    def filled(self):
+        '''
+        * Returns the 2-D mask of the elements that have been pushed, i.e that are not default values.
+        '''
+        return self.view('time')!=self.default_val
+
+    def change_length(self, new_len):
+        self.length = int(new_len)
+        # ---  --- #
+        for key in self.buffer:
+            self.buffer[key].change_length(self.length)
+        self.version += 1
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    store = ProbeDataStore(['probe_a', 'probe_b', 'probe_c'], length=5, capacity=10)
+    for i in range(7):
+        store.push(time=float(i), resistance=np.array([100., 200., 300.])+i, temperature=np.array([1., 2., 3.])*i, valid=[True, i%2==0, True])
+    print(store.view('resistance'))
+    print(store.view('valid'))
+    print(store.row('temperature', 'probe_b'))
+    print(store.last)
+    print('FINNISHED')
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import sys, os
+
+try:
+	from DataArchive_class import ArchiveWriter, ArchiveReader
+	from Decimator_class   import reduceMinMax
+except:
+	sys.path.append("../")
+	from lib.DataArchive_class import ArchiveWriter, ArchiveReader
+	from lib.Decimator_class   import reduceMinMax
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class ProbeHistory():
+    '''
+    Long-term history of all the probes, kept on disk beyond the in-RAM display buffer.
+    * Each tick is appended to an archive of DataArchive_class by an ArchiveWriter, which costs a constant
+      time whatever the length of the run, each flush only writing the ticks queued since the previous one
+      (4 x 8 bytes per probe and tick, i.e about 17 MB per day for 6 probes at 1 Hz). The archive is read back
+      by memory-mapping with an ArchiveReader. Thus the RAM used depends on the time window asked, not on the
+      length of the run.
+    * 'window(t_start, t_stop, key)' returns the samples of all the probes in a time window, at most
+      'max_points' per probe by reducing the blocks of n ticks to their min/max envelope when the window is large,
+      as the Decimator of the live plots, so that a short excursion, eg a quench, is still seen.
+    * The temperatures are the ones converted at the time of the recording.
+    '''
+    def __init__(self, path_to_file, names, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        kwargs.setdefault('flush_interval', 1.0) # [s]
+        # ---  --- #
+        self.path_to_file = path_to_file
+        self.writer       = ArchiveWriter(path_to_file, names, **kwargs)
+        self.reader       = None # made at the first query, once the header is written
+
+    def __len__(self):
+        return self.writer.n_ticks + len(self.writer)
+
+    def append(self, time_, resistance, temperature, valid=True):
+        self.writer.append(time_, resistance, temperature, valid)
+
+    def updateMetadata(self, metadata):
+        self.writer.updateMetadata(metadata)
+
+    def refresh(self):
+        '''
+        * Map the ticks flushed so far, and returns their nbr.
+        '''
+        if self.reader is None:
+            if self.writer.n_ticks==0:
+                return 0
+            self.reader = ArchiveReader(self.path_to_file)
+        # ---  --- #
+        return self.reader.refresh()
+
+    def span(self):
+        '''
+        * Returns the times (first, last) of the history, None if it is empty.
+        '''
+        n_ticks = self.refresh()
+        if not n_ticks:
+            return None
+        # ---  --- #
+        return self.reader.read('time', 0, 1)[0, 0], self.reader.read('time', n_ticks-1)[0, 0]
+
+    def window(self, t_start, t_stop, key, **kwargs):
+        '''
+        * Returns (time, data, valid), three (n_probes, n) arrays of the ticks with t_start <= time <= t_stop,
+          according to the time of the probe in slot 0.
+        * max_points: if the window has more ticks, each block of n ticks gives two points, the min and max of its
+          valid samples at the time of its first tick, cf reduceMinMax. The window is read by blocks of about
+          'read_size' ticks, so that the memory used does not depend on its length.
+        '''
+        max_points = kwargs.pop('max_points', None)
+        read_size  = kwargs.pop('read_size' , 1<<16) # nbr of ticks
+        # ---  --- #
+        n_ticks = self.refresh()
+        if not n_ticks:
+            return np.zeros((0, 0)), np.zeros((0, 0)), np.zeros((0, 0), dtype=bool)
+        # ---  --- #
+        start = max(self.reader.searchTime(t_start) - 1, 0) # one tick before and after, so that the curves reach the edges
+        stop  = min(self.reader.searchTime(np.nextafter(t_stop, np.inf)) + 1, n_ticks)
+        step  = max(1, -(-(stop-start)//max(max_points//2, 1))) if max_points else 1
+        if step==1:
+            return self.reader.read('time', start, stop), self.reader.read(key, start, stop), self.reader.read('valid', start, stop)
+        # ---  --- #
+        t_, data_ = [], []
+        for i in range(start, stop, step*max(1, read_size//step)):
+            j      = min(i+step*max(1, read_size//step), stop)
+            starts = np.arange(0, j-i, step)
+            valid  = self.reader.read('valid', i, j)
+            t_.append(np.repeat(self.reader.read('time', i, j)[:, starts], 2, axis=1))
+            data_.append(reduceMinMax(np.where(valid, self.reader.read(key, i, j), np.nan), starts))
+        t_, data_ = np.concatenate(t_, axis=1), np.concatenate(data_, axis=1)
+        # ---  --- #
+        return t_, data_, ~np.isnan(data_)
+
+    def close(self, wait=True):
+        self.writer.close(wait=wait)
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    history = ProbeHistory('test_history.tca', ['Boite Mel', 'Bouilleur'], chunk_size=16, flush_interval=0.05)
+    t0      = time.time()
+    for i in range(100):
+        history.append([t0+i]*2, [1000.+i+1e3*(i==33), 2000.+i], [0.1*i, 0.2*i], valid=[True, i%10!=0])
+    time.sleep(0.2)
+    print(len(history), history.span())
+    t_, R_, valid_ = history.window(t0+10, t0+60, 'resistance', max_points=10)
+    print(t_-t0, R_, valid_.all()) # the spike of the tick 33 is kept
+    history.close()
+    os.remove('test_history.tca')
+    print('FINNISHED')
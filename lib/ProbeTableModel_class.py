@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import sys, os
+
+from PyQt5.QtCore    import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui     import QColor
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
+
+try:
+	from Conversion_functions import getConverter
+except:
+	sys.path.append("../")
+	from lib.Conversion_functions import getConverter
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class ProbeTableModel(QAbstractTableModel):
+    '''
+    Model of the table of the probes: name, resistance, temperature, probe type and T > 70 K, one row per probe.
+    * Shown by a QTableView, which only paints the visible rows, and without any widget per probe: the probe type
+      is edited through ProbeTypeDelegate, whose combo box only exists while a cell is edited, and T > 70 K is a
+      check box of the view. Thus the cost of the display does not depend on the nbr of probes.
+    * The new values of all the probes are given at once by setValues, which emits a single dataChanged.
+    * The edits of the user are emitted with the probe ID: probe_type_sgnl, above70K_sgnl, and resistance_sgnl for a
+      resistance typed to test the conversion.
+    * probes: dictionary of the probes settings {probe_id: {'name', ...}} of the ResistanceProbe, read for the names.
+    '''
+    probe_type_sgnl = pyqtSignal(object) # emit: probe_id
+    above70K_sgnl   = pyqtSignal(object) # emit: probe_id
+    resistance_sgnl = pyqtSignal(object) # emit: probe_id
+
+    columns = ['Probe', 'R [Ohm]', 'T [K]', 'Type', 'T > 70 K']
+    COL_NAME, COL_RES, COL_TEMP, COL_TYPE, COL_ABOVE70K = range(5)
+
+    def __init__(self, probes, ids, probe_types, above70K, colors, parent=None):
+        super().__init__(parent)
+        self.probes      = probes
+        self.ids         = list(ids) # row --> probe_id
+        self.rows        = {probe_id:row for row, probe_id in enumerate(self.ids)}
+        self.probe_types = dict(probe_types) # probe_id --> probe type
+        self.above70K_   = dict(above70K)    # probe_id --> bool
+        self.colors      = {probe_id:QColor(color) for probe_id, color in colors.items()}
+        self.resistance  = np.full(len(self.ids), np.nan)
+        self.temperature = np.full(len(self.ids), np.nan)
+
+    # ====== QAbstractTableModel ====== #
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role==Qt.DisplayRole and orientation==Qt.Horizontal:
+            return self.columns[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        probe_id, col = self.ids[index.row()], index.column()
+        # ---  --- #
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            if   col==self.COL_NAME:
+                return self.probes[probe_id]['name']
+            elif col==self.COL_RES:
+                value = self.resistance[index.row()]
+                return (float(value) if np.isfinite(value) else 0.) if role==Qt.EditRole else ('{:.2f}'.format(value) if np.isfinite(value) else '-')
+            elif col==self.COL_TEMP:
+                value = self.temperature[index.row()]
+                return '{:.4f}'.format(value) if np.isfinite(value) else '-'
+            elif col==self.COL_TYPE:
+                return self.probe_types[probe_id]
+        elif role==Qt.CheckStateRole and col==self.COL_ABOVE70K:
+            return Qt.Checked if self.above70K_[probe_id] else Qt.Unchecked
+        elif role==Qt.DecorationRole and col==self.COL_NAME:
+            return self.colors.get(probe_id, None)
+        elif role==Qt.TextAlignmentRole and col in (self.COL_RES, self.COL_TEMP):
+            return Qt.AlignRight | Qt.AlignVCenter
+        # ---  --- #
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        col   = index.column()
+        flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        # ---  --- #
+        if   col in (self.COL_RES, self.COL_TYPE):
+            flags |= Qt.ItemIsEditable
+        elif col==self.COL_ABOVE70K:
+            flags  = Qt.ItemIsUserCheckable | Qt.ItemIsSelectable
+            if getConverter(self.probe_types[self.ids[index.row()]]).uses_above70K: # only the probes whose converter uses it, i.e "Mobile BT", "Mobile HT"
+                flags |= Qt.ItemIsEnabled
+        # ---  --- #
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        probe_id, col = self.ids[index.row()], index.column()
+        # ---  --- #
+        if   col==self.COL_TYPE and role==Qt.EditRole:
+            if value==self.probe_types[probe_id] or getConverter(value) is None:
+                return False
+            self.probe_types[probe_id] = value
+            self.dataChanged.emit(index, self.index(index.row(), self.COL_ABOVE70K)) # the T > 70 K box may be enabled/disabled
+            self.probe_type_sgnl.emit(probe_id)
+        elif col==self.COL_ABOVE70K and role==Qt.CheckStateRole:
+            self.above70K_[probe_id] = (value==Qt.Checked)
+            self.dataChanged.emit(index, index)
+            self.above70K_sgnl.emit(probe_id)
+        elif col==self.COL_RES and role==Qt.EditRole:
+            self.resistance[index.row()] = float(value)
+            self.dataChanged.emit(index, index)
+            self.resistance_sgnl.emit(probe_id)
+        else:
+            return False
+        # ---  --- #
+        return True
+
+    # ====== Access by probe ID ====== #
+    def probeType(self, probe_id):
+        return self.probe_types[probe_id]
+
+    def above70K(self, probe_id):
+        return self.above70K_[probe_id]
+
+    def resistanceOf(self, probe_id):
+        return self.resistance[self.rows[probe_id]]
+
+    def probeAt(self, index):
+        return self.ids[index.row()]
+
+    def setValues(self, res_L, temp_L):
+        '''
+        * Set the resistances and temperatures of all the probes, in the order of the rows.
+        '''
+        self.resistance[:]  = res_L
+        self.temperature[:] = temp_L
+        self.dataChanged.emit(self.index(0, self.COL_RES), self.index(len(self.ids)-1, self.COL_TEMP))
+
+    def setTemperature(self, probe_id, T):
+        row = self.rows[probe_id]
+        self.temperature[row] = T
+        self.dataChanged.emit(self.index(row, self.COL_TEMP), self.index(row, self.COL_TEMP))
+
+    def nameChanged(self, probe_id):
+        row = self.rows[probe_id]
+        self.dataChanged.emit(self.index(row, self.COL_NAME), self.index(row, self.COL_NAME))
+
+class ProbeTypeDelegate(QStyledItemDelegate):
+    '''
+    * Combo box of the probe types, only made while a cell of the 'Type' column is edited.
+    '''
+    def __init__(self, probe_types, parent=None):
+        super().__init__(parent)
+        self.probe_types = probe_types
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(self.probe_types)
+        editor.activated.connect(lambda idx: self.commitData.emit(editor)) # commit as soon as a type is chosen
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentIndex(max(editor.findText(index.data(Qt.EditRole)), 0))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    from PyQt5.QtWidgets import QApplication, QTableView
+    try:
+        from Conversion_functions import probeTypes
+    except:
+        from lib.Conversion_functions import probeTypes
+    app    = QApplication(sys.argv)
+    probes = {i:{'name':'probe_{}'.format(i)} for i in range(200)}
+    model  = ProbeTableModel(probes, list(probes), {i:"Mobile BT" for i in probes}, {i:False for i in probes}, {i:'#ff0000' for i in probes})
+    view   = QTableView()
+    view.setModel(model)
+    view.setItemDelegateForColumn(ProbeTableModel.COL_TYPE, ProbeTypeDelegate(probeTypes(), view))
+    model.setValues(np.linspace(100, 1000, 200), np.linspace(1, 300, 200))
+    view.show()
+    sys.exit(app.exec_())
+    print('FINNISHED')
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import time
+import sys, os
+from collections import OrderedDict
+
+import pyqtgraph as pg
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class RenderScheduler():
+    '''
+    Refresh of the display at its own rate, independent of the acquisition rate.
+    * Each part of the display is a task, i.e a function that repaints it. The new data only mark the tasks
+      as dirty, which costs nothing, and a timer runs the dirty tasks at 'fps' at most. Thus several ticks
+      acquired between two frames are painted once.
+    * A task whose 'visible()' is False, eg a hidden dock, is skipped and stays dirty, so that it is painted
+      once it is visible again. No task is run while 'visible()' of the scheduler is False, eg when the
+      window is minimized.
+    '''
+    def __init__(self, fps=10, visible=None, verbose=False):
+        self.fps     = fps # Hz
+        self.visible = visible
+        self.verbose = verbose
+        self.tasks   = OrderedDict() # name --> {'func', 'visible', 'dirty'}
+        self.n_frames  = 0 # nbr of frames that painted at least one task
+        self.n_skipped = 0 # nbr of frames skipped because the display is not visible
+        # ---  --- #
+        self.timer   = pg.QtCore.QTimer()
+        self.timer.timeout.connect(self.render)
+
+    def addTask(self, name, func, visible=None):
+        '''
+        * The tasks are run in the order they are added.
+        '''
+        self.tasks[name] = {'func':func, 'visible':visible, 'dirty':True}
+
+    def markDirty(self, *names):
+        '''
+        * Mark the tasks 'names' to be painted at the next frame, all of them if no name is given.
+        '''
+        for name in (names or self.tasks):
+            self.tasks[name]['dirty'] = True
+
+    def isDirty(self, name=None):
+        if name is None:
+            return any(task['dirty'] for task in self.tasks.values())
+        return self.tasks[name]['dirty']
+
+    def setFPS(self, fps):
+        self.fps = fps
+        if self.timer.isActive():
+            self.timer.setInterval(int(1e3/self.fps))
+
+    def start(self):
+        self.timer.start(int(1e3/self.fps))
+
+    def stop(self):
+        self.timer.stop()
+
+    def render(self):
+        '''
+        * Run the dirty tasks that are visible. Returns the nbr of tasks run.
+        '''
+        if not self.isDirty():
+            return 0
+        if self.visible is not None and not self.visible():
+            self.n_skipped += 1
+            return 0
+        # ---  --- #
+        n_run = 0
+        for name, task in self.tasks.items():
+            if not task['dirty'] or (task['visible'] is not None and not task['visible']()):
+                continue
+            task['dirty'] = False # before the call, so that the task can mark itself dirty again
+            task['func']()
+            n_run += 1
+        # ---  --- #
+        self.n_frames += 1 if n_run else 0
+        return n_run
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    from PyQt5.QtWidgets import QApplication
+    app       = QApplication(sys.argv)
+    painted   = []
+    scheduler = RenderScheduler(fps=10)
+    scheduler.addTask('plot'  , lambda: painted.append('plot'))
+    scheduler.addTask('hidden', lambda: painted.append('hidden'), visible=lambda: False)
+    for i in range(100): # 100 ticks between two frames
+        scheduler.markDirty()
+    print(scheduler.render(), painted, scheduler.isDirty('hidden'))
+    print('FINNISHED')
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import threading
+import sys, os
+
+try:
+	from DataArchive_class      import ArchiveReader
+	from DataReader_class       import TextReader
+	from AcquisitionWorker_class import SampleQueue
+except:
+	sys.path.append("../")
+	from lib.DataArchive_class      import ArchiveReader
+	from lib.DataReader_class       import TextReader
+	from lib.AcquisitionWorker_class import SampleQueue
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class ReplaySource():
+    '''
+    Recording read back tick by tick, eg to replay it through the live pipeline.
+    * The recording is an archive 'tca' of ArchiveReader, read by blocks of 'block_size' ticks, or a txt file of
+      TextReader, read by blocks of 'chunk_size' bytes, so that the memory used does not depend on the length of
+      the recording.
+    * probeConfig returns the probes of the recording, in the form of loadProbeConfig, so that the replay shows
+      the probes recorded with their type and T > 70 K state. The txt files only have the names of the probes,
+      whose settings are taken from 'defaults', eg the probes of loadProbeConfig.
+    '''
+    def __init__(self, path_to_file, **kwargs):
+        self.block_size = int(kwargs.pop('block_size', 4096)) # nbr of ticks, for an archive
+        self.chunk_size = int(kwargs.pop('chunk_size', 4<<20)) # [bytes], for a txt file
+        self.verbose    = kwargs.pop('verbose'   , False)
+        # ---  --- #
+        self.path_to_file = path_to_file
+        self.text         = os.path.splitext(path_to_file)[1]=='.txt'
+        self.reader       = TextReader(path_to_file, chunk_size=self.chunk_size) if self.text else ArchiveReader(path_to_file)
+        self.names        = self.reader.names
+        self.metadata     = self.reader.metadata
+        self.n_probes     = self.reader.n_probes
+        print('Replay of {0}: {1} probes'.format(path_to_file, self.n_probes)) if self.verbose else None
+
+    def probeConfig(self, defaults=None):
+        defaults = {probe['name'].replace(' ', '_'):probe for probe in defaults or []} # names as in the header of the txt files
+        config   = []
+        for slot, probe in enumerate(self.metadata):
+            default = defaults.get(probe.get('name', '').replace(' ', '_'), {})
+            config.append({'name':probe.get('name', 'probe_{}'.format(slot)), 'IP':probe.get('IP', default.get('IP', '127.0.0.1')), 'probe_nbr':probe.get('probe_nbr', default.get('probe_nbr', slot+1)),
+                           'probe_type':probe.get('probe_type', default.get('probe_type', "Mobile BT")), 'above70K':probe.get('above70K', default.get('above70K', False))})
+            if 'color' in default:
+                config[-1]['color'] = default['color']
+        # ---  --- #
+        return config
+
+    def blocks(self, start=0):
+        '''
+        * Yields the blocks (time, resistance, valid) of (n_probes, n) arrays from the tick 'start'.
+        '''
+        if self.text:
+            for block in self.reader.chunks():
+                n      = block['time'].shape[1]
+                if n>start:
+                    yield tuple(block[key][:, start:] for key in ['time', 'resistance', 'valid'])
+                start  = max(start-n, 0)
+            return
+        # ---  --- #
+        for i in range(start, len(self.reader), self.block_size):
+            yield tuple(self.reader.read(key, i, i+self.block_size) for key in ['time', 'resistance', 'valid'])
+
+class ReplayWorker(threading.Thread):
+    '''
+    Thread that plays a ReplaySource in place of an AcquisitionWorker, with the same interface, so that the GUI
+    records the ticks of the recording as live ones: drainSamples --> recordResistance --> conversion --> buffers
+    --> display.
+    * Each tick is put in 'queue' as a dictionary {probe_id: (time, resistance)}, with resistance None where the
+      sample was not valid, i.e a failed measure, and with the time of the recording.
+    * speed: the ticks are played 'speed' times faster than recorded, or as fast as the consumer drains them if
+      None. In this case the thread waits while the queue holds 'high_water' ticks, half of it by default, so that
+      no tick is dropped, and a consumer draining it in slices, eg drainSamples, finds a short queue.
+    * setContinuous plays/pauses the replay, trigger plays a single tick, and setFPS does nothing, the rate being
+      the one of the recording.
+    * 'done' is set at the end of the recording, and 'report' gives the rate achieved. Played as fast as possible, it
+      is the throughput of the consumer, the queue being never more than high_water ticks long.
+    '''
+    def __init__(self, source, probe_ids, **kwargs):
+        super().__init__(daemon=True)
+        self.verbose    = kwargs.pop('verbose'   , False)
+        self.speed      = kwargs.pop('speed'     , 1.) # None or 0 -> as fast as possible
+        self.queue      = SampleQueue(kwargs.pop('queue_size', 10000))
+        self.high_water = int(kwargs.pop('high_water', self.queue.queue.maxlen//2)) # nbr of ticks queued above which the thread waits, if speed is None
+        self.source     = source
+        self.probe_ids  = list(probe_ids) # slot of the recording --> probe_id
+        # ---  --- #
+        self.continuous = threading.Event()
+        self.triggered  = threading.Event()
+        self.stopped    = threading.Event()
+        self.done       = threading.Event()
+        self.n_ticks    = 0
+        self.t_start    = None # wall time of the first tick played
+        self.t_end      = None
+        self.t_rec      = [None, None] # time of the first and last ticks played in the recording
+
+    def setFPS(self, fps):
+        pass
+
+    def setContinuous(self, state):
+        if state:
+            self.continuous.set()
+        else:
+            self.continuous.clear()
+        self.triggered.set()
+
+    def trigger(self):
+        self.triggered.set()
+
+    def stop(self, timeout=None):
+        self.stopped.set()
+        self.triggered.set()
+        if timeout is not None and self.is_alive():
+            self.join(timeout)
+
+    def waitTick(self, t_rec, origin):
+        '''
+        * Wait until the time of the tick recorded at t_rec, or a pause/stop. Returns the origin (wall time, recording
+          time) of the pacing, which is moved after a pause so that the replay resumes where it stopped.
+        '''
+        while not self.stopped.is_set():
+            if not self.continuous.is_set(): # paused, or single tick asked by trigger
+                self.triggered.wait()
+                self.triggered.clear()
+                if self.stopped.is_set():
+                    break
+                if not self.continuous.is_set(): # trigger: play this tick now
+                    return (time.time(), t_rec)
+                origin = (time.time(), t_rec)
+            # ---  --- #
+            if not self.speed:
+                while len(self.queue)>=self.high_water and not self.stopped.is_set() and self.continuous.is_set():
+                    time.sleep(1e-3)
+                return origin
+            # ---
+            wait = origin[0] + (t_rec-origin[1])/self.speed - time.time()
+            if wait<=0:
+                return origin
+            self.triggered.wait(wait)
+            self.triggered.clear()
+        # ---  --- #
+        return origin
+
+    def run(self):
+        origin = None
+        for time_, resistance, valid in self.source.blocks():
+            for j in range(time_.shape[1]):
+                finite = time_[:, j][np.isfinite(time_[:, j])]
+                t_rec  = finite.min() if len(finite) else (origin[1] if origin else 0.)
+                origin = self.waitTick(t_rec, origin or (time.time(), t_rec))
+                if self.stopped.is_set():
+                    return
+                # ---  --- #
+                self.queue.put({probe_id:(time_[slot, j], resistance[slot, j] if valid[slot, j] else None) for slot, probe_id in enumerate(self.probe_ids)})
+                self.n_ticks += 1
+                self.t_start  = time.time() if self.t_start is None else self.t_start
+                self.t_rec    = [t_rec if self.t_rec[0] is None else self.t_rec[0], t_rec]
+        # ---  --- #
+        self.t_end = time.time()
+        self.done.set()
+        print('Replay: end of {}'.format(self.source.path_to_file)) if self.verbose else None
+
+    def report(self, t_end=None):
+        '''
+        * Rate of the replay from its first tick until t_end, eg the time where the consumer drained the last tick,
+          or the end of the replay by default.
+        '''
+        if self.t_start is None:
+            return 'Replay: no tick played'
+        dt = (t_end or self.t_end or time.time()) - self.t_start
+        return 'Replay: {0} ticks, {1} samples played in {2:.3f} s, {3:.0f} samples/s, {4:.0f} s of recording at x{5:.1f} speed'.format(
+                self.n_ticks, self.n_ticks*len(self.probe_ids), dt, self.n_ticks*len(self.probe_ids)/dt if dt>0 else np.inf,
+                self.t_rec[1]-self.t_rec[0], (self.t_rec[1]-self.t_rec[0])/dt if dt>0 else np.inf)
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    try:
+        from DataArchive_class import ArchiveWriter
+    except:
+        from lib.DataArchive_class import ArchiveWriter
+    writer = ArchiveWriter('test_replay.tca', ['Boite Mel', 'Bouilleur'], chunk_size=16)
+    t_0    = time.time()
+    for i in range(50):
+        writer.append([t_0+0.1*i]*2, [1000.+i, 2000.+i], [0.1*i, 0.2*i], valid=[True, i%10!=0])
+    writer.close()
+    source = ReplaySource('test_replay.tca', block_size=20, verbose=True)
+    worker = ReplayWorker(source, ['id1', 'id2'], speed=10.)
+    worker.start()
+    worker.setContinuous(True)
+    worker.done.wait(5)
+    print(len(worker.queue), worker.queue.drain()[:2])
+    print(worker.report())
+    os.remove('test_replay.tca')
+    print('FINNISHED')
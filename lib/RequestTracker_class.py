@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import time
+from collections import deque
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+def macrtChannel(sonde):
+    '''
+    * Index of the MacRT channel that gives the resistance of the probe 'sonde'.
+    '''
+    return (sonde-1)*11+3
+
+def macrtPort(IP):
+    '''
+    * Port of the MacRT server at 'IP', in the form '192.168.1.xxx'.
+    '''
+    return 12000 +int(IP[-3:], 10)
+
+def macrtQuery(channel):
+    return "MACRTGET {0}".format(channel)
+
+def parseMacrtReply(datagram):
+    '''
+    * Returns (channel, value) from a MacRT reply. The value is the third field of the reply, and the
+      second field is expected to be the channel index echoed by the server. If the second field is not
+      an integer, the channel is None and the reply can only be matched by host.
+    * Raises ValueError if the reply is malformed.
+    '''
+    try:
+        fields = (datagram.decode() if isinstance(datagram, (bytes, bytearray)) else str(datagram)).strip().split()
+        value  = float(fields[2])
+    except (IndexError, ValueError, UnicodeDecodeError):
+        raise ValueError('malformed MacRT reply: {}'.format(datagram))
+    # ---  --- #
+    try:
+        channel = int(fields[1])
+    except ValueError:
+        channel = None
+    # ---  --- #
+    return channel, value
+
+class RequestTracker():
+    '''
+    Book-keeping of the MACRTGET queries sent to the MacRT servers, so that each reply is given to the
+    query it answers.
+    * A query is identified by its key (eg the probe ID), and addressed to a server (host, port) for a channel
+      (sonde-1)*11+3. A reply coming from a host is matched to the oldest query in flight to this host with
+      the same channel. If the reply does not echo the channel, it is matched to the oldest query in flight
+      to this host.
+    * The port of the reply is only checked with 'strict_port=True', since the source port of the replies
+      is not necessarily the port the queries are sent to.
+    * At most 'max_in_flight' queries are in flight per server, the others wait in a queue and are released
+      when a query is answered or timed out. The MacRT serving three channels, the default is 3.
+    * Replies that answer no query in flight are discarded: 'stale' when the query already timed out,
+      'duplicate' when it already got a reply, 'unknown' otherwise.
+    * The tracker does not make any I/O: submit, matchReply and expire return the queries that can be
+      sent, and the caller sends them and calls markSent.
+    * With 'stats', a NetworkStats, the queries sent, the round trip time of the replies, the timeouts and the
+      discarded replies are also recorded per probe key and per host.
+    '''
+    def __init__(self, **kwargs):
+        self.max_in_flight = kwargs.pop('max_in_flight', 3)
+        self.timeout       = kwargs.pop('timeout'      , 0.5) # [s]
+        self.strict_port   = kwargs.pop('strict_port'  , False)
+        self.verbose       = kwargs.pop('verbose'      , False)
+        self.stats         = kwargs.pop('stats'        , None)
+        # ---  --- #
+        self.in_flight = {} # (host, port) --> list of the requests sent and waiting for a reply, oldest first
+        self.queued    = {} # (host, port) --> deque of the requests waiting for a free slot
+        self.recent    = {} # (host, channel) --> 'answered' or 'expired', state of the last completed request
+        self.counts    = {'sent':0, 'matched':0, 'expired':0, 'stale':0, 'duplicate':0, 'unknown':0, 'malformed':0}
+
+    def __len__(self):
+        return sum(len(L) for L in self.in_flight.values()) + sum(len(L) for L in self.queued.values())
+
+    def isPending(self, key):
+        return any(request['key']==key for L in list(self.in_flight.values())+list(self.queued.values()) for request in L)
+
+    def makeRequest(self, key, host, sonde, **kwargs):
+        '''
+        * Returns the request of the channel of the probe 'sonde' at 'host', identified by 'key'.
+        '''
+        timeout = kwargs.pop('timeout', self.timeout)
+        # ---  --- #
+        channel = macrtChannel(sonde)
+        return {'key':key, 'host':host, 'port':macrtPort(host), 'channel':channel, 'query':macrtQuery(channel), 'timeout':timeout, 'sent':None, 'deadline':None}
+
+    def submit(self, request):
+        '''
+        * Add a request made by makeRequest.
+        * Returns the list of requests that can be sent right now.
+        '''
+        server = (request['host'], request['port'])
+        # ---  --- #
+        self.queued.setdefault(server, deque()).append(request)
+        return self.releaseQueued(server)
+
+    def releaseQueued(self, server):
+        '''
+        * Move the queued requests of 'server' in flight, within the limit of max_in_flight.
+        '''
+        to_send   = []
+        in_flight = self.in_flight.setdefault(server, [])
+        queued    = self.queued.get(server, deque())
+        # ---  --- #
+        while queued and len(in_flight)<self.max_in_flight:
+            request = queued.popleft()
+            in_flight.append(request)
+            to_send.append(request)
+        # ---  --- #
+        return to_send
+
+    def markSent(self, request, t_sent=None):
+        t_sent = time.time() if t_sent is None else t_sent
+        # ---  --- #
+        request['sent'    ] = t_sent
+        request['deadline'] = t_sent + request['timeout']
+        self.counts['sent'] += 1
+        self.stats.record('sent', request['key'], request['host']) if self.stats is not None else None
+
+    def matchReply(self, datagram, host, port=None, t_reply=None):
+        '''
+        * Find the request in flight answered by 'datagram', received from (host, port).
+        * Returns (request, value, to_send), with request None if the reply is discarded, and to_send the
+          list of requests that can be sent since a slot got free.
+        '''
+        t_reply = time.time() if t_reply is None else t_reply
+        # ---  --- #
+        try:
+            channel, value = parseMacrtReply(datagram)
+        except ValueError:
+            self.counts['malformed'] += 1
+            self.stats.record('malformed', host=host) if self.stats is not None else None
+            print('Error: in matchReply, malformed reply from {}: {}'.format(host, datagram)) if self.verbose else None
+            return None, None, []
+        # ---  --- #
+        for server, in_flight in self.in_flight.items():
+            if server[0]!=host or (self.strict_port and port is not None and server[1]!=port):
+                continue
+            for i, request in enumerate(in_flight):
+                if channel is None or request['channel']==channel:
+                    del in_flight[i]
+                    request['reply'] = t_reply
+                    request['value'] = value
+                    self.recent[(host, request['channel'])] = 'answered'
+                    self.counts['matched'] += 1
+                    if self.stats is not None and request['sent'] is not None:
+                        self.stats.recordReply(request['key'], host, t_reply-request['sent'], t_reply)
+                    return request, value, self.releaseQueued(server)
+        # ---  --- #
+        state = self.recent.get((host, channel), None)
+        reason = {'expired':'stale', 'answered':'duplicate'}.get(state, 'unknown')
+        self.counts[reason] += 1
+        self.stats.record(reason, host=host) if self.stats is not None else None
+        print('Warning: in matchReply, discarding {} reply from {}: {}'.format(reason, host, datagram)) if self.verbose else None
+        return None, None, []
+
+    def expire(self, t_now=None):
+        '''
+        * Give up the requests in flight whose deadline has passed.
+        * Returns (expired, to_send), the lists of the expired requests and of the requests that can be sent.
+        '''
+        t_now   = time.time() if t_now is None else t_now
+        expired = []
+        to_send = []
+        # ---  --- #
+        for server, in_flight in self.in_flight.items():
+            expired_ = [request for request in in_flight if request['deadline'] is not None and request['deadline']<=t_now]
+            if not expired_:
+                continue
+            in_flight[:] = [request for request in in_flight if not any(request is request_ for request_ in expired_)]
+            for request in expired_:
+                self.recent[(server[0], request['channel'])] = 'expired'
+                self.stats.record('timeouts', request['key'], server[0]) if self.stats is not None else None
+            expired += expired_
+            to_send += self.releaseQueued(server)
+        # ---  --- #
+        self.counts['expired'] += len(expired)
+        return expired, to_send
+
+    def cancel(self, request):
+        '''
+        * Give up 'request', so that a late reply will be considered as stale.
+        '''
+        server = (request['host'], request['port'])
+        # ---  --- #
+        if any(request is request_ for request_ in self.in_flight.get(server, [])):
+            self.in_flight[server] = [request_ for request_ in self.in_flight[server] if request_ is not request]
+            self.recent[(request['host'], request['channel'])] = 'expired'
+            self.counts['expired'] += 1
+            self.stats.record('timeouts', request['key'], request['host']) if self.stats is not None else None
+        elif any(request is request_ for request_ in self.queued.get(server, [])):
+            self.queued[server] = deque(request_ for request_ in self.queued[server] if request_ is not request)
+        # ---  --- #
+        return self.releaseQueued(server)
+
+    def nextDeadline(self):
+        deadlines = [request['deadline'] for L in self.in_flight.values() for request in L if request['deadline'] is not None]
+        return min(deadlines) if deadlines else None
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    tracker = RequestTracker(max_in_flight=2)
+    to_send = []
+    for i, sonde in enumerate([1, 2, 3]):
+        to_send += tracker.submit(tracker.makeRequest('probe_{}'.format(i), '192.168.1.101', sonde))
+    for request in to_send:
+        tracker.markSent(request, t_sent=0)
+    print([request['query'] for request in to_send], len(tracker))
+    print(tracker.matchReply(b'MACRTGET 14 1234.5', '192.168.1.101', t_reply=0.05)[:2])
+    print(tracker.expire(t_now=1.0))
+    print(tracker.matchReply(b'MACRTGET 3 999.9', '192.168.1.101'))
+    print(tracker.counts)
+    print('FINNISHED')
@@ -9,42 +9,94 @@ import numpy as np
 import time
 import sys, os
 
-from PyQt5 import QtNetwork
+from PyQt5 import QtNetwork, QtCore
 
 try:
-	from ProbeInterface_class import ProbeInterface
+	from RequestTracker_class  import RequestTracker
 except:
 	sys.path.append("../")
-	from lib.ProbeInterface_class import ProbeInterface
+	from lib.RequestTracker_class import RequestTracker
 
 
 ##############################################################################################################
 # FUNCTION
 ##############################################################################################################
 
-class ResistanceProbe():
+class ResistanceProbe(QtCore.QObject):
     '''
     Class to address the probes that measure the resistance.
+    * getRESISTANCE makes a blocking query of one probe.
+    * startSweep sends the queries of all the probes at once and returns immediately. The replies are
+      collected when the response socket emits readyRead, each query having its own deadline, and
+      sweep_done_sgnl is emitted when every query got its reply or timed out. Thus a sweep over all
+      the probes costs one network round trip, without freezing the Qt event loop.
+    * The replies of all the MacRT servers arrive on the same UDP_resp socket, they are given to the query
+      they answer by a RequestTracker, which also limits the nbr of queries in flight per server and
+      discards the stale or duplicated replies.
+    * sweep is the blocking version of startSweep, that can be used in a thread without Qt event loop.
+    * The sockets are bound at the first query, so that an instance only used for the probe settings (eg
+      in the GUI thread when the acquisition is made by an AcquisitionWorker) does not take the ports.
+    * Arguments:
+        - probes, dictionary of the probes settings to use, that can be shared with another instance
+        - interface, if False the ProbeInterface dialog is not made, eg for an instance living outside of the GUI thread
+        - stats, NetworkStats recording the network metrics of the queries, None by default
     '''
+    sweep_done_sgnl = QtCore.pyqtSignal(object) # emit: dictionary {probe_id: (time, resistance)}, with resistance None if the query timed out
+
     def __init__(self, **kwargs):
+        super().__init__()
         self.verbose = kwargs.pop('verbose', False)
+        self.timeout = kwargs.pop('timeout', 0.5) # [s] deadline of the queries of a sweep
+        self.stats   = kwargs.pop('stats'  , None)
+        self.tracker = RequestTracker(timeout=self.timeout, max_in_flight=kwargs.pop('max_in_flight', 3), stats=self.stats, verbose=self.verbose)
         # ---  --- #
         self.data = None
-        self.UDP_query = QtNetwork.QUdpSocket()     # le canal sur lequel on envoie les demandes
-        self.UDP_resp  = QtNetwork.QUdpSocket()     # le canal de lecture
+        self.UDP_query = None # le canal sur lequel on envoie les demandes, made by openSockets
+        self.UDP_resp  = None # le canal de lecture
+        # ---  --- #
+        self.interface = self.makeInterface() if kwargs.pop('interface', True) else None
+        self.probes    = kwargs.pop('probes', {})
+        self.default_resistance = 500 # just for debugging
+        # ---  --- #
+        self.sweep_results  = {}    # probe_id --> (time, resistance) of the sweep in progress
+        self.sweep_pending  = set() # probe_id of the sweep waiting for a reply
+        self.sweep_blocking = False # True during a blocking sweep, where the deadlines are checked without sweep_timer
+        self.last_sweep     = {}    # results of the last finished sweep
+        self.sweep_timer    = QtCore.QTimer()
+        self.sweep_timer.setSingleShot(True)
+        # ---  --- #
+        if self.interface:
+            self.interface.probe_info_sgnl.connect(self.changeProbeInfo)
+        self.sweep_timer.timeout.connect(self.checkSweepDeadlines)
+
+    def makeInterface(self):
+        '''
+        * The ProbeInterface dialog, imported here so that the instances without interface do not import the
+          Qt widgets.
+        '''
+        try:
+            from ProbeInterface_class import ProbeInterface
+        except ImportError:
+            from lib.ProbeInterface_class import ProbeInterface
+        # ---  --- #
+        return ProbeInterface()
+
+    def openSockets(self):
+        '''
+        * Make and bind the query and response sockets, if not done yet.
+        '''
+        if self.UDP_query is not None:
+            return
+        # ---  --- #
+        self.UDP_query = QtNetwork.QUdpSocket()
+        self.UDP_resp  = QtNetwork.QUdpSocket()
         # ---  --- #
         udp_q_bound_success = self.UDP_query.bind(8001)
         udp_r_bound_success = self.UDP_resp.bind(12000)
         print('UDP query    channel binding: ', udp_q_bound_success) if self.verbose else None
         print('UDP response channel binding: ', udp_r_bound_success) if self.verbose else None
         # ---  --- #
-        #self.UDP_query.readyRead.connect( lambda: self.processPendingDatagrams(self.UDP_resp) )
-        # ---  --- #
-        self.interface = ProbeInterface()
-        self.probes    = {}
-        self.default_resistance = 500 # just for debugging
-        # ---  --- #
-        self.interface.probe_info_sgnl.connect(self.changeProbeInfo)
+        self.UDP_resp.readyRead.connect(self.processSweepDatagrams)
 
     def exec_interface(self, probe_id):
         self.interface.setProbeInfo(ID=probe_id, name=self.probes[probe_id]['name'], IP=self.probes[probe_id]['IP'], probe_nbr=self.probes[probe_id]['probe_nbr'])
@@ -86,26 +138,167 @@ class ResistanceProbe():
         # ---  --- #
         self.resistance = None # initiate the resistance value at None in case the query doesn't work, so that we don't have an old value.
         # ---  --- #
-        query = "MACRTGET {0}".format((sonde-1)*11+3)
-        port  = 12000 +int(IP[-3:], 10)
+        request = self.tracker.makeRequest(id, IP, sonde)
         try:
-            print(query, IP, port) if self.verbose else None
-            out_ = self.UDP_query.writeDatagram(query.encode(), QtNetwork.QHostAddress(IP), port)
-            print(out_) if self.verbose else None
+            self.sendRequests(self.tracker.submit(request))
             time.sleep(0.1) # for not overloading the query-response
-            self.processPendingDatagrams(self.UDP_resp)
+            self.processPendingDatagrams(self.UDP_resp, request)
         except:
             print('Connection error, cannot retrieve resistance data.')
-            return None
+            self.resistance = None
         # ---  --- #
+        self.sendRequests(self.tracker.cancel(request)) # a reply arriving later is stale
         return self.resistance
 
-    def processPendingDatagrams(self, udpSocket):
-        while udpSocket.hasPendingDatagrams():
+    def sendRequests(self, requests):
+        '''
+        * Send the MACRTGET queries of the requests released by the tracker, without waiting for the
+          replies, and start their deadline.
+        '''
+        self.openSockets()
+        # ---  --- #
+        for request in requests:
+            print(request['query'], request['host'], request['port']) if self.verbose else None
+            out_ = self.UDP_query.writeDatagram(request['query'].encode(), QtNetwork.QHostAddress(request['host']), request['port'])
+            print(out_) if self.verbose else None
+            # ---  --- #
+            self.tracker.markSent(request)
+
+    def readReplies(self, udpSocket):
+        '''
+        * Read the pending datagrams of udpSocket, and returns the list of (request, value) of those that
+          answer a request in flight. The discarded replies are counted by the tracker.
+        '''
+        matched = []
+        # ---  --- #
+        while udpSocket is not None and udpSocket.hasPendingDatagrams():
             datagram, host, port = udpSocket.readDatagram(udpSocket.pendingDatagramSize())
-            self.data = datagram.decode().strip().split()
+            host_IP = QtNetwork.QHostAddress(host.toIPv4Address()).toString() # remove the IPv6 prefix of an IPv4 address
+            # ---  --- #
+            request, value, to_send = self.tracker.matchReply(datagram, host_IP, port)
+            self.sendRequests(to_send)
+            if request is not None:
+                self.data = datagram.decode().strip().split()
+                matched.append( (request, value) )
+        # ---  --- #
+        return matched
+
+    def processPendingDatagrams(self, udpSocket, request=None):
+        '''
+        * Set self.resistance from the reply to 'request', or from the last matched reply if request is None.
+        '''
+        for request_, value in self.readReplies(udpSocket):
+            if request is None or request_ is request:
+                self.resistance = value
+
+    def isSweeping(self):
+        return len(self.sweep_pending)!=0
+
+    def startSweep(self, ids=None, **kwargs):
+        '''
+        * Send the queries of all the probes in 'ids' (by default all the probes) and returns immediately.
+          The queries exceeding the nbr of queries in flight allowed per server are sent as soon as a slot
+          gets free.
+        * The result is emitted through sweep_done_sgnl. Returns False, without sending anything, if the
+          previous sweep is not finished yet.
+        '''
+        timeout = kwargs.pop('timeout', self.timeout)
+        # ---  --- #
+        if self.isSweeping():
+            print('Warning: in startSweep, previous sweep not finished, skipping this one.') if self.verbose else None
+            return False
+        # ---  --- #
+        ids = list(self.probes) if ids is None else ids
+        self.sweep_results = {probe_id:(None, None) for probe_id in ids}
+        self.sweep_pending = set(ids)
+        # ---
+        for probe_id in ids:
+            request = self.tracker.makeRequest(probe_id, self.probes[probe_id]['IP'], self.probes[probe_id]['probe_nbr'], timeout=timeout)
+            try:
+                self.sendRequests(self.tracker.submit(request))
+            except:
+                print('Connection error, cannot send the query of {}.'.format(self.probes[probe_id]['name']))
+                self.sendRequests(self.tracker.cancel(request))
+                self.sweep_results[probe_id] = (time.time(), None)
+                self.sweep_pending.discard(probe_id)
+        # ---  --- #
+        if self.isSweeping():
+            self.restartSweepTimer()
+        else:
+            self.finishSweep()
+        # ---  --- #
+        return True
+
+    def sweep(self, ids=None, **kwargs):
+        '''
+        * Blocking version of startSweep: returns the dictionary {probe_id: (time, resistance)} when all the
+          queries are answered or timed out. The replies are waited with waitForReadyRead, so that it works
+          without Qt event loop, eg in an AcquisitionWorker thread.
+        '''
+        self.sweep_blocking = True
+        try:
+            if not self.startSweep(ids, **kwargs):
+                return {}
             # ---  --- #
-            self.resistance = float(self.data[2])
+            while self.isSweeping():
+                deadline = self.tracker.nextDeadline()
+                wait_ms  = max(0, int((deadline-time.time())*1e3)) if deadline is not None else 0
+                self.UDP_resp.waitForReadyRead(wait_ms) # readyRead calls processSweepDatagrams
+                self.checkSweepDeadlines()
+        finally:
+            self.sweep_blocking = False
+        # ---  --- #
+        return self.last_sweep
+
+    def restartSweepTimer(self):
+        deadline = self.tracker.nextDeadline()
+        if deadline is not None and not self.sweep_blocking:
+            self.sweep_timer.start(max(0, int((deadline-time.time())*1e3)))
+
+    def processSweepDatagrams(self):
+        '''
+        * Slot of UDP_resp.readyRead. The replies are given to the query they answer by the tracker.
+        * The replies are read even outside of a sweep, otherwise the socket would stop emitting readyRead.
+        '''
+        t_ = time.time()
+        # ---  --- #
+        for request, value in self.readReplies(self.UDP_resp):
+            if request['key'] in self.sweep_pending:
+                self.sweep_results[request['key']] = (request.get('reply', t_), value)
+                self.sweep_pending.discard(request['key'])
+        # ---  --- #
+        if not self.isSweeping() and self.sweep_results:
+            self.finishSweep()
+
+    def checkSweepDeadlines(self):
+        '''
+        * Give up the queries whose deadline has passed, and wait for the next deadline.
+        '''
+        self.processSweepDatagrams() # collect the replies not yet notified
+        if not self.isSweeping():
+            return
+        # ---  --- #
+        t_ = time.time()
+        expired, to_send = self.tracker.expire(t_)
+        for request in expired:
+            if request['key'] in self.sweep_pending:
+                print('Warning: query of {} timed out.'.format(self.probes[request['key']]['name'])) if self.verbose else None
+                self.sweep_results[request['key']] = (t_, None)
+                self.sweep_pending.discard(request['key'])
+        self.sendRequests(to_send)
+        # ---  --- #
+        if self.isSweeping():
+            self.restartSweepTimer()
+        else:
+            self.finishSweep()
+
+    def finishSweep(self):
+        self.sweep_timer.stop()
+        self.sweep_pending = set()
+        # ---  --- #
+        results, self.sweep_results = self.sweep_results, {}
+        self.last_sweep = results
+        self.sweep_done_sgnl.emit(results)
 
 ##############################################################################################################
 # MAIN
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import sys, os
+
+try:
+	from Decimator_class import Decimator
+except:
+	sys.path.append("../")
+	from lib.Decimator_class import Decimator
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+class SeriesModel():
+    '''
+    Data of a probe displayed by any nbr of plots.
+    * The series keeps a reference on the (x, y) arrays given by 'setData', eg views of the ProbeDataStore,
+      without copying them, and notifies the SeriesView that subscribed to it.
+    * 'version' identifies the data, so that each view only recomputes what it displays when it changed.
+    '''
+    def __init__(self):
+        self.x       = np.zeros(0)
+        self.y       = np.zeros(0)
+        self.version = None
+        self.views   = []
+
+    def subscribe(self, view):
+        if not view in self.views:
+            self.views.append(view)
+        return view
+
+    def unsubscribe(self, view):
+        if view in self.views:
+            self.views.remove(view)
+
+    def setData(self, x, y, version):
+        self.x, self.y, self.version = x, y, version
+        self.notify()
+
+    def notify(self):
+        for view in self.views:
+            view.update(self)
+
+class SeriesView():
+    '''
+    PlotDataItem of a pyqtgraph plot displaying a SeriesModel.
+    * The view is active when its plot is visible, and 'enabled()' is True, eg the check box of the probe in a
+      multiplot. An inactive view does nothing, and is updated when it is active again.
+    * The series is reduced by a Decimator to the width and the range of the plot.
+    '''
+    def __init__(self, data_item, graph, enabled=None):
+        self.data_item = data_item
+        self.graph     = graph
+        self.enabled   = enabled
+        self.decimator = Decimator()
+
+    def isActive(self):
+        return self.graph.isVisible() and (self.enabled is None or self.enabled())
+
+    def update(self, series):
+        '''
+        * Returns True if the data of the PlotDataItem have been set.
+        '''
+        if not self.isActive():
+            return False
+        # ---  --- #
+        viewbox  = self.graph.getViewBox()
+        x_range  = None if viewbox.autoRangeEnabled()[0] else viewbox.viewRange()[0]
+        data_dec = self.decimator.decimate(series.x, series.y, x_range, viewbox.width() or 1000, series.version)
+        if data_dec is None:
+            return False
+        # ---  --- #
+        self.data_item.setData(x=data_dec[0], y=data_dec[1])
+        return True
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    print('FINNISHED')
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import heapq
+import socket
+import argparse
+import selectors
+import threading
+import sys, os
+
+path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/'
+sys.path.append(path_root)
+
+from lib.Conversion_functions   import ThermoBT_RvsT, ThermoHT_RvsT, PT100_RvsT
+from lib.RequestTracker_class   import macrtChannel, macrtPort
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+# ====== Trajectories ====== #
+# A trajectory gives the resistance of a channel versus the time since the start of the simulator. It is tabulated
+# once on a time grid with the vectorized forward models R(T) of Conversion_functions, and interpolated at each
+# query, so that a reply costs the same whatever the model.
+
+forward_models = {'Mobile BT':ThermoBT_RvsT, 'Mobile HT':ThermoHT_RvsT, 'PT100':PT100_RvsT}
+# [K], range of each model where R(T) is positive and has no other extremum than the local minimum at the above70K
+# boundary (~70.3 K and ~78.9 K), which the real probes have too: below 1 K R(T) of Mobile HT rises again, and
+# the one of PT100 is negative below ~31 K.
+model_ranges   = {'Mobile BT':(0.01, 300.), 'Mobile HT':(1., 300.), 'PT100':(40., 300.)}
+
+def clampTemperature(probe_type, T):
+    return min(max(T, model_ranges[probe_type][0]), model_ranges[probe_type][1])
+
+def cooldownTrajectory(probe_type, T_start=300., T_end=0.02, tau=600., N=4001):
+    '''
+    * Synthetic cooldown T(t) = T_end + (T_start-T_end)*exp(-t/tau), tabulated over 10 tau, the temperature
+      staying at T_end afterwards. T_start and T_end are clamped to the range of the model, cf model_ranges.
+    * Returns (t, R) [s, Ohm].
+    '''
+    T_start, T_end = clampTemperature(probe_type, T_start), clampTemperature(probe_type, T_end)
+    t_ = np.linspace(0., 10*tau, N)
+    T_ = T_end + (T_start-T_end)*np.exp(-t_/tau)
+    # ---  --- #
+    return t_, np.asarray(forward_models[probe_type](T_), dtype=float)
+
+def constantTrajectory(probe_type, T=4.2):
+    return np.array([0.]), np.array([forward_models[probe_type](clampTemperature(probe_type, T))], dtype=float).ravel()
+
+trajectories = {'cooldown':cooldownTrajectory, 'constant':constantTrajectory}
+
+class SimulatedChannel():
+    '''
+    * Channel of a simulated MacRT, whose resistance follows the tabulated trajectory (t, R), with a relative
+      gaussian noise 'noise'.
+    '''
+    def __init__(self, t, R, noise=0., rng=None):
+        self.t     = t
+        self.R     = R
+        self.noise = noise
+        self.rng   = rng if rng is not None else np.random.default_rng()
+
+    def value(self, t_):
+        R = np.interp(t_, self.t, self.R)
+        return R*(1+self.noise*self.rng.standard_normal()) if self.noise else R
+
+class MacrtSimulator():
+    '''
+    Local stand-in for the MacRT servers, speaking their UDP protocol, to test the acquisition without the lab
+    network.
+    * Each host (an address of the loopback, eg 127.0.0.101) listens on the port 12000 + last octet, as the real
+      servers, and answers a query 'MACRTGET <channel>' with 'MACRTGET <channel> <resistance>', sent to the
+      port 'resp_port' of the client. The last octet must have three digits, cf macrtPort.
+    * channels: dictionary {(host, channel): SimulatedChannel}. A query for a channel not simulated is ignored,
+      as a lost one.
+    * The network is impaired with a delay of 'latency' plus an exponential 'jitter', and with the probabilities
+      'loss' (no reply), 'reorder' (the reply is delayed by 'reorder_delay' more, so that the next ones overtake
+      it), 'duplicate' (the reply is sent twice) and 'malformed' (the reply is garbage).
+    * All the hosts are served by one thread, with one selector over their sockets and a heap of the replies
+      ordered by sending time, so that it scales to hundreds of channels.
+    '''
+    def __init__(self, channels, **kwargs):
+        self.verbose       = kwargs.pop('verbose'      , False)
+        self.resp_port     = kwargs.pop('resp_port'    , 12000)
+        self.latency       = kwargs.pop('latency'      , 0.) # [s]
+        self.jitter        = kwargs.pop('jitter'       , 0.) # [s], mean of the exponential jitter
+        self.loss          = kwargs.pop('loss'         , 0.)
+        self.reorder       = kwargs.pop('reorder'      , 0.)
+        self.reorder_delay = kwargs.pop('reorder_delay', 0.05) # [s]
+        self.duplicate     = kwargs.pop('duplicate'    , 0.)
+        self.malformed     = kwargs.pop('malformed'    , 0.)
+        self.rng           = np.random.default_rng(kwargs.pop('seed', None))
+        # ---  --- #
+        self.channels = channels
+        self.hosts    = sorted(set(host for host, channel in channels))
+        self.sockets  = {} # host --> socket
+        self.selector = None
+        self.pending  = [] # heap of the replies (time to send, nbr, host, datagram, address)
+        self.n_sent   = 0  # nbr of replies pushed in the heap, also used to order the replies of the same time
+        self.counts   = {'queries':0, 'replies':0, 'lost':0, 'reordered':0, 'duplicated':0, 'malformed':0, 'unknown':0}
+        self.t_0      = None
+        self.stopped  = threading.Event()
+        self.thread   = None
+
+    def open(self):
+        self.selector = selectors.DefaultSelector()
+        for host in self.hosts:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, macrtPort(host)))
+            sock.setblocking(False)
+            self.sockets[host] = sock
+            self.selector.register(sock, selectors.EVENT_READ, host)
+        print('Simulating {0} channels on {1} hosts'.format(len(self.channels), len(self.hosts))) if self.verbose else None
+
+    def close(self):
+        if self.selector is None:
+            return
+        # ---  --- #
+        self.selector.close()
+        for sock in self.sockets.values():
+            sock.close()
+        self.sockets, self.selector = {}, None
+
+    def handleQuery(self, host, datagram, address, t_now):
+        '''
+        * Schedule the reply to the query 'datagram' received by 'host' from 'address'.
+        '''
+        self.counts['queries'] += 1
+        try:
+            channel = int(datagram.split()[1])
+        except (IndexError, ValueError):
+            self.counts['unknown'] += 1
+            return
+        if (host, channel) not in self.channels:
+            self.counts['unknown'] += 1
+            return
+        if self.rng.random()<self.loss:
+            self.counts['lost'] += 1
+            return
+        # ---  --- #
+        value = self.channels[(host, channel)].value(t_now-self.t_0)
+        reply = 'MACRTGET {0} {1:.6f}'.format(channel, value).encode()
+        if self.rng.random()<self.malformed:
+            self.counts['malformed'] += 1
+            reply = b'MACRTGET ERR'
+        delay = self.latency + (self.rng.exponential(self.jitter) if self.jitter else 0.)
+        if self.rng.random()<self.reorder:
+            self.counts['reordered'] += 1
+            delay += self.reorder_delay
+        # ---  --- #
+        self.schedule(t_now+delay, host, reply, (address[0], self.resp_port))
+        if self.rng.random()<self.duplicate:
+            self.counts['duplicated'] += 1
+            self.schedule(t_now+delay, host, reply, (address[0], self.resp_port))
+
+    def schedule(self, t_send, host, datagram, address):
+        heapq.heappush(self.pending, (t_send, self.n_sent, host, datagram, address))
+        self.n_sent += 1
+
+    def sendDue(self, t_now):
+        while self.pending and self.pending[0][0]<=t_now:
+            t_send, nbr, host, datagram, address = heapq.heappop(self.pending)
+            try:
+                self.sockets[host].sendto(datagram, address)
+                self.counts['replies'] += 1
+            except OSError as error:
+                print('Error: {0} cannot reply to {1}: {2}'.format(host, address, error)) if self.verbose else None
+
+    def serve(self, duration=None):
+        '''
+        * Serve the queries until 'stop' is called, or for 'duration' seconds.
+        '''
+        if self.selector is None:
+            self.open()
+        self.t_0 = time.time() if self.t_0 is None else self.t_0
+        t_end    = None if duration is None else time.time()+duration
+        # ---  --- #
+        try:
+            while not self.stopped.is_set() and (t_end is None or time.time()<t_end):
+                wait = 0.1 if not self.pending else max(0., self.pending[0][0]-time.time())
+                for key, mask in self.selector.select(min(wait, 0.1)):
+                    while True:
+                        try:
+                            datagram, address = key.fileobj.recvfrom(1024)
+                        except (BlockingIOError, InterruptedError):
+                            break
+                        except OSError: # eg ICMP port unreachable of a previous reply
+                            continue
+                        self.handleQuery(key.data, datagram, address, time.time())
+                self.sendDue(time.time())
+        finally:
+            self.close()
+
+    def start(self):
+        '''
+        * Serve in a thread, eg inside a test script, the sockets being bound before returning.
+        '''
+        self.open()
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def status(self):
+        return ', '.join('{0} {1}'.format(value, name) for name, value in self.counts.items())
+
+def makeChannels(hosts, probes_per_host, **kwargs):
+    '''
+    * Returns the dictionary {(host, channel): SimulatedChannel} of 'probes_per_host' probes on each host, the
+      probe types cycling over 'probe_types' by host, eg the first host of Mobile BT and the second of Mobile HT as
+      in the lab. The cooldowns of the probes of a host are shifted by 'stagger' [s] from one to the next.
+    '''
+    probe_types = kwargs.pop('probe_types', ['Mobile BT', 'Mobile HT'])
+    trajectory  = kwargs.pop('trajectory' , 'cooldown')
+    tau         = kwargs.pop('tau'        , 600.) # [s]
+    stagger     = kwargs.pop('stagger'    , 60.)  # [s]
+    noise       = kwargs.pop('noise'      , 1e-4)
+    rng         = np.random.default_rng(kwargs.pop('seed', None))
+    # ---  --- #
+    tables   = {} # probe type --> (t, R), shared by the channels
+    channels = {}
+    for i, host in enumerate(hosts):
+        probe_type = probe_types[i%len(probe_types)]
+        if probe_type not in tables:
+            tables[probe_type] = cooldownTrajectory(probe_type, tau=tau) if trajectory=='cooldown' else trajectories[trajectory](probe_type)
+        t_, R = tables[probe_type]
+        for sonde in range(1, probes_per_host+1):
+            channels[(host, macrtChannel(sonde))] = SimulatedChannel(t_-(sonde-1)*stagger, R, noise=noise, rng=rng)
+    # ---  --- #
+    return channels
+
+def hostName(host):
+    '''
+    * Name of 'host' in an IP file, IP<last octet - 100>, so that 127.0.0.101 and 127.0.0.103 are IP1 and IP3 as the
+      lab servers 192.168.1.101 and 192.168.1.103.
+    '''
+    return 'IP{}'.format(int(host.split('.')[-1])-100)
+
+def writeIPFile(path_to_file, hosts):
+    '''
+    * Write the hosts in the format read by getIPFromTxt, to point the GUI or the headless recording to the simulator.
+    '''
+    with open(path_to_file, 'w') as f:
+        f.write('\n'.join("{0}='{1}' # MacRT simulator".format(hostName(host), host) for host in hosts))
+
+def loadTest(hosts, probes_per_host, duration, **kwargs):
+    '''
+    * Sweep all the simulated probes as fast as possible with a MacrtClient for 'duration' seconds, and print the
+      throughput and the network metrics, eg the tail latency.
+    '''
+    from lib.MacrtClient_class  import MacrtClient
+    from lib.NetworkStats_class import NetworkStats
+    # ---  --- #
+    client = MacrtClient(stats=NetworkStats(), **kwargs)
+    names  = {}
+    for host in hosts:
+        for sonde in range(1, probes_per_host+1):
+            name = '{0}:{1}'.format(hostName(host), sonde)
+            names[client.setProbe(name, host, sonde)] = name
+    # ---  --- #
+    n_sweeps, n_values = 0, 0
+    t_start = time.time()
+    while time.time()-t_start<duration:
+        results   = client.sweep()
+        n_sweeps += 1
+        n_values += sum(res is not None for t_, res in results.values())
+    dt = time.time()-t_start
+    client.close()
+    # ---  --- #
+    print(client.stats.report(names))
+    print('{0} sweeps of {1} probes in {2:.2f} s: {3:.1f} sweeps/s, {4:.0f} values/s'.format(n_sweeps, len(names), dt, n_sweeps/dt, n_values/dt))
+    return client.stats.snapshot(names)
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description='Local simulator of the MacRT servers, for load and soak tests of the acquisition.')
+    parser.add_argument('--hosts'          , nargs='*', default=['127.0.0.101', '127.0.0.103'], help='addresses of the simulated hosts, by default the ones of the lab on the loopback')
+    parser.add_argument('--n-hosts'        , type=int  , default=None    , help='simulate the hosts 127.0.0.101, 127.0.0.102, ... instead of --hosts')
+    parser.add_argument('--probes-per-host', type=int  , default=3)
+    parser.add_argument('--probe-types'    , nargs='*', default=['Mobile BT', 'Mobile HT'], choices=list(forward_models), help='probe types of the hosts, cycled')
+    parser.add_argument('--trajectory'     , default='cooldown', choices=list(trajectories))
+    parser.add_argument('--tau'            , type=float, default=600.    , help='[s], time constant of the cooldown')
+    parser.add_argument('--noise'          , type=float, default=1e-4    , help='relative noise of the resistances')
+    parser.add_argument('--latency'        , type=float, default=0.      , help='[s], delay of the replies')
+    parser.add_argument('--jitter'         , type=float, default=0.      , help='[s], mean of the exponential jitter added to the latency')
+    parser.add_argument('--loss'           , type=float, default=0.      , help='probability of a query without reply')
+    parser.add_argument('--reorder'        , type=float, default=0.      , help='probability of a reply delayed by --reorder-delay more')
+    parser.add_argument('--reorder-delay'  , type=float, default=0.05    , help='[s]')
+    parser.add_argument('--duplicate'      , type=float, default=0.      , help='probability of a reply sent twice')
+    parser.add_argument('--malformed'      , type=float, default=0.      , help='probability of a garbage reply')
+    parser.add_argument('--resp-port'      , type=int  , default=12000   , help='port of the client receiving the replies')
+    parser.add_argument('--duration'       , type=float, default=None    , help='[s], serve until Ctrl+C by default')
+    parser.add_argument('--seed'           , type=int  , default=None)
+    parser.add_argument('--IP-file'        , default=None                , help='write the hosts in this IP file, eg for Thermometrie_Cryo_headless.py --IP-file')
+    parser.add_argument('--load-test'      , type=float, default=None    , help='[s], sweep the simulated probes with a MacrtClient for this duration, and print the throughput and latencies')
+    parser.add_argument('--client-timeout' , type=float, default=0.5     , help='[s], deadline of the queries of the load test')
+    parser.add_argument('--verbose'        , action='store_true')
+    # ---  --- #
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args  = parseArguments(argv)
+    hosts = args.hosts if args.n_hosts is None else ['127.0.0.{}'.format(101+i) for i in range(args.n_hosts)]
+    if any(not 100<=int(host.split('.')[-1])<=255 for host in hosts):
+        raise ValueError('the last octet of the hosts must have three digits, cf macrtPort')
+    # ---  --- #
+    channels  = makeChannels(hosts, args.probes_per_host, probe_types=args.probe_types, trajectory=args.trajectory, tau=args.tau, noise=args.noise, seed=args.seed)
+    simulator = MacrtSimulator(channels, latency=args.latency, jitter=args.jitter, loss=args.loss, reorder=args.reorder, reorder_delay=args.reorder_delay,
+                               duplicate=args.duplicate, malformed=args.malformed, resp_port=args.resp_port, seed=args.seed, verbose=args.verbose)
+    if args.IP_file:
+        writeIPFile(args.IP_file, hosts)
+    # ---  --- #
+    if args.load_test is not None:
+        simulator.start()
+        try:
+            loadTest(hosts, args.probes_per_host, args.load_test, timeout=args.client_timeout, resp_port=args.resp_port)
+        finally:
+            simulator.stop()
+    else:
+        try:
+            simulator.serve(duration=args.duration)
+        except KeyboardInterrupt:
+            pass
+    print('Simulator: {}'.format(simulator.status()))
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    main()
+    print('FINNISHED')
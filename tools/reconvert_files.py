@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#bash! /bin/env/python
+
+##############################################################################################################
+# IMPORTATION
+##############################################################################################################
+
+import numpy as np
+import time
+import glob
+import shutil
+import fnmatch
+import argparse
+import sys, os
+from concurrent.futures import ProcessPoolExecutor
+
+path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/'
+sys.path.append(path_root)
+
+from lib.Conversion_functions   import convert_RtoT, getConverter, probeTypes
+from lib.ProbeConfig_functions  import loadProbeConfig
+from lib.DataReader_class       import readTextHeader, parseFloats
+
+##############################################################################################################
+# FUNCTION
+##############################################################################################################
+
+# Reconversion R --> T of the txt files saved by the GUI (Temp_evo_save_*, auto_save_*), eg after a correction of a
+# calibration. The files have the columns 'time  name(R)  name(T)' of each probe, cf DataWriter:
+#   - only the T columns are rewritten, the time and R columns are copied as they are, byte for byte,
+#   - the header lines ('#...'), the header rows repeated by the old saveData, the blank lines and the lines
+#     that are not a tick of all the probes are copied as they are, as well as the T of the samples of time 'None'
+#     (default values of a buffer not full),
+#   - a file is read by blocks of lines, each block being converted with one call per (probe type, above70K),
+#     so that the memory used does not depend on the size of the file,
+#   - the files, and the segments of the large files, are converted in parallel by a pool of processes, each
+#     segment being written in a part file, and the parts are concatenated in order in the new file.
+
+SAVE_PATTERNS = ['Temp_evo_save_*.txt', 'auto_save_*.txt']
+
+def isOutput(path_to_file, suffix):
+    '''
+    * True if path_to_file is a file written by reconvertFiles with 'suffix', or one of its part files.
+    '''
+    name, ext = os.path.splitext(os.path.basename(path_to_file))
+    return bool(suffix) and name.endswith(suffix) or ext.startswith('.part')
+
+def findFiles(paths, patterns=SAVE_PATTERNS, suffix='_reconv'):
+    '''
+    * Returns the files of 'paths' (files, directories searched recursively, or glob patterns) whose name matches
+      one of 'patterns', sorted. The files written by a previous reconversion with 'suffix' are left out, so that
+      a second run does not reconvert them again.
+    '''
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, filenames in os.walk(path):
+                files += [os.path.join(root, filename) for filename in filenames if any(fnmatch.fnmatch(filename, pattern) for pattern in patterns)]
+        else:
+            files += [path_ for path_ in glob.glob(path) if os.path.isfile(path_)]
+    # ---  --- #
+    return sorted(set(path_ for path_ in files if not isOutput(path_, suffix)))
+
+def probeSettings(names, **kwargs):
+    '''
+    * Returns the list of (probe_type, above70K) of the probes 'names', in the order of the columns:
+        - 'probes': dictionary {name: (probe_type, above70K)} of the probes set one by one,
+        - 'config': list of the probes of loadProbeConfig, whose names are matched with the spaces replaced by '_'
+          as in the header of the files,
+        - probe_type and above70K for the other ones. If probe_type is None, a ValueError listing them is raised,
+          so that a probe missing from the config is not reconverted with a wrong type.
+    '''
+    probes     = kwargs.pop('probes'    , {})
+    config     = kwargs.pop('config'    , [])
+    probe_type = kwargs.pop('probe_type', None)
+    above70K   = kwargs.pop('above70K'  , False)
+    # ---  --- #
+    config_    = {probe['name'].replace(' ', '_'):(probe['probe_type'], probe['above70K']) for probe in config}
+    unknown    = [name for name in names if name not in probes and name not in config_]
+    if unknown and probe_type is None:
+        raise ValueError('no probe type for {0}, they are neither in --probe nor in the config, set them with --probe or --probe-type.'.format(', '.join(unknown)))
+    settings   = []
+    for name in names:
+        settings.append(probes.get(name, config_.get(name, (probe_type, above70K))))
+    # ---  --- #
+    return settings
+
+def reconvertLines(lines, settings, method='spln'):
+    '''
+    * Returns the lines with the T columns reconverted, and the nbr of ticks reconverted. The lines are bytes.
+    '''
+    n_fields = 3*len(settings)
+    rows     = [] # index in lines of the ticks
+    fields   = []
+    for k, line in enumerate(lines):
+        if line[:1] in (b'#', b't', b'\n', b'\r'): # header, repeated header row 'time ...', blank line
+            continue
+        fields_ = line.rstrip(b'\r\n').rstrip(b'\t').split(b'\t')
+        if len(fields_)!=n_fields:
+            continue
+        rows.append(k)
+        fields.append(fields_)
+    if not rows:
+        return lines, 0
+    # ---  --- #
+    fields = np.array(fields, dtype=object)
+    groups = {}
+    for i, setting in enumerate(settings):
+        groups.setdefault(setting, []).append(i)
+    with np.errstate(all='ignore'):
+        for (probe_type, above70K), probes in groups.items():
+            R_cols = [3*i+1 for i in probes]
+            R_     = parseFloats(fields[:, R_cols].ravel())
+            T_     = np.asarray(convert_RtoT(R_, probe_type=probe_type, above70K=above70K, method=method), dtype=float).reshape(len(rows), len(probes))
+            for j, i in enumerate(probes):
+                placeholder     = fields[:, 3*i]==b'None'
+                fields[:, 3*i+2] = np.where(placeholder, fields[:, 3*i+2], [repr(T).encode() for T in T_[:, j].tolist()])
+    # ---  --- #
+    lines = list(lines)
+    for k, fields_ in zip(rows, fields.tolist()):
+        lines[k] = b'\t'.join(fields_) + b'\t\n'
+    return lines, len(rows)
+
+def segments(path_to_file, data_start, split_size):
+    '''
+    * Returns the segments [start, stop) [bytes] of the data of the file, of about split_size bytes, cut at the
+      starts of lines.
+    '''
+    size   = os.path.getsize(path_to_file)
+    bounds = [data_start]
+    with open(path_to_file, 'rb') as f:
+        while bounds[-1]+split_size<size:
+            f.seek(bounds[-1]+split_size)
+            f.readline()
+            if f.tell()>=size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    # ---  --- #
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def reconvertSegment(path_to_file, start, stop, part_file, settings, chunk_size=1<<22, method='spln'):
+    '''
+    * Reconvert the lines of the bytes [start, stop) of path_to_file into part_file, by blocks of about
+      chunk_size bytes. Returns (nbr of lines, nbr of ticks reconverted).
+    '''
+    n_lines, n_ticks = 0, 0
+    with open(path_to_file, 'rb') as f_in, open(part_file, 'wb') as f_out:
+        f_in.seek(start)
+        pos = start
+        while pos<stop:
+            lines = f_in.readlines(min(chunk_size, stop-pos))
+            if not lines:
+                break
+            while pos+sum(len(line) for line in lines)>stop: # line of the next segment
+                lines.pop()
+            pos += sum(len(line) for line in lines)
+            f_in.seek(pos)
+            lines, n_ = reconvertLines(lines, settings, method=method)
+            f_out.writelines(lines)
+            n_lines += len(lines)
+            n_ticks += n_
+    # ---  --- #
+    return n_lines, n_ticks
+
+def outputPath(path_to_file, output_dir, suffix):
+    name, ext = os.path.splitext(os.path.basename(path_to_file))
+    return os.path.join(output_dir or os.path.dirname(path_to_file), name+suffix+ext)
+
+def reconvertFiles(files, settings_of, **kwargs):
+    '''
+    * Reconvert 'files' with a pool of 'jobs' processes, the settings of the probes of a file being given by
+      settings_of(names). Returns the list of (input file, output file, nbr of lines, nbr of ticks).
+    '''
+    jobs       = kwargs.pop('jobs'      , os.cpu_count())
+    output_dir = kwargs.pop('output_dir', None)
+    suffix     = kwargs.pop('suffix'    , '_reconv')
+    split_size = int(kwargs.pop('split_size', 64<<20)) # [bytes], size of the segments of a file converted in parallel
+    chunk_size = int(kwargs.pop('chunk_size', 4<<20))  # [bytes], size of the blocks of lines read at once
+    method     = kwargs.pop('method'    , 'spln')
+    stamp      = kwargs.pop('stamp'     , '{0:04d}-{1:02d}-{2:02d}_{3:02d}:{4:02d}:{5:02d}'.format(*time.localtime()[:6]))
+    verbose    = kwargs.pop('verbose'   , False)
+    # ---  --- #
+    outputs = {os.path.abspath(outputPath(path_to_file, output_dir, suffix)) for path_to_file in files}
+    inputs  = [path_to_file for path_to_file in files if os.path.abspath(path_to_file) in outputs]
+    if inputs:
+        raise ValueError('{} would be overwritten by the reconversion of the other files.'.format(', '.join(inputs)))
+    plans = [] # (file, output file, header, settings, data_start), all checked before any conversion
+    for path_to_file in files:
+        header, names, data_start = readTextHeader(path_to_file)
+        try:
+            settings = settings_of(names)
+        except ValueError as error:
+            raise ValueError('{0}: {1}'.format(path_to_file, error))
+        output   = outputPath(path_to_file, output_dir, suffix)
+        if os.path.abspath(output)==os.path.abspath(path_to_file):
+            raise ValueError('the output of {} would overwrite it.'.format(path_to_file))
+        header   = header[:-1] + ['#reconverted_date={0}, probes={1}\n'.format(stamp, ', '.join('{0}:{1}{2}'.format(name, probe_type, ':above70K' if above70K else '')
+                                                                           for name, (probe_type, above70K) in zip(names, settings))).encode()] + header[-1:]
+        plans.append((path_to_file, output, header, settings, data_start))
+    if output_dir and not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    tasks = {} # file --> (output file, header, [future of each segment])
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for path_to_file, output, header, settings, data_start in plans:
+            futures  = [pool.submit(reconvertSegment, path_to_file, start, stop, '{0}.part{1}'.format(output, k), settings, chunk_size, method)
+                        for k, (start, stop) in enumerate(segments(path_to_file, data_start, split_size))]
+            tasks[path_to_file] = (output, header, futures)
+        # ---
+        results = []
+        for path_to_file, (output, header, futures) in tasks.items():
+            counts = [future.result() for future in futures]
+            with open(output, 'wb') as f_out:
+                f_out.writelines(header)
+                for k in range(len(futures)):
+                    with open('{0}.part{1}'.format(output, k), 'rb') as f_part:
+                        shutil.copyfileobj(f_part, f_out, 1<<20)
+                    os.remove('{0}.part{1}'.format(output, k))
+            results.append((path_to_file, output, sum(c[0] for c in counts), sum(c[1] for c in counts)))
+            print('{0} --> {1}: {2} ticks'.format(path_to_file, output, results[-1][3])) if verbose else None
+    # ---  --- #
+    return results
+
+def parseProbe(text):
+    '''
+    * 'name=probe_type' or 'name=probe_type:above70K' --> (name, (probe_type, above70K)), name as in the header
+      of the files, i.e with '_' in place of the spaces.
+    '''
+    name, setting = text.split('=', 1)
+    probe_type, _, flag = setting.partition(':')
+    if getConverter(probe_type) is None:
+        raise argparse.ArgumentTypeError('unknown probe type {0}, the types are {1}'.format(probe_type, probeTypes()))
+    return name, (probe_type, flag=='above70K')
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(description='Reconversion R --> T of the txt files saved by the GUI, in parallel.')
+    parser.add_argument('paths'         , nargs='+'                    , help='files, directories (searched for '+', '.join(SAVE_PATTERNS)+') or glob patterns')
+    parser.add_argument('--output-dir'  , default=None                 , help='directory of the new files, the one of each file by default')
+    parser.add_argument('--suffix'      , default='_reconv'            , help='suffix of the name of the new files')
+    parser.add_argument('--probe-type'  , default=None, choices=probeTypes(), help='probe type of the probes not set by --probe or --config, an error by default')
+    parser.add_argument('--above70K'    , action='store_true'          , help='T > 70 K state of the probes not set by --probe or --config')
+    parser.add_argument('--probe'       , type=parseProbe, action='append', default=[], help='name=probe_type[:above70K], eg "Etage_4_K=Mobile HT:above70K", repeatable')
+    parser.add_argument('--config'      , default=path_root+'probes_config.json', help='json file of the probes, cf loadProbeConfig, giving the probe type and T > 70 K state by name, "" -> none')
+    parser.add_argument('--method'      , default='spln', choices=['spln', 'root'], help='inverse of "Mobile BT" and "Mobile HT", cf convert_RtoT')
+    parser.add_argument('--jobs'        , type=int  , default=os.cpu_count(), help='nbr of processes')
+    parser.add_argument('--split-size'  , type=float, default=64.       , help='[MB], size of the segments of a file converted in parallel')
+    parser.add_argument('--chunk-size'  , type=float, default=4.        , help='[MB], size of the blocks of lines read at once by a process')
+    parser.add_argument('--verbose'     , action='store_true')
+    # ---  --- #
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args   = parseArguments(argv)
+    files  = findFiles(args.paths, suffix=args.suffix)
+    config = loadProbeConfig(args.config) if args.config else []
+    probes = dict(args.probe)
+    if not files:
+        print('No file to reconvert in {}'.format(args.paths))
+        return 1
+    # ---  --- #
+    t_      = time.time()
+    try:
+        results = reconvertFiles(files, lambda names: probeSettings(names, probes=probes, config=config, probe_type=args.probe_type, above70K=args.above70K),
+                                 jobs=args.jobs, output_dir=args.output_dir, suffix=args.suffix, split_size=args.split_size*(1<<20), chunk_size=args.chunk_size*(1<<20),
+                                 method=args.method, verbose=args.verbose)
+    except ValueError as error:
+        print('Error: {}'.format(error))
+        return 1
+    dt      = time.time() - t_
+    size    = sum(os.path.getsize(path_to_file) for path_to_file in files)
+    print('Reconverted {0} files, {1} ticks, {2:.1f} MB in {3:.2f} s: {4:.1f} MB/s with {5} processes'.format(
+          len(results), sum(r[3] for r in results), size/1e6, dt, size/1e6/dt if dt>0 else np.inf, args.jobs))
+    return 0
+
+##############################################################################################################
+# MAIN
+##############################################################################################################
+
+if  __name__=="__main__":
+    print('STARTING: Thermometer')
+    sys.exit(main())